@@ -3,6 +3,8 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_marshmallow import Marshmallow
 from flasgger import Swagger
 from .config import Config
+from .sqlite_tuning import sqlite_engine_options, configure_sqlite
+from .schema import upgrade_schema
 
 db = SQLAlchemy()
 ma = Marshmallow()
@@ -28,6 +30,8 @@ swagger_config = {
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    if app.config.get('SQLITE_TUNING'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = sqlite_engine_options(app.config)
 
     db.init_app(app)
     ma.init_app(app)
@@ -35,8 +39,11 @@ def create_app(config_class=Config):
 
     with app.app_context():
         from .v1 import api_v1_bp
-        
+
+        if app.config.get('SQLITE_TUNING'):
+            configure_sqlite(app, db)
         db.create_all()
+        upgrade_schema(db)
         app.register_blueprint(api_v1_bp, url_prefix='/api/v1')
     
     return app
\ No newline at end of file
@@ -4,7 +4,68 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'a-very-secret-key')
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URI', f"sqlite:///{os.path.join(basedir, 'app.db')}")
+    SQLALCHEMY_DATABASE_URI = os.environ.get('SQLALCHEMY_DATABASE_URI') or os.environ.get('DATABASE_URI', f"sqlite:///{os.path.join(basedir, 'app.db')}")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
-    GEMINI_API_KEYS = os.environ.get('GEMINI_API_KEYS', '').split(',')
\ No newline at end of file
+    # SQLite tuning for concurrent workers: WAL journal, relaxed fsync, busy timeout,
+    # memory-mapped reads and a bounded connection pool.
+    SQLITE_TUNING = os.environ.get('SQLITE_TUNING', 'false').lower() in ('1', 'true', 'yes')
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 268435456))
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+
+    GEMINI_API_KEYS = os.environ.get('GEMINI_API_KEYS', '').split(',')
+    GEMINI_MODEL = os.environ.get('GEMINI_MODEL', 'gemini-1.5-flash')
+    GEMINI_API_ENDPOINT = os.environ.get('GEMINI_API_ENDPOINT', 'https://generativelanguage.googleapis.com')
+
+    # Key pool scheduling: per-key requests/minute (0 = unlimited), concurrent calls
+    # per key, seconds a key rests after a 429 without a usable Retry-After, the cap on
+    # any rest (Retry-After included), and request/acquire timeouts.
+    GEMINI_KEY_RPM_LIMIT = int(os.environ.get('GEMINI_KEY_RPM_LIMIT', 0))
+    GEMINI_KEY_MAX_IN_FLIGHT = int(os.environ.get('GEMINI_KEY_MAX_IN_FLIGHT', 4))
+    GEMINI_KEY_COOLDOWN = float(os.environ.get('GEMINI_KEY_COOLDOWN', 30))
+    GEMINI_KEY_MAX_COOLDOWN = float(os.environ.get('GEMINI_KEY_MAX_COOLDOWN', 300))
+    GEMINI_TIMEOUT = float(os.environ.get('GEMINI_TIMEOUT', 60))
+    GEMINI_ACQUIRE_TIMEOUT = float(os.environ.get('GEMINI_ACQUIRE_TIMEOUT', 30))
+
+    # spaCy model used to split paper content into questions.
+    # NLP_INGEST_MODE: 'full' runs the whole pipeline, 'senter' keeps only the
+    # statistical sentence recognizer, 'sentencizer' uses rule-based splitting.
+    SPACY_MODEL = os.environ.get('SPACY_MODEL', 'en_core_web_sm')
+    NLP_INGEST_MODE = os.environ.get('NLP_INGEST_MODE', 'full')
+
+    # Bulk paper import: nlp.pipe tuning and how many papers share one transaction.
+    NLP_PIPE_BATCH_SIZE = int(os.environ.get('NLP_PIPE_BATCH_SIZE', 64))
+    NLP_PIPE_N_PROCESS = int(os.environ.get('NLP_PIPE_N_PROCESS', 1))
+    BULK_IMPORT_CHUNK_SIZE = int(os.environ.get('BULK_IMPORT_CHUNK_SIZE', 50))
+
+    # Upper bound for ?limit= when listing a user's papers.
+    PAPERS_PAGE_MAX_LIMIT = int(os.environ.get('PAPERS_PAGE_MAX_LIMIT', 100))
+
+    # Per-paper Gemini context cache. PAPER_CONTEXT_CACHE_DB is an optional SQLite
+    # file backing the in-memory LRU. GEMINI_CONTEXT_MAX_QUESTIONS > 0 sends only the
+    # N most relevant questions of larger papers instead of the whole paper.
+    PAPER_CONTEXT_CACHE_SIZE = int(os.environ.get('PAPER_CONTEXT_CACHE_SIZE', 256))
+    PAPER_CONTEXT_CACHE_DB = os.environ.get('PAPER_CONTEXT_CACHE_DB', '')
+    GEMINI_CONTEXT_MAX_QUESTIONS = int(os.environ.get('GEMINI_CONTEXT_MAX_QUESTIONS', 0))
+
+    # Recent single-question regenerate results, reused when a client sends reuse_cached.
+    REGENERATE_MEMO_SIZE = int(os.environ.get('REGENERATE_MEMO_SIZE', 512))
+    REGENERATE_MEMO_TTL = float(os.environ.get('REGENERATE_MEMO_TTL', 600))
+
+    # Concurrent LLM calls used by a paper-wide regenerate job.
+    REGENERATE_CONCURRENCY = int(os.environ.get('REGENERATE_CONCURRENCY', 8))
+
+    # Background jobs for LLM-backed endpoints. LLM_ASYNC_MODE makes the question
+    # endpoints answer 202 with a job id by default (clients can also opt in per
+    # request with `Prefer: respond-async` or ?async=true). JOB_STORE_PATH keeps
+    # jobs in a SQLite file shared by all workers instead of in process memory.
+    LLM_ASYNC_MODE = os.environ.get('LLM_ASYNC_MODE', 'false').lower() in ('1', 'true', 'yes')
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 4))
+    JOB_STORE_PATH = os.environ.get('JOB_STORE_PATH', '')
+    JOB_STORE_MAX_FINISHED = int(os.environ.get('JOB_STORE_MAX_FINISHED', 1000))
+    JOB_LONG_POLL_MAX = float(os.environ.get('JOB_LONG_POLL_MAX', 30))
\ No newline at end of file
@@ -1,5 +1,9 @@
 from app import db
 import datetime
+import uuid
+
+def new_content_version():
+    return uuid.uuid4().hex
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -14,7 +18,10 @@ class QuestionPaper(db.Model):
     title = db.Column(db.String(150), nullable=False, default="Untitled Paper")
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    questions = db.relationship('Question', backref='paper', cascade="all, delete-orphan", lazy=True)
+    # Replaced whenever the paper's questions change; cached paper contexts compare against it.
+    content_version = db.Column(db.String(32), nullable=False, default=new_content_version, server_default='')
+    questions = db.relationship('Question', backref='paper', cascade="all, delete-orphan", lazy=True,
+                                order_by='Question.position, Question.id')
 
     def __repr__(self):
         return f"<QuestionPaper {self.title}>"
@@ -23,6 +30,9 @@ class Question(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     text = db.Column(db.Text, nullable=False)
     question_paper_id = db.Column(db.Integer, db.ForeignKey('question_paper.id'), nullable=False)
+    # Order within the paper (ids only grow, so a question inserted mid-paper sorts by this).
+    # Rows from before the column existed all read 0 and keep their id order.
+    position = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     def __repr__(self):
         return f"<Question {self.id}>"
\ No newline at end of file
@@ -0,0 +1,24 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+
+# Columns added after the first release: (table, column, DDL fragment).
+# db.create_all() only creates missing tables, so existing databases get these here.
+ADDED_COLUMNS = [
+    ('question_paper', 'content_version', "VARCHAR(32) NOT NULL DEFAULT ''"),
+    ('question', 'position', "INTEGER NOT NULL DEFAULT 0"),
+]
+
+
+def upgrade_schema(db):
+    """Adds any missing ADDED_COLUMNS. Safe to run from several workers at once."""
+    inspector = inspect(db.engine)
+    for table, column, ddl in ADDED_COLUMNS:
+        if column in {c['name'] for c in inspector.get_columns(table)}:
+            continue
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        except OperationalError:
+            # Another worker added it first.
+            if column not in {c['name'] for c in inspect(db.engine).get_columns(table)}:
+                raise
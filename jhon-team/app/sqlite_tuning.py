@@ -0,0 +1,53 @@
+from sqlalchemy import event
+
+
+def _is_memory_database(uri):
+    return uri in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in uri
+
+
+def sqlite_engine_options(config):
+    """
+    SQLAlchemy engine options for a file-backed SQLite database under concurrent
+    workers: a bounded connection pool and the driver-level lock timeout.
+    """
+    uri = config.get('SQLALCHEMY_DATABASE_URI', '')
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if not uri.startswith('sqlite') or _is_memory_database(uri):
+        return options
+
+    options.setdefault('pool_size', config.get('DB_POOL_SIZE', 5))
+    options.setdefault('max_overflow', config.get('DB_MAX_OVERFLOW', 10))
+    options.setdefault('pool_timeout', config.get('DB_POOL_TIMEOUT', 30))
+    options.setdefault('pool_pre_ping', True)
+    connect_args = dict(options.get('connect_args') or {})
+    connect_args.setdefault('timeout', config.get('SQLITE_BUSY_TIMEOUT_MS', 5000) / 1000)
+    options['connect_args'] = connect_args
+    return options
+
+
+def configure_sqlite(app, db):
+    """
+    Applies the SQLITE_* pragmas (WAL journal, synchronous level, busy timeout,
+    mmap size) to every new SQLite connection. Must run inside an app context
+    before the first connection is opened.
+    """
+    engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+
+    config = app.config
+    pragmas = [
+        f"PRAGMA busy_timeout={int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}",
+        f"PRAGMA synchronous={config.get('SQLITE_SYNCHRONOUS', 'NORMAL')}",
+        f"PRAGMA mmap_size={int(config.get('SQLITE_MMAP_SIZE', 268435456))}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if not _is_memory_database(str(engine.url)):
+        pragmas.insert(0, f"PRAGMA journal_mode={config.get('SQLITE_JOURNAL_MODE', 'WAL')}")
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
@@ -0,0 +1,111 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+
+
+class _InFlightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class CoalescingCache:
+    """
+    Request coalescing in front of an expensive call, plus a bounded TTL cache of
+    recent results. Concurrent callers with the same key share one in-flight call;
+    callers passing `use_cache=True` are answered from a fresh cached result
+    without calling at all. A result can be stored with the `state` it was computed
+    from; callers then pass `accept(state, value)` to decide whether it still applies.
+    `flight_key` (default: `key`) narrows which callers may join an in-flight call,
+    since `accept` only guards cached results.
+    """
+
+    def __init__(self, max_entries=512, ttl=600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(*parts):
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part if part is not None else '').encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def get_or_compute(self, key, compute, use_cache=False, state=None, accept=None, flight_key=None):
+        flight_key = key if flight_key is None else flight_key
+        with self._lock:
+            if use_cache:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > time.monotonic() and (accept is None or accept(entry[2], entry[1])):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+
+            call = self._in_flight.get(flight_key)
+            leader = call is None
+            if leader:
+                call = _InFlightCall()
+                self._in_flight[flight_key] = call
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = compute()
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl, call.value, state)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return call.value
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(flight_key, None)
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "in_flight": len(self._in_flight),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+            }
+
+
+regenerate_memo = None
+_regenerate_memo_lock = threading.Lock()
+
+
+def get_regenerate_memo():
+    global regenerate_memo
+    if regenerate_memo is None:
+        with _regenerate_memo_lock:
+            if regenerate_memo is None:
+                regenerate_memo = CoalescingCache(
+                    max_entries=current_app.config.get('REGENERATE_MEMO_SIZE', 512),
+                    ttl=current_app.config.get('REGENERATE_MEMO_TTL', 600)
+                )
+    return regenerate_memo
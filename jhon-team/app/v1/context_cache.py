@@ -0,0 +1,229 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from collections import Counter, OrderedDict
+from contextlib import closing
+from flask import current_app
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+from app import db
+from app.models import Question, QuestionPaper, new_content_version
+
+STOPWORDS = frozenset("""
+a an and are as at be by did do does for from how in is it its of on or the
+this that to was were what when where which who whom why with
+""".split())
+
+_word_re = re.compile(r"[a-z0-9']+")
+
+
+def _tokens(text):
+    return {word for word in _word_re.findall(text.lower()) if word not in STOPWORDS}
+
+
+class PaperContext:
+    """
+    The questions of one paper as sent to Gemini, plus the joined prompt text.
+    """
+
+    def __init__(self, paper_id, questions, version=None):
+        self.paper_id = paper_id
+        self.version = version
+        self.questions = questions
+        self.text = " ".join(text for _, text in questions)
+        self.digest = hashlib.sha1(self.text.encode('utf-8')).hexdigest()
+        self._token_sets = None
+
+    def digest_with(self, question_id, text):
+        """The digest this context would have if `question_id` read `text`."""
+        joined = " ".join(text if qid == question_id else current for qid, current in self.questions)
+        return hashlib.sha1(joined.encode('utf-8')).hexdigest()
+
+    def prompt_text(self, max_questions=0, focus_text=None):
+        """
+        Returns the whole paper, or when `max_questions` is set and the paper is larger,
+        only the `max_questions` most relevant questions in their original order.
+        Relevance is word overlap with `focus_text`, or how central a question's
+        vocabulary is to the paper when there is no focus.
+        """
+        if not max_questions or len(self.questions) <= max_questions:
+            return self.text
+
+        if self._token_sets is None:
+            self._token_sets = [_tokens(text) for _, text in self.questions]
+
+        if focus_text:
+            focus = _tokens(focus_text)
+            scores = [len(tokens & focus) / (len(tokens | focus) or 1) for tokens in self._token_sets]
+        else:
+            frequency = Counter(word for tokens in self._token_sets for word in tokens)
+            scores = [sum(frequency[word] for word in tokens) / (len(tokens) or 1) for tokens in self._token_sets]
+
+        ranked = sorted(range(len(self.questions)), key=lambda i: scores[i], reverse=True)[:max_questions]
+        return " ".join(self.questions[i][1] for i in sorted(ranked))
+
+
+class PaperContextCache:
+    """
+    LRU cache of PaperContext objects keyed by paper id, optionally backed by a
+    SQLite file so warm entries survive restarts and are shared between workers.
+    Every entry carries the paper's content_version and is only served to a caller
+    presenting the same version, so a change committed by any worker makes all
+    copies stale at once; entries cached from data read before that commit carry
+    the old version and can never be served afterwards.
+    """
+
+    def __init__(self, max_entries=256, db_path=None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if db_path:
+            with closing(self._connect()) as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS paper_context_versions "
+                    "(paper_id INTEGER PRIMARY KEY, version TEXT NOT NULL, questions TEXT NOT NULL)"
+                )
+                conn.commit()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def get(self, paper_id, version, loader):
+        """
+        Returns the cached context for `paper_id` at `version`, calling `loader(paper_id)`
+        for the [(question_id, text), ...] list on a miss or when the entry is older.
+        """
+        with self._lock:
+            context = self._entries.get(paper_id)
+            if context is not None and context.version == version:
+                self._entries.move_to_end(paper_id)
+                self.hits += 1
+                return context
+
+        questions = self._load_persisted(paper_id, version)
+        if questions is None:
+            questions = loader(paper_id)
+            self._persist(paper_id, version, questions)
+            with self._lock:
+                self.misses += 1
+        else:
+            with self._lock:
+                self.hits += 1
+
+        context = PaperContext(paper_id, questions, version)
+        with self._lock:
+            self._entries[paper_id] = context
+            self._entries.move_to_end(paper_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return context
+
+    def invalidate(self, *paper_ids):
+        with self._lock:
+            for paper_id in paper_ids:
+                self._entries.pop(paper_id, None)
+        if self.db_path and paper_ids:
+            with closing(self._connect()) as conn:
+                conn.executemany("DELETE FROM paper_context_versions WHERE paper_id = ?", [(pid,) for pid in paper_ids])
+                conn.commit()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+    def _load_persisted(self, paper_id, version):
+        if not self.db_path:
+            return None
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT questions FROM paper_context_versions WHERE paper_id = ? AND version = ?", (paper_id, version)
+            ).fetchone()
+        return [tuple(q) for q in json.loads(row[0])] if row else None
+
+    def _persist(self, paper_id, version, questions):
+        if not self.db_path:
+            return
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO paper_context_versions (paper_id, version, questions) VALUES (?, ?, ?)",
+                (paper_id, version, json.dumps(questions))
+            )
+            conn.commit()
+
+
+context_cache = None
+_context_cache_lock = threading.Lock()
+
+
+def get_context_cache():
+    global context_cache
+    if context_cache is None:
+        with _context_cache_lock:
+            if context_cache is None:
+                context_cache = PaperContextCache(
+                    max_entries=current_app.config.get('PAPER_CONTEXT_CACHE_SIZE', 256),
+                    db_path=current_app.config.get('PAPER_CONTEXT_CACHE_DB') or None
+                )
+    return context_cache
+
+
+def load_paper_questions(paper_id):
+    rows = db.session.query(Question.id, Question.text)\
+                     .filter(Question.question_paper_id == paper_id)\
+                     .order_by(Question.position, Question.id)\
+                     .all()
+    return [(question_id, text) for question_id, text in rows]
+
+
+def get_paper_context(paper_id):
+    # One primary-key read per call; the version and the questions come from the same
+    # transaction, so a context is never cached under a newer version than its data.
+    version = db.session.query(QuestionPaper.content_version).filter(QuestionPaper.id == paper_id).scalar()
+    return get_context_cache().get(paper_id, version, load_paper_questions)
+
+
+# Questions changed through the ORM give their paper a new content_version in the same
+# flush, which retires cached contexts in every worker. The committing worker also
+# drops its own entries (and the shared SQLite rows) right after the commit.
+
+@event.listens_for(Session, 'before_flush')
+def _bump_changed_paper_versions(session, flush_context, instances):
+    changed = set()
+    for obj in (*session.new, *session.deleted):
+        if isinstance(obj, Question) and obj.question_paper_id is not None:
+            changed.add(obj.question_paper_id)
+    for obj in session.dirty:
+        if isinstance(obj, Question) and obj.question_paper_id is not None and session.is_modified(obj):
+            changed.add(obj.question_paper_id)
+    if changed:
+        session.connection().execute(
+            update(QuestionPaper.__table__)
+            .where(QuestionPaper.__table__.c.id.in_(changed))
+            .values(content_version=new_content_version())
+        )
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_papers(session, flush_context):
+    changed = session.info.setdefault('changed_paper_ids', set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Question) and obj.question_paper_id is not None:
+            changed.add(obj.question_paper_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_papers(session):
+    changed = session.info.pop('changed_paper_ids', None)
+    if changed and context_cache is not None:
+        context_cache.invalidate(*changed)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_papers(session):
+    session.info.pop('changed_paper_ids', None)
@@ -0,0 +1,225 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+from flask import current_app
+
+
+class GeminiError(Exception):
+    pass
+
+
+class GeminiRateLimited(GeminiError):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value):
+    """
+    Seconds to wait from a Retry-After header: delta-seconds or an HTTP-date.
+    None when the header is missing or unparseable.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class KeyState:
+    """
+    Scheduling state and the HTTP session for a single Gemini API key.
+    """
+
+    def __init__(self, api_key, pool_size):
+        self.api_key = api_key
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.last_used = 0.0
+        self.recent = deque()
+        self.requests = 0
+        self.rate_limited = 0
+        self.failures = 0
+
+    @property
+    def label(self):
+        return f"...{self.api_key[-4:]}"
+
+    def ready_at(self, now, rpm_limit, max_in_flight):
+        """
+        Returns `now` if the key can take a request, otherwise the earliest time it
+        might (None when it is only waiting on an in-flight request to finish).
+        """
+        while self.recent and now - self.recent[0] >= 60:
+            self.recent.popleft()
+
+        ready = now
+        if self.cooldown_until > now:
+            ready = self.cooldown_until
+        if rpm_limit and len(self.recent) >= rpm_limit:
+            ready = max(ready, self.recent[0] + 60)
+        if ready == now and self.in_flight >= max_in_flight:
+            return None
+        return ready
+
+
+class GeminiKeyPool:
+    """
+    Dispatches Gemini generateContent calls over a pool of API keys.
+
+    Each key keeps its own keep-alive HTTP session, a requests-per-minute budget,
+    a cooldown after 429 responses and an in-flight count. Requests go to the
+    available key with the fewest in-flight calls (least recently used on ties),
+    and callers block until a key frees up. Safe to share between threads; use
+    `generate_async` from asyncio code.
+    """
+
+    def __init__(self, api_keys, model='gemini-1.5-flash', endpoint='https://generativelanguage.googleapis.com',
+                 rpm_limit=0, max_in_flight_per_key=4, cooldown=30, max_cooldown=300, timeout=60, acquire_timeout=30):
+        keys = [key.strip() for key in api_keys if key and key.strip()]
+        if not keys:
+            raise ValueError("GEMINI_API_KEYS not configured or all keys are empty in config.py")
+
+        self.url = f"{endpoint.rstrip('/')}/v1beta/models/{model}:generateContent"
+        self.rpm_limit = rpm_limit
+        self.max_in_flight_per_key = max_in_flight_per_key
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.timeout = timeout
+        self.acquire_timeout = acquire_timeout
+        self._keys = [KeyState(key, max_in_flight_per_key) for key in keys]
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=len(keys) * max_in_flight_per_key, thread_name_prefix='gemini')
+
+    def acquire(self):
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                ready_times = []
+                candidates = []
+                for key in self._keys:
+                    ready = key.ready_at(now, self.rpm_limit, self.max_in_flight_per_key)
+                    if ready == now:
+                        candidates.append(key)
+                    elif ready is not None:
+                        ready_times.append(ready)
+
+                if candidates:
+                    key = min(candidates, key=lambda k: (k.in_flight, k.last_used))
+                    key.in_flight += 1
+                    key.last_used = now
+                    key.recent.append(now)
+                    key.requests += 1
+                    return key
+
+                if now >= deadline:
+                    raise GeminiError("No Gemini API key became available before the acquire timeout.")
+                wake_at = min(ready_times + [deadline])
+                self._cond.wait(max(wake_at - now, 0.001))
+
+    def release(self, key, rate_limited=False, retry_after=None, failed=False):
+        with self._cond:
+            key.in_flight -= 1
+            if rate_limited:
+                key.rate_limited += 1
+                # Retry-After is honoured, but one bad header must not park a key for hours.
+                rest = self.cooldown if retry_after is None else retry_after
+                key.cooldown_until = time.monotonic() + min(rest, self.max_cooldown)
+            elif failed:
+                key.failures += 1
+            self._cond.notify_all()
+
+    def _request(self, key, prompt):
+        response = key.session.post(
+            self.url,
+            json={"contents": [{"parts": [{"text": prompt}]}]},
+            headers={"x-goog-api-key": key.api_key},
+            timeout=self.timeout
+        )
+        if response.status_code == 429:
+            raise GeminiRateLimited("Gemini API rate limit exceeded.", parse_retry_after(response.headers.get('Retry-After')))
+        response.raise_for_status()
+
+        data = response.json()
+        candidates = data.get('candidates') or []
+        parts = candidates[0].get('content', {}).get('parts', []) if candidates else []
+        if not parts:
+            block_reason = data.get('promptFeedback', {}).get('blockReason')
+            raise GeminiError(f"Gemini API returned no parts. Finish Reason: {block_reason}")
+        return "".join(part.get('text', '') for part in parts).strip()
+
+    def generate(self, prompt, retries=2):
+        for _ in range(retries):
+            key = self.acquire()
+            print(f"--- Attempting Gemini API call with key ending in {key.label} ---")
+            try:
+                text = self._request(key, prompt)
+            except GeminiRateLimited as e:
+                print(f"Gemini API key ending in {key.label} was rate limited, cooling down.")
+                self.release(key, rate_limited=True, retry_after=e.retry_after)
+                continue
+            except Exception as e:
+                print(f"An error occurred during Gemini API call: {e}")
+                self.release(key, failed=True)
+                continue
+            self.release(key)
+            return text
+
+        raise GeminiError("Failed to get a valid response from Gemini API after multiple retries.")
+
+    async def generate_async(self, prompt, retries=2):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.generate, prompt, retries)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._cond:
+            return [
+                {
+                    "key": key.label,
+                    "in_flight": key.in_flight,
+                    "requests": key.requests,
+                    "rate_limited": key.rate_limited,
+                    "failures": key.failures,
+                    "cooling_down_for": round(max(key.cooldown_until - now, 0), 1),
+                }
+                for key in self._keys
+            ]
+
+
+gemini_pool = None
+_gemini_pool_lock = threading.Lock()
+
+
+def get_gemini_pool():
+    global gemini_pool
+    if gemini_pool is None:
+        with _gemini_pool_lock:
+            if gemini_pool is None:
+                config = current_app.config
+                gemini_pool = GeminiKeyPool(
+                    config.get('GEMINI_API_KEYS') or [],
+                    model=config.get('GEMINI_MODEL', 'gemini-1.5-flash'),
+                    endpoint=config.get('GEMINI_API_ENDPOINT', 'https://generativelanguage.googleapis.com'),
+                    rpm_limit=config.get('GEMINI_KEY_RPM_LIMIT', 0),
+                    max_in_flight_per_key=config.get('GEMINI_KEY_MAX_IN_FLIGHT', 4),
+                    cooldown=config.get('GEMINI_KEY_COOLDOWN', 30),
+                    max_cooldown=config.get('GEMINI_KEY_MAX_COOLDOWN', 300),
+                    timeout=config.get('GEMINI_TIMEOUT', 60),
+                    acquire_timeout=config.get('GEMINI_ACQUIRE_TIMEOUT', 30)
+                )
+    return gemini_pool
@@ -0,0 +1,279 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from flask import current_app
+
+TERMINAL_STATUSES = ('completed', 'failed')
+
+
+class JobFailed(Exception):
+    """
+    Raised by a job function to fail the job while still recording a result.
+    """
+
+    def __init__(self, message, result=None):
+        super().__init__(message)
+        self.result = result
+
+
+class Job:
+    FIELDS = ('id', 'kind', 'status', 'total', 'completed', 'failed', 'result', 'error', 'created_at', 'updated_at', 'version')
+
+    def __init__(self, kind, total=0):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = 'queued'
+        self.total = total
+        self.completed = 0
+        self.failed = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.version = 0
+
+    @classmethod
+    def from_row(cls, row):
+        job = cls.__new__(cls)
+        for name, value in zip(cls.FIELDS, row):
+            setattr(job, name, value)
+        job.result = json.loads(job.result) if job.result is not None else None
+        return job
+
+    @property
+    def finished(self):
+        return self.status in TERMINAL_STATUSES
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class JobStore:
+    """
+    In-process registry of background jobs. Every update bumps the job's version
+    so readers can block until something changes.
+    """
+
+    def __init__(self, max_finished=1000):
+        self.max_finished = max_finished
+        self._jobs = {}
+        self._cond = threading.Condition()
+
+    def create(self, kind, total=0):
+        job = Job(kind, total)
+        with self._cond:
+            self._jobs[job.id] = job
+            self._prune()
+        return job
+
+    def get(self, job_id):
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def update(self, job_id, **fields):
+        with self._cond:
+            job = self._jobs[job_id]
+            for name, value in fields.items():
+                setattr(job, name, value)
+            job.updated_at = time.time()
+            job.version += 1
+            self._cond.notify_all()
+            return job
+
+    def wait(self, job_id, after_version, timeout):
+        """
+        Blocks until the job's version exceeds `after_version`, it finishes, or
+        `timeout` seconds pass. Returns the job (None if unknown).
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None or job.version > after_version or job.finished:
+                    return job
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return job
+                self._cond.wait(remaining)
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.finished]
+        if len(finished) > self.max_finished:
+            finished.sort(key=lambda job: job.updated_at)
+            for job in finished[:len(finished) - self.max_finished]:
+                del self._jobs[job.id]
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Job registry kept in a SQLite file, so a job started by one worker process can
+    be polled through any other. Waiting polls the file every `poll_interval` seconds.
+    """
+
+    def __init__(self, path, max_finished=1000, poll_interval=0.1):
+        super().__init__(max_finished)
+        self.path = path
+        self.poll_interval = poll_interval
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job (
+                    id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL,
+                    total INTEGER NOT NULL, completed INTEGER NOT NULL, failed INTEGER NOT NULL,
+                    result TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL,
+                    version INTEGER NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_job_status_updated_at ON job (status, updated_at)")
+            conn.commit()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def create(self, kind, total=0):
+        job = Job(kind, total)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                f"INSERT INTO job ({', '.join(Job.FIELDS)}) VALUES ({', '.join('?' * len(Job.FIELDS))})",
+                [getattr(job, name) for name in Job.FIELDS]
+            )
+            conn.execute(
+                "DELETE FROM job WHERE status IN ('completed', 'failed') AND id NOT IN "
+                "(SELECT id FROM job WHERE status IN ('completed', 'failed') ORDER BY updated_at DESC LIMIT ?)",
+                (self.max_finished,)
+            )
+            conn.commit()
+        return job
+
+    def get(self, job_id):
+        with closing(self._connect()) as conn:
+            row = conn.execute(f"SELECT {', '.join(Job.FIELDS)} FROM job WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row else None
+
+    def update(self, job_id, **fields):
+        if 'result' in fields:
+            fields['result'] = json.dumps(fields['result']) if fields['result'] is not None else None
+        fields['updated_at'] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                f"UPDATE job SET {assignments}, version = version + 1 WHERE id = ?",
+                [*fields.values(), job_id]
+            )
+            conn.commit()
+        with self._cond:
+            self._cond.notify_all()
+        return self.get(job_id)
+
+    def wait(self, job_id, after_version, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job.version > after_version or job.finished:
+                return job
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return job
+            with self._cond:
+                self._cond.wait(min(self.poll_interval, remaining))
+
+
+def wait_for_job(store, job_id, timeout):
+    """
+    Long-polls until the job finishes or `timeout` seconds pass.
+    """
+    deadline = time.monotonic() + timeout
+    job = store.get(job_id)
+    while job is not None and not job.finished:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        job = store.wait(job_id, job.version, remaining)
+    return job
+
+
+class JobQueue:
+    """
+    A fixed pool of worker threads running job functions inside an app context.
+    `fn(job_id, *args)` is called on a worker; its return value becomes the job's
+    result, and any exception fails the job.
+    """
+
+    def __init__(self, app, store, workers=4):
+        self.app = app
+        self.store = store
+        self._queue = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, kind, fn, *args, total=0):
+        job = self.store.create(kind, total=total)
+        self._queue.put((job.id, fn, args))
+        return job
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _work(self):
+        while True:
+            job_id, fn, args = self._queue.get()
+            try:
+                self.store.update(job_id, status='running')
+                with self.app.app_context():
+                    result = fn(job_id, *args)
+                self.store.update(job_id, status='completed', result=result)
+            except JobFailed as e:
+                self.store.update(job_id, status='failed', error=str(e), result=e.result)
+            except Exception as e:
+                self.store.update(job_id, status='failed', error=str(e))
+            finally:
+                self._queue.task_done()
+
+
+job_store = None
+job_queue = None
+_jobs_lock = threading.Lock()
+
+
+def get_job_store():
+    global job_store
+    if job_store is None:
+        with _jobs_lock:
+            if job_store is None:
+                path = current_app.config.get('JOB_STORE_PATH')
+                max_finished = current_app.config.get('JOB_STORE_MAX_FINISHED', 1000)
+                job_store = SQLiteJobStore(path, max_finished) if path else JobStore(max_finished)
+    return job_store
+
+
+def get_job_queue():
+    global job_queue
+    if job_queue is None:
+        store = get_job_store()
+        with _jobs_lock:
+            if job_queue is None:
+                job_queue = JobQueue(
+                    current_app._get_current_object(),
+                    store,
+                    workers=current_app.config.get('JOB_WORKERS', 4)
+                )
+    return job_queue
@@ -0,0 +1,66 @@
+import threading
+import spacy
+from flask import current_app
+
+NLP_MODES = ('full', 'senter', 'sentencizer')
+
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+def load_pipeline(mode='full', model_name='en_core_web_sm'):
+    """
+    Builds a spaCy pipeline for the given ingestion mode.
+    'full' loads every component, 'senter' keeps only the statistical sentence
+    recognizer and 'sentencizer' uses the rule-based splitter on a blank pipeline.
+    """
+    if mode == 'full':
+        return spacy.load(model_name)
+
+    if mode == 'senter':
+        nlp = spacy.load(model_name, exclude=['tok2vec', 'tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'ner'])
+        nlp.enable_pipe('senter')
+        return nlp
+
+    if mode == 'sentencizer':
+        nlp = spacy.blank(model_name.split('_')[0])
+        nlp.add_pipe('sentencizer')
+        return nlp
+
+    raise ValueError(f"Unknown NLP ingest mode '{mode}'. Expected one of: {', '.join(NLP_MODES)}")
+
+
+def get_nlp(mode=None):
+    """
+    Returns the process-wide pipeline for the configured mode, loading it on first use.
+    """
+    mode = mode or current_app.config.get('NLP_INGEST_MODE', 'full')
+    nlp = _pipelines.get(mode)
+    if nlp is not None:
+        return nlp
+
+    with _pipelines_lock:
+        nlp = _pipelines.get(mode)
+        if nlp is None:
+            model_name = current_app.config.get('SPACY_MODEL', 'en_core_web_sm')
+            nlp = load_pipeline(mode, model_name)
+            _pipelines[mode] = nlp
+    return nlp
+
+
+def sentences_from_doc(doc):
+    return [sent.text.strip() for sent in doc.sents if sent.text.strip()]
+
+
+def split_into_questions(text_content):
+    return sentences_from_doc(get_nlp()(text_content))
+
+
+def pipe_questions(items, batch_size=64, n_process=1):
+    """
+    Streams (text, context) tuples through nlp.pipe and yields (questions, context)
+    as each document finishes, preserving input order.
+    """
+    nlp = get_nlp()
+    for doc, context in nlp.pipe(items, as_tuples=True, batch_size=batch_size, n_process=n_process):
+        yield sentences_from_doc(doc), context
@@ -1,8 +1,14 @@
-from flask import request, jsonify, Blueprint
+import json
+from flask import request, jsonify, Blueprint, Response, stream_with_context, current_app, url_for
+from werkzeug.exceptions import NotFound
 from . import services
-from .schemas import user_schema, question_paper_schema, question_papers_schema, question_schema
+from .schemas import user_schema, question_paper_schema, question_papers_schema, question_paper_summaries_schema, question_schema
 from app import db
 from app.models import User
+from .jobs import get_job_store, get_job_queue, wait_for_job
+from .coalesce import get_regenerate_memo
+from .context_cache import get_context_cache
+from . import gemini
 
 from . import api_v1_bp
 
@@ -104,20 +110,178 @@ def create_paper_for_user_route(user_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 404
 
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl', 'application/ndjson')
+
+def _iter_ndjson_papers(stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+@api_v1_bp.route('/users/<int:user_id>/papers/bulk', methods=['POST'])
+def import_papers_for_user_route(user_id):
+    """
+    Bulk-import many question papers for a user in one request.
+    The body is either a JSON array of papers or NDJSON (one paper object per line,
+    sent with Content-Type application/x-ndjson). Papers are segmented in batches and
+    one NDJSON result line is streamed back per paper as soon as it has been saved.
+    ---
+    tags:
+      - Question Papers
+    summary: Bulk-import question papers for a user.
+    parameters:
+      - name: user_id
+        in: path
+        type: integer
+        required: true
+        description: The ID of the user who will own the papers.
+      - name: batch_size
+        in: query
+        type: integer
+        required: false
+        minimum: 1
+        description: Number of documents spaCy processes per batch (defaults to NLP_PIPE_BATCH_SIZE). The number of spaCy worker processes is set by NLP_PIPE_N_PROCESS on the server.
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: array
+          items:
+            type: object
+            required:
+              - content
+            properties:
+              title:
+                type: string
+                example: "World History Midterm"
+              content:
+                type: string
+                example: "What was the primary cause of World War I? Who led the Soviet Union during the Cuban Missile Crisis?"
+    responses:
+      200:
+        description: NDJSON stream with one line per paper, e.g. {"index":0,"title":"...","paper_id":7,"question_count":12} or {"index":1,"error":"..."}.
+      400:
+        description: Bad request (e.g., the body is not a JSON array, or batch_size is below 1).
+      404:
+        description: User not found.
+    """
+    batch_size = request.args.get('batch_size', type=int)
+    if batch_size is not None and batch_size < 1:
+        return jsonify({"error": "batch_size must be a positive integer."}), 400
+
+    try:
+        services.get_user_by_id(user_id)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 404
+
+    if request.mimetype in NDJSON_MIMETYPES:
+        papers = _iter_ndjson_papers(request.stream)
+    else:
+        papers = request.get_json(silent=True)
+        if not isinstance(papers, list):
+            return jsonify({"error": "Expected a JSON array of papers or an NDJSON body."}), 400
+
+    results = services.import_papers_for_user(
+        user_id=user_id,
+        papers=papers,
+        batch_size=batch_size
+    )
+    lines = (json.dumps(result) + "\n" for result in results)
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
+@api_v1_bp.route('/papers/<int:paper_id>', methods=['PUT'])
+def update_paper(paper_id):
+    """
+    Update a question paper from edited text content.
+    Only the parts of the text that changed are re-segmented. Unchanged questions keep
+    their ids, edited questions are updated in place, and only added or removed
+    sentences create or delete questions.
+    ---
+    tags:
+      - Question Papers
+    summary: Incrementally update a question paper's content.
+    parameters:
+      - name: paper_id
+        in: path
+        type: integer
+        required: true
+        description: The ID of the paper to update.
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - content
+          properties:
+            title:
+              type: string
+              description: A new title for the paper (optional).
+              example: "World History Midterm (revised)"
+            content:
+              type: string
+              description: The full, edited text content of the paper.
+              example: "What was the primary cause of World War I? Who led the Soviet Union in 1962?"
+    responses:
+      200:
+        description: Paper updated. `changes` counts unchanged, updated, inserted and deleted questions.
+        schema:
+          $ref: '#/definitions/QuestionPaper'
+      400:
+        description: Bad request (e.g., content is missing).
+      404:
+        description: Paper not found.
+      500:
+        description: Processing failure.
+    """
+    data = request.get_json(silent=True)
+    if not data or not data.get('content'):
+        return jsonify({"error": "The 'content' field is required."}), 400
+
+    try:
+        paper, changes = services.update_paper_content(paper_id, data.get('content'), data.get('title'))
+    except NotFound as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify(dict(question_paper_schema.dump(paper), changes=changes)), 200
+
 @api_v1_bp.route('/users/<int:user_id>/papers', methods=['GET'])
 def get_user_papers(user_id):
     """
-    List all question papers belonging to a specific user.
+    List the question papers belonging to a specific user.
+    Results are ordered by paper id and can be paged with `after_id` and `limit`;
+    when a page is full the `X-Next-After-Id` response header holds the cursor for the next one.
     ---
     tags:
       - Question Papers
-    summary: Retrieve all papers for a user.
+    summary: Retrieve papers for a user.
     parameters:
       - name: user_id
         in: path
         type: integer
         required: true
         description: The ID of the user whose papers are to be retrieved.
+      - name: after_id
+        in: query
+        type: integer
+        required: false
+        description: Only return papers with an id greater than this cursor.
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Maximum number of papers to return (capped at PAPERS_PAGE_MAX_LIMIT). All papers are returned when omitted.
+      - name: summary
+        in: query
+        type: boolean
+        required: false
+        description: Return each paper with a `question_count` instead of its nested questions.
     responses:
       200:
         description: A list of the user's question papers.
@@ -125,15 +289,52 @@ def get_user_papers(user_id):
           type: array
           items:
             $ref: '#/definitions/QuestionPaper'
+      400:
+        description: Bad request (e.g., limit is not a positive integer).
       404:
         description: User not found.
     """
+    after_id = request.args.get('after_id', type=int)
+    limit = request.args.get('limit', type=int)
+    summary = request.args.get('summary', 'false').lower() in ('1', 'true', 'yes')
+
+    if limit is not None:
+        if limit < 1:
+            return jsonify({"error": "'limit' must be a positive integer."}), 400
+        limit = min(limit, current_app.config.get('PAPERS_PAGE_MAX_LIMIT', 100))
+
     try:
-        papers = services.get_all_papers_for_user(user_id)
-        return jsonify(question_papers_schema.dump(papers)), 200
+        papers = services.get_all_papers_for_user(user_id, after_id=after_id, limit=limit, summary=summary)
     except Exception as e:
         return jsonify({"error": str(e)}), 404
 
+    schema = question_paper_summaries_schema if summary else question_papers_schema
+    response = jsonify(schema.dump(papers))
+    if limit and len(papers) == limit:
+        response.headers['X-Next-After-Id'] = str(papers[-1].id)
+    return response, 200
+
+def _wants_async():
+    """
+    Whether an LLM-backed request should be queued as a job and answered with 202.
+    """
+    if 'async' in request.args:
+        return request.args.get('async', '').lower() in ('1', 'true', 'yes')
+    if 'respond-async' in request.headers.get('Prefer', ''):
+        return True
+    return current_app.config.get('LLM_ASYNC_MODE', False)
+
+def _job_accepted(job):
+    response = jsonify(job.to_dict())
+    response.headers['Location'] = url_for('api_v1_bp.get_job', job_id=job.id)
+    return response, 202
+
+def _regenerate_question_job(job_id, paper_id, question_id, extra_prompt, reuse_cached):
+    return question_schema.dump(services.regenerate_question_with_gemini(paper_id, question_id, extra_prompt, reuse_cached))
+
+def _generate_question_job(job_id, paper_id):
+    return question_schema.dump(services.generate_new_question_from_context(paper_id))
+
 @api_v1_bp.route('/papers/<int:paper_id>/questions/<int:question_id>/regenerate', methods=['PUT'])
 def regenerate_question(paper_id, question_id):
     """
@@ -154,6 +355,11 @@ def regenerate_question(paper_id, question_id):
         type: integer
         required: true
         description: The ID of the question to regenerate.
+      - name: async
+        in: query
+        type: boolean
+        required: false
+        description: Queue the LLM call as a background job and answer 202 with the job (also enabled by the `Prefer: respond-async` header or LLM_ASYNC_MODE).
       - in: body
         name: body
         schema:
@@ -163,21 +369,42 @@ def regenerate_question(paper_id, question_id):
               type: string
               description: "A specific instruction to guide the AI, e.g., 'Make it easier' or 'Focus on the year 1929'."
               example: "Rephrase this for a 5th-grade student."
+            reuse_cached:
+              type: boolean
+              description: Reuse a recent AI result for the same paper, question and extra_prompt instead of calling the model again.
+              example: false
     responses:
       200:
         description: Question regenerated successfully.
         schema:
           $ref: '#/definitions/Question'
+      202:
+        description: Job accepted (async mode). Its result is the regenerated Question.
+        schema:
+          $ref: '#/definitions/Job'
+      400:
+        description: reuse_cached is not a boolean.
       404:
         description: Paper or question not found.
       500:
         description: AI service error or other processing failure.
     """
-    data = request.get_json() or {}
+    data = request.get_json(silent=True) or {}
     extra_prompt = data.get('extra_prompt')
+    reuse_cached = data.get('reuse_cached', False)
+    if not isinstance(reuse_cached, bool):
+        return jsonify({"error": "reuse_cached must be a boolean."}), 400
+
+    if _wants_async():
+        try:
+            services.get_question_in_paper(paper_id, question_id)
+        except NotFound as e:
+            return jsonify({"error": str(e)}), 404
+        job = get_job_queue().submit('regenerate_question', _regenerate_question_job, paper_id, question_id, extra_prompt, reuse_cached)
+        return _job_accepted(job)
 
     try:
-        updated_question = services.regenerate_question_with_gemini(paper_id, question_id, extra_prompt)
+        updated_question = services.regenerate_question_with_gemini(paper_id, question_id, extra_prompt, reuse_cached)
         return jsonify(question_schema.dump(updated_question)), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -197,28 +424,216 @@ def generate_new_question(paper_id):
         type: integer
         required: true
         description: The ID of the paper to use as context for generating a new question.
+      - name: async
+        in: query
+        type: boolean
+        required: false
+        description: Queue the LLM call as a background job and answer 202 with the job (also enabled by the `Prefer: respond-async` header or LLM_ASYNC_MODE).
     responses:
       201:
         description: New question generated and added to the paper successfully.
         schema:
           $ref: '#/definitions/Question'
+      202:
+        description: Job accepted (async mode). Its result is the new Question.
+        schema:
+          $ref: '#/definitions/Job'
       404:
         description: Paper not found.
       500:
         description: AI service error or other processing failure.
     """
+    if _wants_async():
+        try:
+            services.get_paper_by_id(paper_id)
+        except NotFound as e:
+            return jsonify({"error": str(e)}), 404
+        job = get_job_queue().submit('generate_question', _generate_question_job, paper_id)
+        return _job_accepted(job)
+
     try:
         new_question = services.generate_new_question_from_context(paper_id)
         return jsonify(question_schema.dump(new_question)), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@api_v1_bp.route('/papers/<int:paper_id>/questions/regenerate', methods=['POST'])
+def regenerate_paper_questions(paper_id):
+    """
+    Start a background job that regenerates every question of a paper.
+    Questions are rephrased concurrently from one shared paper context and written
+    back in a single transaction; questions edited or deleted meanwhile are skipped.
+    Poll the returned job, or stream its progress.
+    ---
+    tags:
+      - Questions
+    summary: Regenerate all questions of a paper using AI.
+    parameters:
+      - name: paper_id
+        in: path
+        type: integer
+        required: true
+        description: The ID of the paper whose questions should be regenerated.
+      - in: body
+        name: body
+        schema:
+          type: object
+          properties:
+            extra_prompt:
+              type: string
+              description: "An instruction applied to every question, e.g. 'Make them easier'."
+              example: "Rephrase these for 5th-grade students."
+    responses:
+      202:
+        description: Job accepted. The Location header points at the job.
+        schema:
+          $ref: '#/definitions/Job'
+      404:
+        description: Paper not found.
+      500:
+        description: The paper is empty or the job could not be started.
+    """
+    data = request.get_json(silent=True) or {}
+
+    try:
+        job = services.start_paper_regeneration(paper_id, data.get('extra_prompt'))
+    except NotFound as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    return _job_accepted(job)
+
+@api_v1_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Get the status and progress of a background job.
+    With `wait`, the request is held open until the job finishes or the timeout passes (long-polling).
+    ---
+    tags:
+      - Jobs
+    summary: Poll a background job.
+    parameters:
+      - name: job_id
+        in: path
+        type: string
+        required: true
+        description: The ID returned when the job was started.
+      - name: wait
+        in: query
+        type: number
+        required: false
+        description: Seconds to wait for the job to finish (capped at JOB_LONG_POLL_MAX).
+    responses:
+      200:
+        description: The job's current state.
+        schema:
+          $ref: '#/definitions/Job'
+      404:
+        description: Job not found.
+    """
+    wait = request.args.get('wait', 0, type=float)
+    wait = min(max(wait, 0), current_app.config.get('JOB_LONG_POLL_MAX', 30))
+
+    store = get_job_store()
+    job = wait_for_job(store, job_id, wait) if wait else store.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job '{job_id}' not found."}), 404
+    return jsonify(job.to_dict()), 200
+
+@api_v1_bp.route('/jobs/<job_id>/stream', methods=['GET'])
+def stream_job(job_id):
+    """
+    Stream a background job's progress as Server-Sent Events.
+    A `progress` event is sent whenever the job changes and a final `done` event when it finishes.
+    ---
+    tags:
+      - Jobs
+    summary: Stream a background job's progress.
+    parameters:
+      - name: job_id
+        in: path
+        type: string
+        required: true
+        description: The ID returned when the job was started.
+    responses:
+      200:
+        description: A text/event-stream of job snapshots.
+      404:
+        description: Job not found.
+    """
+    store = get_job_store()
+    if store.get(job_id) is None:
+        return jsonify({"error": f"Job '{job_id}' not found."}), 404
+
+    def events():
+        version = -1
+        while True:
+            job = store.wait(job_id, version, timeout=15)
+            if job is None:
+                return
+            if job.version == version and not job.finished:
+                yield ": keep-alive\n\n"
+                continue
+            version = job.version
+            event = 'done' if job.finished else 'progress'
+            yield f"event: {event}\ndata: {json.dumps(job.to_dict())}\n\n"
+            if job.finished:
+                return
+
+    return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+@api_v1_bp.route('/stats', methods=['GET'])
+def get_stats():
+    """
+    Cache and AI usage counters for this server process.
+    ---
+    tags:
+      - Stats
+    summary: Get cache hit/miss counters and Gemini key usage.
+    responses:
+      200:
+        description: Counters for the regenerate memo, the paper context cache and each Gemini key.
+    """
+    return jsonify({
+        "regenerate_memo": get_regenerate_memo().stats(),
+        "paper_context_cache": get_context_cache().stats(),
+        "gemini_keys": gemini.gemini_pool.stats() if gemini.gemini_pool is not None else []
+    }), 200
+
 @api_v1_bp.route('/schemas', methods=['GET'])
 def get_schemas():
     """
     This endpoint is hidden and used by Flasgger to define the API's data schemas.
     ---
     definitions:
+      Job:
+        type: object
+        properties:
+          id:
+            type: string
+            description: The unique identifier for the job.
+          kind:
+            type: string
+            description: What the job does, e.g. regenerate_paper.
+          status:
+            type: string
+            enum: [queued, running, completed, failed]
+          total:
+            type: integer
+            description: Number of work items in the job.
+          completed:
+            type: integer
+            description: Work items finished successfully so far.
+          failed:
+            type: integer
+            description: Work items that failed so far.
+          result:
+            type: object
+            description: The job's output once it has finished.
+          error:
+            type: string
+            description: Why the job failed, if it did.
       User:
         type: object
         properties:
@@ -18,7 +18,17 @@ class QuestionPaperSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = QuestionPaper
         load_instance = True
-        include_fk = True 
+        include_fk = True
+        exclude = ("content_version",)
+
+class QuestionPaperSummarySchema(ma.SQLAlchemyAutoSchema):
+    question_count = ma.Integer(dump_only=True)
+
+    class Meta:
+        model = QuestionPaper
+        load_instance = True
+        include_fk = True
+        exclude = ("content_version",)
 
 user_schema = UserSchema()
 users_schema = UserSchema(many=True)
@@ -27,4 +37,5 @@ question_schema = QuestionSchema()
 questions_schema = QuestionSchema(many=True)
 
 question_paper_schema = QuestionPaperSchema()
-question_papers_schema = QuestionPaperSchema(many=True)
\ No newline at end of file
+question_papers_schema = QuestionPaperSchema(many=True)
+question_paper_summaries_schema = QuestionPaperSummarySchema(many=True)
\ No newline at end of file
@@ -1,30 +1,56 @@
-import spacy
-import itertools
+import hashlib
+from difflib import SequenceMatcher
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from flask import current_app
 from app import db
 from app.models import User, Question, QuestionPaper
-import google.generativeai as genai
 import random
+from sqlalchemy import insert, func
+from sqlalchemy.orm import selectinload
+from sqlalchemy.exc import SQLAlchemyError
+from .nlp import split_into_questions, pipe_questions
+from .context_cache import get_paper_context
+from .gemini import get_gemini_pool
+from .coalesce import get_regenerate_memo
+from .jobs import get_job_store, get_job_queue, JobFailed
 
-api_key_cycler = None
+def get_user_by_id(user_id):
+    return User.query.get_or_404(user_id)
 
-def get_gemini_key_cycler():
-    global api_key_cycler
-    if api_key_cycler is None:
-        keys = current_app.config.get('GEMINI_API_KEYS')
-        if not keys or not any(keys):
-            raise ValueError("GEMINI_API_KEYS not configured or all keys are empty in config.py")
-        api_key_cycler = itertools.cycle(keys)
-    return api_key_cycler
+def get_paper_by_id(paper_id):
+    return QuestionPaper.query.get_or_404(paper_id)
 
-nlp = spacy.load("en_core_web_sm")
+def get_question_in_paper(paper_id, question_id):
+    paper = get_paper_by_id(paper_id)
+    return Question.query.with_parent(paper).filter(Question.id == question_id).first_or_404()
 
-def get_user_by_id(user_id):
-    return User.query.get_or_404(user_id)
+def get_all_papers_for_user(user_id, after_id=None, limit=None, summary=False):
+    """
+    Lists a user's papers ordered by id, using keyset pagination (`after_id`, `limit`).
+    Questions are eager-loaded in one extra SELECT; with `summary=True` they are not
+    loaded at all and each paper gets a `question_count` attribute instead.
+    """
+    get_user_by_id(user_id)
 
-def get_all_papers_for_user(user_id):
-    user = get_user_by_id(user_id)
-    return user.papers
+    query = QuestionPaper.query.filter(QuestionPaper.user_id == user_id)
+    if after_id is not None:
+        query = query.filter(QuestionPaper.id > after_id)
+    query = query.order_by(QuestionPaper.id)
+    if limit:
+        query = query.limit(limit)
+
+    if not summary:
+        return query.options(selectinload(QuestionPaper.questions)).all()
+
+    question_count = db.session.query(func.count(Question.id))\
+                               .filter(Question.question_paper_id == QuestionPaper.id)\
+                               .correlate(QuestionPaper)\
+                               .scalar_subquery()
+    papers = []
+    for paper, count in query.add_columns(question_count.label('question_count')).all():
+        paper.question_count = count
+        papers.append(paper)
+    return papers
 
 def create_paper_for_user(user_id, title, text_content):
     user = get_user_by_id(user_id)
@@ -34,56 +60,166 @@ def create_paper_for_user(user_id, title, text_content):
     new_paper = QuestionPaper(title=title, owner=user)
     db.session.add(new_paper)
     
-    doc = nlp(text_content)
-    for sent in doc.sents:
-        if sent.text.strip():
-            question = Question(text=sent.text.strip(), paper=new_paper)
-            db.session.add(question)
+    for position, sentence in enumerate(split_into_questions(text_content)):
+        question = Question(text=sentence, paper=new_paper, position=position)
+        db.session.add(question)
     
     db.session.commit()
     return new_paper
 
-def _call_gemini_api(prompt, retries=2):
+def _content_hash(text):
+    return hashlib.sha1(" ".join(text.split()).encode('utf-8')).hexdigest()
+
+def _is_boundary(text, start, end):
+    return (start == 0 or text[start - 1].isspace()) and (end == len(text) or text[end].isspace())
+
+def _segment_changed_regions(text_content, known_sentences):
     """
-    Calls the Gemini API with a given prompt and handles key rotation on failure.
-    """
-    key_cycler = get_gemini_key_cycler()
-    for _ in range(retries):
-        try:
-            api_key = next(key_cycler)
-            print(f"--- Attempting Gemini API call with key ending in ...{api_key[-4:]} ---")
-
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            
-            response = model.generate_content(prompt)
-            
-            if not response.parts:
-                print(f"Warning: Gemini API returned no parts. Finish Reason: {response.prompt_feedback.block_reason}")
-                continue
+    Splits `text_content` into sentences, reusing `known_sentences` that still appear
+    verbatim (in order, on whitespace boundaries) as anchors and running spaCy only
+    over the text between them. Returns (sentences, number of characters segmented).
+    """
+    pieces = []
+    cursor = 0
+    for known in known_sentences:
+        start = text_content.find(known, cursor)
+        while start != -1 and not _is_boundary(text_content, start, start + len(known)):
+            start = text_content.find(known, start + 1)
+        if start == -1:
+            continue
+        pieces.append(('gap', text_content[cursor:start]))
+        pieces.append(('known', known))
+        cursor = start + len(known)
+    pieces.append(('gap', text_content[cursor:]))
+
+    gaps = [(text, index) for index, (kind, text) in enumerate(pieces) if kind == 'gap' and text.strip()]
+    segmented = {index: sentences for sentences, index in pipe_questions(gaps)}
 
-            return response.text.strip()
+    sentences = []
+    for index, (kind, text) in enumerate(pieces):
+        if kind == 'known':
+            sentences.append(text)
+        else:
+            sentences.extend(segmented.get(index, []))
+    return sentences, sum(len(text) for text, _ in gaps)
 
-        except StopIteration:
-            raise ValueError("No API keys are available or all have failed.")
-        except Exception as e:
-            print(f"An error occurred during Gemini API call: {e}")
+def update_paper_content(paper_id, text_content, title=None):
+    """
+    Re-imports a paper's content incrementally. Only text that does not match an
+    existing question is segmented, and the new sentence list is diffed against the
+    stored questions by content hash: unchanged questions are left alone, changed
+    ones are updated in place (keeping their ids) and only the surplus is inserted
+    or deleted. Questions are then renumbered so their positions follow the text.
+    """
+    if not text_content:
+        raise ValueError("Content cannot be empty.")
+    paper = get_paper_by_id(paper_id)
+    questions = Question.query.filter(Question.question_paper_id == paper.id)\
+                              .order_by(Question.position, Question.id).all()
+
+    sentences, segmented_chars = _segment_changed_regions(text_content, [q.text for q in questions])
+    matcher = SequenceMatcher(None, [_content_hash(q.text) for q in questions], [_content_hash(t) for t in sentences], autojunk=False)
+
+    changes = {"unchanged": 0, "updated": 0, "inserted": 0, "deleted": 0, "segmented_chars": segmented_chars}
+    ordered = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        old, new = questions[i1:i2], sentences[j1:j2]
+        if tag == 'equal':
+            changes["unchanged"] += len(old)
+            ordered.extend(old)
             continue
-    
-    raise Exception("Failed to get a valid response from Gemini API after multiple retries.")
+        for question, text in zip(old, new):
+            question.text = text
+            ordered.append(question)
+            changes["updated"] += 1
+        for question in old[len(new):]:
+            db.session.delete(question)
+            changes["deleted"] += 1
+        for text in new[len(old):]:
+            question = Question(text=text, question_paper_id=paper.id)
+            db.session.add(question)
+            ordered.append(question)
+            changes["inserted"] += 1
 
+    for position, question in enumerate(ordered):
+        if question.position != position:
+            question.position = position
 
-def regenerate_question_with_gemini(paper_id, question_id, extra_prompt=None):
-    paper = QuestionPaper.query.get_or_404(paper_id)
-    question_to_replace = Question.query.with_parent(paper).filter(Question.id == question_id).first_or_404()
+    if title:
+        paper.title = title
+    db.session.commit()
+    return paper, changes
 
-    all_questions_text = " ".join([q.text for q in paper.questions])
-    
+def import_papers_for_user(user_id, papers, batch_size=None, n_process=None, chunk_size=None):
+    """
+    Bulk-imports an iterable of {"title", "content"} objects for a user.
+    Contents are streamed through nlp.pipe, questions are written with bulk inserts
+    and every `chunk_size` papers share one transaction. Yields one result dict per
+    paper, in input order, once the transaction holding it has been committed.
+    """
+    config = current_app.config
+    batch_size = batch_size or config.get('NLP_PIPE_BATCH_SIZE', 64)
+    n_process = n_process or config.get('NLP_PIPE_N_PROCESS', 1)
+    chunk_size = chunk_size or config.get('BULK_IMPORT_CHUNK_SIZE', 50)
+
+    def documents():
+        for index, item in enumerate(papers):
+            if not isinstance(item, dict) or not item.get('content'):
+                yield "", {"index": index, "error": "Each paper must be an object with a non-empty 'content' field."}
+                continue
+            yield item['content'], {"index": index, "title": item.get('title') or 'Untitled Paper'}
+
+    results = []
+    question_rows = []
+    papers_in_chunk = 0
+
+    for questions, result in pipe_questions(documents(), batch_size=batch_size, n_process=n_process):
+        if 'error' not in result:
+            paper = QuestionPaper(title=result['title'], user_id=user_id)
+            db.session.add(paper)
+            db.session.flush()
+            question_rows.extend(
+                {"text": text, "question_paper_id": paper.id, "position": position}
+                for position, text in enumerate(questions)
+            )
+            result.update(paper_id=paper.id, question_count=len(questions))
+            papers_in_chunk += 1
+        results.append(result)
+
+        if papers_in_chunk >= chunk_size:
+            yield from _commit_import_chunk(results, question_rows)
+            results, question_rows, papers_in_chunk = [], [], 0
+
+    yield from _commit_import_chunk(results, question_rows)
+
+def _commit_import_chunk(results, question_rows):
+    try:
+        if question_rows:
+            db.session.execute(insert(Question), question_rows)
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        for result in results:
+            if 'error' not in result:
+                result.pop('paper_id', None)
+                result.pop('question_count', None)
+                result['error'] = f"Failed to save paper: {e}"
+    yield from results
+
+def _call_gemini_api(prompt, retries=2):
+    """
+    Calls the Gemini API with a given prompt through the shared key pool,
+    retrying on another key on failure.
+    """
+    return get_gemini_pool().generate(prompt, retries=retries)
+
+
+def _build_regenerate_prompt(context_text, question_text, extra_prompt=None):
     prompt_template = f"""
     You are an academic assistant designing an exam.
     
     **Full Document Context:**
-    "{all_questions_text}"
+    "{context_text}"
     
     **Task:**
     Rephrase the following single question. The new question must adhere to these primary rules:
@@ -100,27 +236,65 @@ def regenerate_question_with_gemini(paper_id, question_id, extra_prompt=None):
 
     prompt_template += f"""
     **Original Question to Rephrase:**
-    "{question_to_replace.text}"
+    "{question_text}"
     
     **New Question:**
     """
-    
-    new_text = _call_gemini_api(prompt_template)
-    
-    if not new_text:
-        raise ValueError("AI model did not return any text.")
+    return prompt_template
 
-    question_to_replace.text = new_text
-    db.session.commit()
+
+def regenerate_question_with_gemini(paper_id, question_id, extra_prompt=None, reuse_cached=False):
+    """
+    Rephrases one question. Concurrent requests for the same question and extra
+    prompt share a single LLM call, and with `reuse_cached=True` a recent result is
+    reused while the paper is still the one it was generated from (or differs only by
+    that result having been applied).
+    """
+    question_to_replace = get_question_in_paper(paper_id, question_id)
+    original_text = question_to_replace.text
+
+    context = get_paper_context(paper_id)
+    memo = get_regenerate_memo()
+    # Keyed on what the client asks for, not on the current text: committing a result
+    # changes both the question and the paper digest, so a text-based key would never
+    # match the next identical request. The entry remembers its source instead.
+    memo_key = memo.make_key(paper_id, question_id, extra_prompt)
+    source = (original_text, context.digest)
+    # Only callers starting from the same text and paper may share an in-flight call:
+    # a request made after an edit must not get a result generated from the old text.
+    flight_key = memo.make_key(paper_id, question_id, extra_prompt, original_text, context.digest)
+
+    def still_applies(entry_source, cached_text):
+        source_text, source_digest = entry_source
+        if original_text == source_text:
+            # Generated from exactly the current paper (not applied yet).
+            return context.digest == source_digest
+        # Already applied: the question reads the cached result and nothing else changed.
+        return original_text == cached_text and context.digest_with(question_id, source_text) == source_digest
+
+    def generate():
+        context_text = context.prompt_text(current_app.config.get('GEMINI_CONTEXT_MAX_QUESTIONS', 0), focus_text=original_text)
+        new_text = _call_gemini_api(_build_regenerate_prompt(context_text, original_text, extra_prompt))
+        if not new_text:
+            raise ValueError("AI model did not return any text.")
+        return new_text
+
+    new_text = memo.get_or_compute(memo_key, generate, use_cache=reuse_cached, state=source,
+                                   accept=still_applies, flight_key=flight_key)
+
+    if question_to_replace.text != new_text:
+        question_to_replace.text = new_text
+        db.session.commit()
     return question_to_replace
 
 
 def generate_new_question_from_context(paper_id):
     paper = QuestionPaper.query.get_or_404(paper_id)
-    if not paper.questions:
+    context = get_paper_context(paper.id)
+    if not context.questions:
         raise ValueError("Cannot generate a question for an empty paper.")
 
-    all_questions_text = " ".join([q.text for q in paper.questions])
+    all_questions_text = context.prompt_text(current_app.config.get('GEMINI_CONTEXT_MAX_QUESTIONS', 0))
 
     prompt = f"""
     You are an academic assistant designing an exam.
@@ -140,7 +314,79 @@ def generate_new_question_from_context(paper_id):
     if not new_question_text:
         raise ValueError("AI model did not return any text.")
         
-    new_question = Question(text=new_question_text, paper=paper)
+    last_position = db.session.query(func.max(Question.position)).filter(Question.question_paper_id == paper.id).scalar()
+    new_question = Question(text=new_question_text, question_paper_id=paper.id, position=(last_position or 0) + 1)
     db.session.add(new_question)
     db.session.commit()
-    return new_question
\ No newline at end of file
+    return new_question
+
+
+def start_paper_regeneration(paper_id, extra_prompt=None):
+    """
+    Queues a background job that rephrases every question of a paper and returns it.
+    The paper context is built once and shared by all LLM calls. Questions edited or
+    deleted while the job runs keep the user's version and are reported as skipped.
+    """
+    paper = QuestionPaper.query.get_or_404(paper_id)
+    context = get_paper_context(paper.id)
+    if not context.questions:
+        raise ValueError("Cannot regenerate questions for an empty paper.")
+
+    return get_job_queue().submit(
+        'regenerate_paper', _run_paper_regeneration, paper.id, context, extra_prompt,
+        total=len(context.questions)
+    )
+
+
+def _run_paper_regeneration(job_id, paper_id, context, extra_prompt):
+    store = get_job_store()
+    max_questions = current_app.config.get('GEMINI_CONTEXT_MAX_QUESTIONS', 0)
+    concurrency = current_app.config.get('REGENERATE_CONCURRENCY', 8)
+    gemini_pool = get_gemini_pool()
+
+    def regenerate(question_text):
+        context_text = context.prompt_text(max_questions, focus_text=question_text)
+        return gemini_pool.generate(_build_regenerate_prompt(context_text, question_text, extra_prompt))
+
+    new_texts = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(regenerate, text): question_id for question_id, text in context.questions}
+        for future in as_completed(futures):
+            question_id = futures[future]
+            try:
+                new_text = future.result()
+                if not new_text:
+                    raise ValueError("AI model did not return any text.")
+                new_texts[question_id] = new_text
+            except Exception as e:
+                errors[question_id] = str(e)
+            store.update(job_id, completed=len(new_texts), failed=len(errors))
+
+    snapshot = dict(context.questions)
+    try:
+        current = Question.query.filter(
+            Question.question_paper_id == paper_id,
+            Question.id.in_(list(new_texts))
+        ).all() if new_texts else []
+        # Only overwrite text the model actually saw; anything edited since is left alone.
+        questions = [question for question in current if question.text == snapshot[question.id]]
+        for question in questions:
+            question.text = new_texts[question.id]
+        # Built before the commit, which would expire every row and reload each on access.
+        result = {
+            "questions": [
+                {"id": q.id, "text": q.text, "question_paper_id": q.question_paper_id, "position": q.position}
+                for q in questions
+            ],
+            "skipped": sorted(set(new_texts) - {question.id for question in questions}),
+            "errors": {str(question_id): error for question_id, error in errors.items()}
+        }
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        raise JobFailed(f"Failed to save regenerated questions: {e}")
+
+    if errors and not questions:
+        raise JobFailed("Every question failed to regenerate.", result)
+    return result
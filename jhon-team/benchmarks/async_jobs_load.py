@@ -0,0 +1,104 @@
+"""
+Load test for the question endpoints in sync and async (202 + job) mode against a
+slow fake Gemini. The app is served by a single-threaded WSGI server, like one
+sync gunicorn worker, so sync requests queue behind the LLM latency while async
+requests only pay for enqueueing.
+
+    python benchmarks/async_jobs_load.py --requests 40 --clients 8 --latency 1.0 --job-workers 8
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_gemini import FakeGeminiServer
+from app import create_app, db
+from app.config import Config
+from app.models import User, QuestionPaper, Question
+
+
+def build_app(db_path, gemini_url, job_workers):
+    class LoadTestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+        GEMINI_API_KEYS = ['load-test-key-1', 'load-test-key-2']
+        GEMINI_API_ENDPOINT = gemini_url
+        GEMINI_KEY_MAX_IN_FLIGHT = 32
+        JOB_WORKERS = job_workers
+
+    app = create_app(LoadTestConfig)
+    with app.app_context():
+        user = User(username='load_tester')
+        paper = QuestionPaper(title='Load test', owner=user)
+        db.session.add_all([user, paper] + [Question(text=f"What is topic {i}?", paper=paper) for i in range(20)])
+        db.session.commit()
+        return app, paper.id
+
+
+def run(base_url, paper_id, n_requests, clients, async_mode):
+    session = requests.Session()
+    url = f"{base_url}/api/v1/papers/{paper_id}/questions/generate"
+    params = {"async": "true" if async_mode else "false"}
+
+    def call(_):
+        start = time.perf_counter()
+        response = session.post(url, params=params)
+        return response, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        results = list(executor.map(call, range(n_requests)))
+    accepted_in = time.perf_counter() - start
+
+    completed_in = accepted_in
+    if async_mode:
+        for response, _ in results:
+            job_url = base_url + response.headers['Location']
+            status = None
+            while status not in ('completed', 'failed'):
+                status = session.get(job_url, params={"wait": 10}).json()['status']
+        completed_in = time.perf_counter() - start
+
+    latencies = sorted(latency for _, latency in results)
+    p50 = latencies[len(latencies) // 2]
+    return n_requests / accepted_in, p50, n_requests / completed_in
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=1.0, help="fake LLM seconds per call")
+    parser.add_argument("--job-workers", type=int, default=8)
+    args = parser.parse_args()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    gemini = FakeGeminiServer(("127.0.0.1", 0), latency=args.latency).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        app, paper_id = build_app(os.path.join(tmp, 'load.db'), gemini.url, args.job_workers)
+        server = make_server("127.0.0.1", 0, app, threaded=False)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+        print(f"{'mode':<6} {'accepted req/s':>15} {'p50 response':>13} {'completed req/s':>16}")
+        for mode in ("sync", "async"):
+            with contextlib.redirect_stdout(io.StringIO()):
+                accepted, p50, completed = run(base_url, paper_id, args.requests, args.clients, mode == "async")
+            print(f"{mode:<6} {accepted:>15.1f} {p50 * 1000:>11.0f}ms {completed:>16.1f}")
+
+        server.shutdown()
+    gemini.shutdown()
+
+
+if __name__ == "__main__":
+    main()
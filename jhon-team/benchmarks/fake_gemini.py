@@ -0,0 +1,108 @@
+"""
+A local stand-in for the Gemini generateContent REST endpoint, for offline benchmarks.
+
+Every request sleeps for `--latency` seconds and answers with a canned question.
+With `--rpm` set, each API key gets that many requests per minute before it
+receives 429 responses, like a free-tier key would.
+
+    python benchmarks/fake_gemini.py --port 8089 --latency 0.8 --rpm 60
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8089 python run.py
+"""
+import argparse
+import json
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeGeminiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.5, rpm=0):
+        super().__init__(address, FakeGeminiHandler)
+        self.latency = latency
+        self.rpm = rpm
+        self.lock = threading.Lock()
+        self.windows = {}
+        self.served = Counter()
+        self.throttled = Counter()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def admit(self, api_key):
+        if not self.rpm:
+            return True
+        now = time.monotonic()
+        with self.lock:
+            window = self.windows.setdefault(api_key, deque())
+            while window and now - window[0] >= 60:
+                window.popleft()
+            if len(window) >= self.rpm:
+                self.throttled[api_key] += 1
+                return False
+            window.append(now)
+            return True
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        api_key = self.headers.get('x-goog-api-key', '')
+
+        if not self.path.endswith(':generateContent'):
+            self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+            return
+        if not self.server.admit(api_key):
+            self._send_json(429, {"error": {"code": 429, "message": "Resource has been exhausted"}}, {"Retry-After": "1"})
+            return
+
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.served[api_key] += 1
+        prompt = request.get('contents', [{}])[0].get('parts', [{}])[0].get('text', '')
+        text = f"Which factors best explain the topic above? ({len(prompt)} prompt chars)"
+        self._send_json(200, {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}]
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per response")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute per key before 429s (0 = unlimited)")
+    args = parser.parse_args()
+
+    server = FakeGeminiServer((args.host, args.port), latency=args.latency, rpm=args.rpm)
+    print(f"Fake Gemini listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
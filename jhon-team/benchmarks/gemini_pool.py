@@ -0,0 +1,79 @@
+"""
+Measures throughput and per-key fairness of GeminiKeyPool against the local fake
+Gemini server, dispatching from a thread pool and from asyncio.
+
+    python benchmarks/gemini_pool.py --keys 3 --requests 120 --concurrency 12 --latency 0.2
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_gemini import FakeGeminiServer
+from app.v1.gemini import GeminiKeyPool
+
+
+def jain_index(counts):
+    counts = list(counts)
+    if not counts or not any(counts):
+        return 0.0
+    return sum(counts) ** 2 / (len(counts) * sum(c * c for c in counts))
+
+
+def run_threads(pool, prompts, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(pool.generate, prompts))
+
+
+def run_asyncio(pool, prompts, concurrency):
+    async def bounded(semaphore, prompt):
+        async with semaphore:
+            return await pool.generate_async(prompt)
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(bounded(semaphore, p) for p in prompts))
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=120)
+    parser.add_argument("--concurrency", type=int, default=12)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--rpm", type=int, default=0, help="fake per-key rate limit (0 = unlimited)")
+    parser.add_argument("--max-in-flight", type=int, default=4)
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(("127.0.0.1", 0), latency=args.latency, rpm=args.rpm).start()
+    keys = [f"bench-key-{i:04d}" for i in range(args.keys)]
+    prompts = [f"Rephrase question {i}." for i in range(args.requests)]
+
+    print(f"{'mode':<8} {'req/s':>8} {'wall':>8} {'429s':>6} {'fairness':>9}  per-key")
+    for mode, runner in (("threads", run_threads), ("asyncio", run_asyncio)):
+        server.served.clear()
+        server.throttled.clear()
+        server.windows.clear()
+        pool = GeminiKeyPool(keys, endpoint=server.url, rpm_limit=args.rpm,
+                             max_in_flight_per_key=args.max_in_flight, cooldown=1, acquire_timeout=120)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            runner(pool, prompts, args.concurrency)
+        wall = time.perf_counter() - start
+        per_key = [server.served[key] for key in keys]
+        print(f"{mode:<8} {args.requests / wall:>8.1f} {wall:>7.2f}s {sum(server.throttled.values()):>6} "
+              f"{jain_index(per_key):>9.3f}  {per_key}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
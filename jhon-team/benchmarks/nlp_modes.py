@@ -0,0 +1,77 @@
+"""
+Compares the spaCy ingestion modes used to split paper content into questions.
+
+Cold start is measured in a fresh interpreter per mode (import + model load),
+per-document latency is measured in-process over synthetic exam papers.
+
+    python benchmarks/nlp_modes.py --docs 200 --questions 40
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.v1.nlp import NLP_MODES, load_pipeline, sentences_from_doc
+
+SAMPLE_QUESTIONS = [
+    "What was the primary cause of World War I?",
+    "Who was the leader of the Soviet Union during the Cuban Missile Crisis?",
+    "Explain the role of the Treaty of Versailles in the rise of fascism.",
+    "Describe two economic effects of the Great Depression on Europe.",
+    "Why did the United States enter the Second World War in 1941?",
+]
+
+
+def make_document(n_questions):
+    return " ".join(SAMPLE_QUESTIONS[i % len(SAMPLE_QUESTIONS)] for i in range(n_questions))
+
+
+def cold_start(mode, model_name):
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"from app.v1.nlp import load_pipeline; load_pipeline({mode!r}, {model_name!r}); "
+        "print(time.perf_counter() - t)"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def per_document(mode, model_name, docs):
+    nlp = load_pipeline(mode, model_name)
+    nlp(docs[0])  # warm up
+    timings = []
+    sentences = 0
+    for doc in docs:
+        start = time.perf_counter()
+        sentences += len(sentences_from_doc(nlp(doc)))
+        timings.append(time.perf_counter() - start)
+    return timings, sentences
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="en_core_web_sm")
+    parser.add_argument("--docs", type=int, default=100)
+    parser.add_argument("--questions", type=int, default=40, help="questions per synthetic document")
+    parser.add_argument("--modes", nargs="+", default=list(NLP_MODES), choices=NLP_MODES)
+    args = parser.parse_args()
+
+    docs = [make_document(args.questions) for _ in range(args.docs)]
+
+    print(f"{'mode':<12} {'cold start':>11} {'p50/doc':>10} {'p95/doc':>10} {'sentences':>10}")
+    for mode in args.modes:
+        cold = cold_start(mode, args.model)
+        timings, sentences = per_document(mode, args.model, docs)
+        timings.sort()
+        p50 = statistics.median(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(f"{mode:<12} {cold:>10.2f}s {p50 * 1000:>8.2f}ms {p95 * 1000:>8.2f}ms {sentences:>10}")
+
+
+if __name__ == "__main__":
+    main()
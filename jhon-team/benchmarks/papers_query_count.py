@@ -0,0 +1,91 @@
+"""
+Counts the SQL statements issued by GET /users/<id>/papers against an in-memory
+database, and exits non-zero if the listing is no longer bounded.
+
+    python benchmarks/papers_query_count.py --papers 500 --questions 20
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert
+
+from app import create_app, db
+from app.config import Config
+from app.models import User, QuestionPaper, Question
+
+# user lookup + papers + one selectinload batch per 500 papers
+MAX_STATEMENTS_FULL = 3
+# user lookup + papers with a correlated question count
+MAX_STATEMENTS_SUMMARY = 2
+
+
+class BenchmarkConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+
+def seed(n_papers, n_questions):
+    user = User(username='bench_teacher')
+    db.session.add(user)
+    db.session.flush()
+    db.session.execute(insert(QuestionPaper), [
+        {"title": f"Paper {i}", "user_id": user.id} for i in range(n_papers)
+    ])
+    paper_ids = [pid for (pid,) in db.session.query(QuestionPaper.id).all()]
+    db.session.execute(insert(Question), [
+        {"text": f"Question {q} of paper {pid}?", "question_paper_id": pid}
+        for pid in paper_ids for q in range(n_questions)
+    ])
+    db.session.commit()
+    return user.id
+
+
+def measure(client, url):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    start = time.perf_counter()
+    response = client.get(url)
+    elapsed = time.perf_counter() - start
+    event.remove(db.engine, 'before_cursor_execute', count)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return len(statements), elapsed, len(response.get_json())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--papers", type=int, default=500)
+    parser.add_argument("--questions", type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app(BenchmarkConfig)
+    failed = False
+    with app.app_context():
+        user_id = seed(args.papers, args.questions)
+        client = app.test_client()
+        selectin_batches = -(-args.papers // 500)
+        cases = [
+            ("full listing", f"/api/v1/users/{user_id}/papers", MAX_STATEMENTS_FULL - 1 + selectin_batches),
+            ("summary listing", f"/api/v1/users/{user_id}/papers?summary=true", MAX_STATEMENTS_SUMMARY),
+            ("page of 50", f"/api/v1/users/{user_id}/papers?limit=50", MAX_STATEMENTS_FULL),
+            ("summary page of 50", f"/api/v1/users/{user_id}/papers?limit=50&summary=true", MAX_STATEMENTS_SUMMARY),
+        ]
+
+        print(f"{'case':<20} {'papers':>7} {'queries':>8} {'bound':>6} {'time':>9}")
+        for name, url, bound in cases:
+            queries, elapsed, returned = measure(client, url)
+            status = "" if queries <= bound else "  <-- too many queries"
+            failed = failed or queries > bound
+            print(f"{name:<20} {returned:>7} {queries:>8} {bound:>6} {elapsed * 1000:>7.1f}ms{status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,30 +5,68 @@ from flask_sqlalchemy import SQLAlchemy
 from flasgger import Swagger
 
 from .config import config_by_name
+from .sqlite_tuning import sqlite_engine_options, configure_sqlite
+from .commands import register_commands
 
 db = SQLAlchemy()
 
-def create_app():
+def create_app(config_class=None):
     app = Flask(__name__)
     
     config_name = os.getenv('FLASK_ENV', 'development')
-    app.config.from_object(config_by_name[config_name])
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///chat_app.db'
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config.from_object(config_class or config_by_name[config_name])
+    if app.config.get('SQLITE_TUNING'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = sqlite_engine_options(app.config)
 
     db.init_app(app)
+    from .v1.sentiment import engine_from_config
+    from .v1.history_cache import HistoryCache
+    from .v1.alerts import AlertBroker
+    app.extensions['sentiment'] = engine_from_config(app.config)
+    app.extensions['history_cache'] = HistoryCache(app.config.get('HISTORY_CACHE_SIZE', 1024))
+    app.extensions['alerts'] = AlertBroker.from_config(app.config)
+    if app.config.get('RESPONSE_CACHE'):
+        from .v1.response_cache import ResponseCache
+        app.extensions['response_cache'] = ResponseCache.from_config(app.config)
+    if app.config.get('GEMINI_API_KEY'):
+        from .v1.gemini import GeminiClient
+        app.extensions['gemini'] = GeminiClient.from_config(app.config)
+        if app.config.get('CONVERSATION_MEMORY'):
+            if app.config.get('RESPONSE_CACHE'):
+                app.logger.warning("CONVERSATION_MEMORY is on: the response cache only serves first messages.")
+            from .v1.memory import ConversationMemory
+            app.extensions['conversation_memory'] = ConversationMemory.from_config(app, app.extensions['gemini'])
     CORS(app, resources={r"/v1/*": {"origins": "*"}})
 
     Swagger(app, config=app.config['SWAGGER'])
 
     from .v1 import v1_blueprint
     app.register_blueprint(v1_blueprint)
+    register_commands(app)
 
     @app.route('/health')
     def health():
         return "OK"
     
+    from .v1.models import ChatMessage, SentimentDaily
     with app.app_context():
+        if app.config.get('SQLITE_TUNING'):
+            configure_sqlite(app, db)
         db.create_all()
+        # create_all() skips indexes added to tables that already exist.
+        for index in ChatMessage.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
+
+        # Rebuilding here would race other workers and live increments, so it is left
+        # to `flask rebuild-sentiment-rollup`.
+        if SentimentDaily.query.first() is None and ChatMessage.query.first() is not None:
+            app.logger.warning("sentiment_daily is empty; run `flask rebuild-sentiment-rollup` to fill it.")
+
+    persistence_mode = app.config.get('CHAT_PERSISTENCE_MODE', 'sync')
+    if persistence_mode == 'write_behind':
+        from .v1.write_behind import ChatWriteBuffer
+        app.extensions['chat_writer'] = ChatWriteBuffer.from_config(app)
+    elif persistence_mode != 'sync':
+        raise ValueError(f"Unknown CHAT_PERSISTENCE_MODE '{persistence_mode}'; use 'sync' or 'write_behind'.")
 
     return app
\ No newline at end of file
@@ -0,0 +1,39 @@
+import click
+
+
+def register_commands(app):
+
+    @app.cli.command('rebuild-sentiment-rollup')
+    def rebuild_sentiment_rollup():
+        """Recompute the daily sentiment rollup from the chat message table."""
+        from .v1.services import ChatService
+        rows = ChatService.rebuild_sentiment_rollup()
+        click.echo(f"Rebuilt sentiment rollup: {rows} day/sentiment rows.")
+
+    @app.cli.command('export-chats')
+    @click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson', 'parquet', 'arrow']), default='csv')
+    @click.option('--output', '-o', type=click.Path(dir_okay=False, writable=True), required=True)
+    @click.option('--start-date', type=click.DateTime(formats=['%Y-%m-%d']), default=None)
+    @click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']), default=None)
+    @click.option('--user-id', default=None)
+    @click.option('--chunk-size', type=int, default=None, help='Rows per query (defaults to EXPORT_CHUNK_SIZE).')
+    def export_chats_command(fmt, output, start_date, end_date, user_id, chunk_size):
+        """Stream chat messages to a CSV, NDJSON, Parquet or Arrow file with constant memory."""
+        from .v1.export import ExportError, iter_chat_chunks, export_chats
+        chunks = iter_chat_chunks(
+            start_date.date() if start_date else None,
+            end_date.date() if end_date else None,
+            user_id,
+            chunk_size=chunk_size or app.config.get('EXPORT_CHUNK_SIZE', 5000)
+        )
+        try:
+            pieces = export_chats(fmt, chunks)
+        except ExportError as err:
+            raise click.ClickException(str(err))
+        binary = fmt in ('parquet', 'arrow')
+        written = 0
+        with open(output, 'wb' if binary else 'w', newline=None if binary else '') as handle:
+            for piece in pieces:
+                handle.write(piece)
+                written += len(piece)
+        click.echo(f"Wrote {written:,} bytes to {output}.")
@@ -9,7 +9,69 @@ class Config:
     
     X_API_KEY = os.environ.get('X_API_KEY')
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
+    GEMINI_MODEL = os.environ.get('GEMINI_MODEL', 'gemini-1.5-flash')
+    GEMINI_API_ENDPOINT = os.environ.get('GEMINI_API_ENDPOINT', 'https://generativelanguage.googleapis.com')
+    GEMINI_TIMEOUT = float(os.environ.get('GEMINI_TIMEOUT', 30))
+    GEMINI_POOL_SIZE = int(os.environ.get('GEMINI_POOL_SIZE', 10))
 
+    # In-process sentiment engine: 'lexicon' or a 'package.module:ClassName' SentimentEngine.
+    SENTIMENT_ENGINE = os.environ.get('SENTIMENT_ENGINE', 'lexicon')
+    SENTIMENT_THRESHOLD = float(os.environ.get('SENTIMENT_THRESHOLD', 0.05))
+    SENTIMENT_LEXICON_PATH = os.environ.get('SENTIMENT_LEXICON_PATH')
+
+    # 'sync' commits every chat message on the request path; 'write_behind' queues them and
+    # inserts in batches of WRITE_BEHIND_BATCH_SIZE or every WRITE_BEHIND_FLUSH_INTERVAL seconds.
+    CHAT_PERSISTENCE_MODE = os.environ.get('CHAT_PERSISTENCE_MODE', 'sync')
+    WRITE_BEHIND_BATCH_SIZE = int(os.environ.get('WRITE_BEHIND_BATCH_SIZE', 500))
+    WRITE_BEHIND_FLUSH_INTERVAL = float(os.environ.get('WRITE_BEHIND_FLUSH_INTERVAL', 0.5))
+    WRITE_BEHIND_MAX_PENDING = int(os.environ.get('WRITE_BEHIND_MAX_PENDING', 10000))
+
+    # Users whose latest history page is kept in memory (0 disables the cache).
+    HISTORY_CACHE_SIZE = int(os.environ.get('HISTORY_CACHE_SIZE', 1024))
+
+    # Opt-in cache of LLM replies keyed on normalized message text, with an optional
+    # near-duplicate tier (hashed character trigrams, cosine >= threshold).
+    RESPONSE_CACHE = os.environ.get('RESPONSE_CACHE', 'false').lower() in ('1', 'true', 'yes')
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 2048))
+    RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 3600))
+    RESPONSE_CACHE_SIMILARITY = os.environ.get('RESPONSE_CACHE_SIMILARITY', 'true').lower() in ('1', 'true', 'yes')
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD = float(os.environ.get('RESPONSE_CACHE_SIMILARITY_THRESHOLD', 0.9))
+
+    # Conversation memory: the last CONVERSATION_WINDOW_TURNS turns verbatim plus a rolling
+    # summary, refreshed in the background once CONVERSATION_SUMMARY_BATCH turns fall out of the window.
+    # A reply built with conversation context is never cached (it only fits that user's
+    # conversation), so with memory on the response cache only serves first messages.
+    # Memory therefore defaults to off when RESPONSE_CACHE is enabled; set it explicitly
+    # to trade cache hits for context.
+    CONVERSATION_MEMORY = os.environ.get(
+        'CONVERSATION_MEMORY', 'false' if RESPONSE_CACHE else 'true').lower() in ('1', 'true', 'yes')
+    CONVERSATION_WINDOW_TURNS = int(os.environ.get('CONVERSATION_WINDOW_TURNS', 6))
+    CONVERSATION_SUMMARY_BATCH = int(os.environ.get('CONVERSATION_SUMMARY_BATCH', 4))
+    CONVERSATION_SUMMARY_MAX_WORDS = int(os.environ.get('CONVERSATION_SUMMARY_MAX_WORDS', 150))
+    CONVERSATION_MAX_TURN_CHARS = int(os.environ.get('CONVERSATION_MAX_TURN_CHARS', 500))
+
+    # Negative-sentiment alert stream: per-moderator queue bound (oldest alerts are dropped
+    # beyond it), alerts kept for Last-Event-ID replay, and SSE keep-alive interval.
+    ALERT_SUBSCRIBER_QUEUE_SIZE = int(os.environ.get('ALERT_SUBSCRIBER_QUEUE_SIZE', 256))
+    ALERT_REPLAY_SIZE = int(os.environ.get('ALERT_REPLAY_SIZE', 1000))
+    ALERT_HEARTBEAT_SECONDS = float(os.environ.get('ALERT_HEARTBEAT_SECONDS', 15))
+
+    # Rows read per query by the chat export endpoint and CLI.
+    EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 5000))
+
+    SQLALCHEMY_DATABASE_URI = os.environ.get('SQLALCHEMY_DATABASE_URI', 'sqlite:///chat_app.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # SQLite tuning for concurrent workers: WAL journal, relaxed fsync, busy timeout,
+    # memory-mapped reads and a bounded connection pool.
+    SQLITE_TUNING = os.environ.get('SQLITE_TUNING', 'false').lower() in ('1', 'true', 'yes')
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 268435456))
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
 
     SWAGGER = {
         'title': 'Subhodhaya Team API',
@@ -3,13 +3,21 @@ from flask_restful import Api
 
 from .routes import (
     ChatSendResource, 
+    ChatStreamResource,
     ChatHistoryResource, 
-    SentimentAnalyticsResource
+    SentimentAnalyticsResource,
+    ResponseCacheStatsResource,
+    AlertStreamResource,
+    ChatExportResource
 )
 
 v1_blueprint = Blueprint('v1', __name__, url_prefix='/v1')
 api = Api(v1_blueprint)
 
 api.add_resource(ChatSendResource, '/chat/send')
+api.add_resource(ChatStreamResource, '/chat/stream')
 api.add_resource(ChatHistoryResource, '/chat/history')
-api.add_resource(SentimentAnalyticsResource, '/analytics/sentiment')
\ No newline at end of file
+api.add_resource(SentimentAnalyticsResource, '/analytics/sentiment')
+api.add_resource(ResponseCacheStatsResource, '/cache/stats')
+api.add_resource(AlertStreamResource, '/alerts/stream')
+api.add_resource(ChatExportResource, '/export/chats')
\ No newline at end of file
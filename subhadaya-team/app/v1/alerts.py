@@ -0,0 +1,115 @@
+# chat/alerts.py
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Iterable, List, Optional
+
+
+class AlertSubscription:
+    """
+    One moderator's bounded inbox. When the consumer falls behind, the oldest alerts
+    are dropped (and counted) so the publisher never waits on it.
+    """
+
+    def __init__(self, broker: 'AlertBroker', user_ids: Optional[frozenset], queue_size: int):
+        self.broker = broker
+        self.user_ids = user_ids
+        self._queue = deque(maxlen=queue_size)
+        self._ready = threading.Condition(threading.Lock())
+        self.dropped = 0
+
+    def _push(self, event: dict):
+        with self._ready:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(event)
+            self._ready.notify()
+
+    def get(self, timeout: float) -> List[dict]:
+        """Waits up to `timeout` seconds and returns every queued alert (possibly none)."""
+        with self._ready:
+            if not self._queue:
+                self._ready.wait(timeout)
+            events = list(self._queue)
+            self._queue.clear()
+            return events
+
+    def take_dropped(self) -> int:
+        with self._ready:
+            dropped, self.dropped = self.dropped, 0
+            return dropped
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class AlertBroker:
+    """
+    In-process pub/sub for negative-sentiment alerts. Subscribers either see every
+    alert or only those of the user ids they asked for; publish() only touches the
+    matching subscriptions and never blocks. The last `replay_size` alerts are kept so
+    a reconnecting client can resume from its Last-Event-ID.
+    """
+
+    def __init__(self, queue_size: int = 256, replay_size: int = 1000):
+        self.queue_size = queue_size
+        self._ids = itertools.count(1)
+        self._all = set()
+        self._by_user = {}
+        self._recent = deque(maxlen=replay_size)
+        self._lock = threading.Lock()
+        self.published = 0
+
+    @classmethod
+    def from_config(cls, config) -> 'AlertBroker':
+        return cls(
+            queue_size=config.get('ALERT_SUBSCRIBER_QUEUE_SIZE', 256),
+            replay_size=config.get('ALERT_REPLAY_SIZE', 1000)
+        )
+
+    def subscribe(self, user_ids: Optional[Iterable[str]] = None, last_event_id: Optional[int] = None) -> AlertSubscription:
+        user_ids = frozenset(user_ids) if user_ids else None
+        subscription = AlertSubscription(self, user_ids, self.queue_size)
+        with self._lock:
+            if user_ids is None:
+                self._all.add(subscription)
+            else:
+                for user_id in user_ids:
+                    self._by_user.setdefault(user_id, set()).add(subscription)
+            if last_event_id is not None:
+                for event in self._recent:
+                    if event["id"] > last_event_id and (user_ids is None or event["user_id"] in user_ids):
+                        subscription._push(event)
+        return subscription
+
+    def unsubscribe(self, subscription: AlertSubscription):
+        with self._lock:
+            self._all.discard(subscription)
+            for user_id in subscription.user_ids or ():
+                subscribers = self._by_user.get(user_id)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._by_user[user_id]
+
+    def publish(self, user_id: str, message: str, sentiment: str, **extra) -> dict:
+        event = dict(extra, user_id=user_id, message=message, sentiment=sentiment, timestamp=time.time())
+        with self._lock:
+            event["id"] = next(self._ids)
+            self._recent.append(event)
+            self.published += 1
+            targets = list(self._all)
+            targets.extend(self._by_user.get(user_id, ()))
+        for subscription in targets:
+            subscription._push(event)
+        return event
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscriptions = set(self._all).union(*self._by_user.values())
+            return {
+                "published": self.published,
+                "subscribers": len(subscriptions),
+                "dropped": sum(subscription.dropped for subscription in subscriptions)
+            }
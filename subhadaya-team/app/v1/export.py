@@ -0,0 +1,142 @@
+# chat/export.py
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Iterator, List, Optional
+
+from sqlalchemy import select, tuple_
+
+from app import db
+from .models import ChatMessage
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+EXPORT_COLUMNS = ('id', 'user_id', 'user_message', 'bot_reply', 'sentiment', 'timestamp')
+
+
+class ExportError(Exception):
+    pass
+
+
+def iter_chat_chunks(start_date: Optional[date] = None, end_date: Optional[date] = None,
+                     user_id: Optional[str] = None, chunk_size: int = 5000) -> Iterator[List[tuple]]:
+    """
+    Yields ChatMessage rows (as EXPORT_COLUMNS tuples) in (timestamp, id) order, one chunk
+    per query. Each chunk resumes after the last (timestamp, id) seen, which the timestamp
+    index (or the user_id/timestamp/id index when filtering by user) serves directly, and
+    the read transaction is ended between chunks so a long export holds no lock.
+    """
+    columns = [getattr(ChatMessage, name) for name in EXPORT_COLUMNS]
+    query = select(*columns)
+    if user_id is not None:
+        query = query.where(ChatMessage.user_id == user_id)
+    if start_date is not None:
+        query = query.where(ChatMessage.timestamp >= datetime.combine(start_date, time.min))
+    if end_date is not None:
+        query = query.where(ChatMessage.timestamp < datetime.combine(end_date + timedelta(days=1), time.min))
+    query = query.order_by(ChatMessage.timestamp, ChatMessage.id).limit(chunk_size)
+
+    cursor = None
+    while True:
+        page = query if cursor is None else query.where(tuple_(ChatMessage.timestamp, ChatMessage.id) > cursor)
+        rows = [tuple(row) for row in db.session.execute(page)]
+        db.session.rollback()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < chunk_size:
+            return
+        cursor = tuple_(rows[-1][5], rows[-1][0])
+
+
+def _csv_chunks(chunks) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in chunks:
+        writer.writerows(
+            (row[0], row[1], row[2], row[3], row[4], row[5].isoformat() + "Z") for row in rows
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _ndjson_chunks(chunks) -> Iterator[str]:
+    for rows in chunks:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row[:5]), timestamp=row[5].isoformat() + "Z")) + "\n"
+            for row in rows
+        )
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands pyarrow's output back to a generator."""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self) -> bytes:
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def _arrow_chunks(chunks, fmt: str) -> Iterator[bytes]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportError(f"The '{fmt}' export format needs pyarrow; install it with 'pip install pyarrow'.")
+
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('user_id', pa.string()),
+        ('user_message', pa.string()),
+        ('bot_reply', pa.string()),
+        ('sentiment', pa.string()),
+        ('timestamp', pa.timestamp('us', tz='UTC')),
+    ])
+
+    def generate():
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema) if fmt == 'parquet' else pa.ipc.new_stream(sink, schema)
+        try:
+            for rows in chunks:
+                # One row group / record batch per chunk keeps memory flat.
+                writer.write_batch(pa.record_batch([list(column) for column in zip(*rows)], schema=schema))
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
+
+    return generate()
+
+
+def export_chats(fmt: str, chunks) -> Iterator:
+    """Serializes row chunks from iter_chat_chunks as str (csv, ndjson) or bytes (parquet, arrow) pieces."""
+    if fmt == 'csv':
+        return _csv_chunks(chunks)
+    if fmt == 'ndjson':
+        return _ndjson_chunks(chunks)
+    if fmt in ('parquet', 'arrow'):
+        return _arrow_chunks(chunks, fmt)
+    raise ExportError(f"Unknown export format '{fmt}'; use one of {sorted(EXPORT_FORMATS)}.")
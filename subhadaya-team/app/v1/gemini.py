@@ -0,0 +1,79 @@
+# chat/gemini.py
+import json
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class GeminiError(Exception):
+    pass
+
+
+class GeminiClient:
+    """
+    App-scoped client for the Gemini generateContent REST API.
+
+    One instance is created in create_app and shared by every request. It holds a
+    pooled keep-alive HTTP session, so requests reuse connections instead of
+    reconfiguring the SDK and rebuilding a model each time. The session only carries
+    per-request headers, so it is safe to share between threads.
+    """
+
+    def __init__(self, api_key: str, model: str = 'gemini-1.5-flash',
+                 endpoint: str = 'https://generativelanguage.googleapis.com',
+                 timeout: float = 30, pool_size: int = 10):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = f"{endpoint.rstrip('/')}/v1beta/models/{model}"
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @classmethod
+    def from_config(cls, config) -> 'GeminiClient':
+        return cls(
+            api_key=config.get('GEMINI_API_KEY'),
+            model=config.get('GEMINI_MODEL', 'gemini-1.5-flash'),
+            endpoint=config.get('GEMINI_API_ENDPOINT', 'https://generativelanguage.googleapis.com'),
+            timeout=config.get('GEMINI_TIMEOUT', 30),
+            pool_size=config.get('GEMINI_POOL_SIZE', 10)
+        )
+
+    def _post(self, method: str, prompt: str, **kwargs) -> requests.Response:
+        response = self.session.post(
+            f"{self.base_url}:{method}",
+            json={"contents": [{"parts": [{"text": prompt}]}]},
+            headers={"x-goog-api-key": self.api_key},
+            timeout=self.timeout,
+            **kwargs
+        )
+        if response.status_code >= 400:
+            raise GeminiError(f"Gemini API returned HTTP {response.status_code}: {response.text[:200]}")
+        return response
+
+    @staticmethod
+    def _text_from(payload: dict) -> str:
+        candidates = payload.get('candidates') or []
+        parts = candidates[0].get('content', {}).get('parts', []) if candidates else []
+        return "".join(part.get('text', '') for part in parts)
+
+    def generate(self, prompt: str) -> str:
+        payload = self._post('generateContent', prompt).json()
+        text = self._text_from(payload)
+        if not text:
+            block_reason = payload.get('promptFeedback', {}).get('blockReason')
+            raise GeminiError(f"Gemini API returned no text. Block reason: {block_reason}")
+        return text
+
+    def stream(self, prompt: str):
+        """Yields text chunks from streamGenerateContent as the model produces them."""
+        with self._post('streamGenerateContent', prompt, params={'alt': 'sse'}, stream=True) as response:
+            # chunk_size=None hands over each transfer chunk as it arrives instead of
+            # waiting for a fixed-size read to fill up.
+            for line in response.iter_lines(chunk_size=None):
+                if not line.startswith(b'data:'):
+                    continue
+                text = self._text_from(json.loads(line[len(b'data:'):]))
+                if text:
+                    yield text
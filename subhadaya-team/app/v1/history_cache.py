@@ -0,0 +1,49 @@
+# chat/history_cache.py
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+
+class HistoryCache:
+    """
+    Per-user LRU of the latest history page, keyed by user and page size. Entries are
+    tagged with the newest message id they were built from, so a stale entry (e.g. one
+    written by another worker) is never served: get() only hits when the id still matches.
+    record_chat invalidates the user's entries as soon as it writes.
+    """
+
+    def __init__(self, max_users: int = 1024):
+        self.max_users = max_users
+        self._users: 'OrderedDict[str, dict]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str, limit: int, newest_id: int) -> Optional[dict]:
+        with self._lock:
+            pages = self._users.get(user_id)
+            entry = pages.get(limit) if pages else None
+            if entry is None or entry[0] != newest_id:
+                self.misses += 1
+                return None
+            self._users.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, user_id: str, limit: int, newest_id: int, payload: dict):
+        if self.max_users <= 0:
+            return
+        with self._lock:
+            self._users.setdefault(user_id, {})[limit] = (newest_id, payload)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+    def invalidate(self, user_ids: Iterable[str]):
+        with self._lock:
+            for user_id in user_ids:
+                self._users.pop(user_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"users": len(self._users), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,125 @@
+# chat/memory.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from app import db
+from .models import ChatMessage, ConversationSummary
+
+
+class ConversationMemory:
+    """
+    Bounded per-user conversation context: the last `window_turns` turns verbatim plus a
+    rolling summary of everything older. When `summary_batch` turns have slid out of the
+    window without being summarized, a background task folds them into the summary with
+    one LLM call that sees only the old summary and those turns. Prompt size therefore
+    stays bounded however long the conversation gets, and so does the refresh cost.
+    """
+
+    def __init__(self, app, client, window_turns: int = 6, summary_batch: int = 4,
+                 summary_max_words: int = 150, max_turn_chars: int = 500):
+        self.app = app
+        self.client = client
+        self.window_turns = window_turns
+        self.summary_batch = summary_batch
+        self.summary_max_words = summary_max_words
+        self.max_turn_chars = max_turn_chars
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='conversation-summary')
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, app, client) -> 'ConversationMemory':
+        return cls(
+            app,
+            client,
+            window_turns=app.config.get('CONVERSATION_WINDOW_TURNS', 6),
+            summary_batch=app.config.get('CONVERSATION_SUMMARY_BATCH', 4),
+            summary_max_words=app.config.get('CONVERSATION_SUMMARY_MAX_WORDS', 150),
+            max_turn_chars=app.config.get('CONVERSATION_MAX_TURN_CHARS', 500)
+        )
+
+    def _recent(self, user_id: str) -> List[ChatMessage]:
+        """The newest window + 2 * batch turns, oldest first: the most either path ever reads."""
+        messages = ChatMessage.query.filter(ChatMessage.user_id == user_id)\
+                                    .order_by(ChatMessage.timestamp.desc(), ChatMessage.id.desc())\
+                                    .limit(self.window_turns + 2 * self.summary_batch)\
+                                    .all()
+        return list(reversed(messages))
+
+    def _clip(self, text: str) -> str:
+        return text if len(text) <= self.max_turn_chars else text[:self.max_turn_chars] + "..."
+
+    def _format_turns(self, messages: List[ChatMessage]) -> str:
+        lines = []
+        for message in messages:
+            lines.append(f"User: {self._clip(message.user_message)}")
+            if message.bot_reply:
+                lines.append(f"Assistant: {self._clip(message.bot_reply)}")
+        return "\n".join(lines)
+
+    def _unsummarized(self, messages: List[ChatMessage], summary: ConversationSummary) -> List[ChatMessage]:
+        through = summary.summarized_through_id if summary else 0
+        older = messages[:-self.window_turns] if self.window_turns else messages
+        return [message for message in older if message.id > through]
+
+    def context_for(self, user_id: str) -> str:
+        """Prompt section with the summary and recent turns; empty for a new user."""
+        summary = db.session.get(ConversationSummary, user_id)
+        messages = self._recent(user_id)
+        window = messages[-self.window_turns:] if self.window_turns else []
+
+        sections = []
+        if summary and summary.summary:
+            sections.append(f"Summary of the earlier conversation:\n{summary.summary}")
+        if window:
+            sections.append(f"Most recent turns:\n{self._format_turns(window)}")
+        if len(self._unsummarized(messages, summary)) >= self.summary_batch:
+            self.schedule_refresh(user_id)
+        return "\n\n".join(sections)
+
+    def schedule_refresh(self, user_id: str):
+        with self._lock:
+            if user_id in self._in_flight:
+                return
+            self._in_flight.add(user_id)
+        self._executor.submit(self._refresh_in_background, user_id)
+
+    def _refresh_in_background(self, user_id: str):
+        try:
+            with self.app.app_context():
+                self.refresh(user_id)
+        except Exception as e:
+            self.app.logger.error(f"Conversation summary refresh for {user_id} failed: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(user_id)
+
+    def refresh(self, user_id: str) -> bool:
+        """Folds turns that left the verbatim window into the summary. Returns True if it changed."""
+        summary = db.session.get(ConversationSummary, user_id)
+        pending = self._unsummarized(self._recent(user_id), summary)
+        if not pending:
+            return False
+
+        prompt = f"""
+        You maintain a running summary of a conversation between a user and an assistant.
+        Current summary: {summary.summary if summary and summary.summary else "(none yet)"}
+
+        New turns to fold into the summary:
+        {self._format_turns(pending)}
+
+        Write the updated summary in at most {self.summary_max_words} words. Keep facts about the user,
+        their goals and open questions; drop small talk. Return only the summary text.
+        """
+        text = self.client.generate(prompt).strip()
+        if summary is None:
+            summary = ConversationSummary(user_id=user_id)
+            db.session.add(summary)
+        summary.summary = " ".join(text.split()[:self.summary_max_words * 2])
+        summary.summarized_through_id = pending[-1].id
+        db.session.commit()
+        return True
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -2,6 +2,9 @@ from datetime import datetime
 from app import db  
 
 class ChatMessage(db.Model):
+    # Serves per-user history pages newest-first and keyset pagination on (timestamp, id).
+    __table_args__ = (db.Index('ix_chat_message_user_timestamp_id', 'user_id', 'timestamp', 'id'),)
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.String(150), nullable=False, index=True)
     user_message = db.Column(db.Text, nullable=False)
@@ -17,4 +20,18 @@ class ChatMessage(db.Model):
             "reply": self.bot_reply,
             "sentiment": self.sentiment,
             "timestamp": self.timestamp.isoformat() + "Z"
-        }
\ No newline at end of file
+        }
+
+class SentimentDaily(db.Model):
+    """Per-day message counts by sentiment, kept in step with ChatMessage by record_chat."""
+    day = db.Column(db.Date, primary_key=True)
+    sentiment = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ConversationSummary(db.Model):
+    """Rolling summary of a user's older chat turns, folded in up to summarized_through_id."""
+    user_id = db.Column(db.String(150), primary_key=True)
+    summary = db.Column(db.Text, nullable=False, default='')
+    summarized_through_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,148 @@
+# chat/response_cache.py
+import math
+import re
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from typing import Dict, Optional, Tuple
+
+NON_WORD_RE = re.compile(r"[^\w\s]+")
+HASH_BUCKETS = 1 << 18
+MAX_CANDIDATES = 20
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace, so trivially different FAQs share a key."""
+    return " ".join(NON_WORD_RE.sub(" ", text.lower()).split())
+
+
+def trigram_vector(text: str) -> Dict[int, float]:
+    """Unit-length hashed character-trigram vector of normalized text."""
+    padded = f" {text} "
+    counts = Counter(zlib.crc32(padded[i:i + 3].encode('utf-8')) % HASH_BUCKETS for i in range(len(padded) - 2))
+    norm = math.sqrt(sum(c * c for c in counts.values())) or 1.0
+    return {bucket: c / norm for bucket, c in counts.items()}
+
+
+class CacheEntry:
+    __slots__ = ('reply', 'vector', 'created', 'latency', 'hits')
+
+    def __init__(self, reply: str, vector: Dict[int, float], latency: float):
+        self.reply = reply
+        self.vector = vector
+        self.created = time.monotonic()
+        self.latency = latency
+        self.hits = 0
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of LLM replies keyed on normalized message text. With similarity
+    enabled, a miss on the exact key falls back to a hashed-trigram index: entries that
+    share trigram buckets with the message are scored by cosine similarity and the best
+    one is served if it reaches `threshold`. Each entry remembers how long its reply
+    took to generate, which is counted as saved latency on every hit.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 3600, similarity: bool = True,
+                 threshold: float = 0.9):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+        self.threshold = threshold
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._postings: Dict[int, set] = {}
+        self._lock = threading.Lock()
+        self.counters = {"lookups": 0, "exact_hits": 0, "similar_hits": 0, "misses": 0,
+                         "stores": 0, "evictions": 0, "saved_seconds": 0.0}
+
+    @classmethod
+    def from_config(cls, config) -> 'ResponseCache':
+        return cls(
+            max_entries=config.get('RESPONSE_CACHE_SIZE', 2048),
+            ttl=config.get('RESPONSE_CACHE_TTL', 3600),
+            similarity=config.get('RESPONSE_CACHE_SIMILARITY', True),
+            threshold=config.get('RESPONSE_CACHE_SIMILARITY_THRESHOLD', 0.9)
+        )
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        for bucket in entry.vector:
+            keys = self._postings.get(bucket)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[bucket]
+
+    def _expired(self, entry: CacheEntry, now: float) -> bool:
+        return self.ttl > 0 and now - entry.created > self.ttl
+
+    def _most_similar(self, vector: Dict[int, float], now: float) -> Tuple[Optional[str], float]:
+        overlap = Counter()
+        for bucket in vector:
+            overlap.update(self._postings.get(bucket, ()))
+        best_key, best_score = None, 0.0
+        for key, _ in overlap.most_common(MAX_CANDIDATES):
+            entry = self._entries[key]
+            if self._expired(entry, now):
+                continue
+            score = sum(weight * entry.vector.get(bucket, 0.0) for bucket, weight in vector.items())
+            if score > best_score:
+                best_key, best_score = key, score
+        return best_key, best_score
+
+    def get(self, message: str) -> Optional[Tuple[str, str]]:
+        """Returns (reply, 'exact' | 'similar') or None."""
+        key = normalize(message)
+        now = time.monotonic()
+        with self._lock:
+            self.counters["lookups"] += 1
+            tier = "exact"
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                self._remove(key)
+                entry = None
+            if entry is None and self.similarity and self._entries:
+                similar_key, score = self._most_similar(trigram_vector(key), now)
+                if similar_key is not None and score >= self.threshold:
+                    key, entry, tier = similar_key, self._entries[similar_key], "similar"
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            self.counters[f"{tier}_hits"] += 1
+            self.counters["saved_seconds"] += entry.latency
+            return entry.reply, tier
+
+    def put(self, message: str, reply: str, latency: float):
+        if self.max_entries <= 0:
+            return
+        key = normalize(message)
+        if not key:
+            return
+        entry = CacheEntry(reply, trigram_vector(key) if self.similarity else {}, latency)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for bucket in entry.vector:
+                self._postings.setdefault(bucket, set()).add(key)
+            self.counters["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.counters["evictions"] += 1
+
+    def stats(self, top: int = 10) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+            hits = counters["exact_hits"] + counters["similar_hits"]
+            popular = sorted(self._entries.items(), key=lambda item: item[1].hits, reverse=True)[:top]
+            return dict(
+                counters,
+                saved_seconds=round(counters["saved_seconds"], 3),
+                entries=len(self._entries),
+                hit_rate=round(hits / counters["lookups"], 4) if counters["lookups"] else 0.0,
+                top_entries=[{"message": key, "hits": entry.hits} for key, entry in popular if entry.hits]
+            )
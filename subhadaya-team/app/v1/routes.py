@@ -1,16 +1,20 @@
 # chat/resources.py
 import os
-from flask import request
+import json
+from flask import request, Response, stream_with_context, current_app
+from werkzeug.http import http_date
 from flask_restful import Resource
 from flasgger import swag_from
 from marshmallow import ValidationError
 
 from .services import ChatService
-from .schemas import ChatSendSchema, ChatHistoryQuerySchema, AnalyticsQuerySchema
+from .schemas import ChatSendSchema, ChatHistoryQuerySchema, AnalyticsQuerySchema, ExportQuerySchema
+from .export import EXPORT_FORMATS, ExportError, iter_chat_chunks, export_chats
 
 chat_send_schema = ChatSendSchema()
 history_schema = ChatHistoryQuerySchema()
 analytics_schema = AnalyticsQuerySchema()
+export_schema = ExportQuerySchema()
 
 class ChatSendResource(Resource):
 
@@ -29,16 +33,40 @@ class ChatSendResource(Resource):
         chat_service = ChatService()
         result = chat_service.get_reply_and_sentiment(user_id, message)
         
-        if 'error' not in result:
-            ChatService.record_chat(
-                user_id=user_id,
-                user_message=message,
-                bot_reply=result.get('reply'),
-                sentiment=result.get('sentiment')
-            )
+        # Sentiment is computed locally, so the message is recorded even when the LLM failed.
+        ChatService.record_chat(
+            user_id=user_id,
+            user_message=message,
+            bot_reply=None if 'error' in result else result.get('reply'),
+            sentiment=result.get('sentiment')
+        )
         
         return result, 201
 
+class ChatStreamResource(Resource):
+
+    yaml_path = os.path.join(os.path.dirname(__file__), 'docs', 'chat_stream.yml')
+
+    @swag_from(yaml_path)
+    def post(self):
+        try:
+            data = chat_send_schema.load(request.get_json())
+        except ValidationError as err:
+            return {'errors': err.messages}, 400
+
+        chat_service = ChatService()
+        events = chat_service.stream_reply_and_sentiment(data['user_id'], data['message'])
+
+        def generate():
+            for event, payload in events:
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
 class ChatHistoryResource(Resource):
 
     yaml_path = os.path.join(os.path.dirname(__file__), 'docs', 'chat_history.yml')
@@ -50,8 +78,104 @@ class ChatHistoryResource(Resource):
         except ValidationError as err:
             return {'errors': err.messages}, 400
 
-        history = ChatService.get_chat_history(args['user_id'], args['limit'])
-        return {'history': history}, 200
+        user_id, limit, before_id = args['user_id'], args['limit'], args['before_id']
+        latest = ChatService.get_latest_message_marker(user_id)
+        if latest is None:
+            return {'history': [], 'next_before_id': None}, 200
+
+        # Validators follow the user's newest message, so polling clients get a 304
+        # without the page being queried or serialized.
+        newest_id, newest_timestamp = latest
+        etag = f"{newest_id}-{limit}-{before_id or 0}"
+        headers = {
+            'ETag': f'"{etag}"',
+            'Last-Modified': http_date(newest_timestamp.replace(microsecond=0)),
+            'Cache-Control': 'no-cache'
+        }
+        # If-Modified-Since is not honoured: at one-second resolution a message written in
+        # the same second as the previous Last-Modified would get a 304, and the ETag,
+        # which every response carries, has no such blind spot.
+        if etag in request.if_none_match:
+            return Response(status=304, headers=headers)
+
+        cache = current_app.extensions['history_cache']
+        page = cache.get(user_id, limit, newest_id) if before_id is None else None
+        if page is None:
+            page = ChatService.get_chat_history(user_id, limit, before_id)
+            if before_id is None:
+                cache.set(user_id, limit, newest_id, page)
+        return page, 200, headers
+
+class AlertStreamResource(Resource):
+
+    yaml_path = os.path.join(os.path.dirname(__file__), 'docs', 'alerts_stream.yml')
+
+    @swag_from(yaml_path)
+    def get(self):
+        user_ids = [user_id for value in request.args.getlist('user_id') for user_id in value.split(',') if user_id]
+        last_event_id = request.headers.get('Last-Event-ID', type=int)
+        heartbeat = current_app.config.get('ALERT_HEARTBEAT_SECONDS', 15)
+        subscription = current_app.extensions['alerts'].subscribe(user_ids, last_event_id)
+
+        def generate():
+            try:
+                yield "retry: 3000\n\n"
+                while True:
+                    events = subscription.get(timeout=heartbeat)
+                    dropped = subscription.take_dropped()
+                    if dropped:
+                        yield f"event: dropped\ndata: {json.dumps({'dropped': dropped})}\n\n"
+                    for event in events:
+                        yield f"id: {event['id']}\nevent: alert\ndata: {json.dumps(event)}\n\n"
+                    if not events and not dropped:
+                        yield ": keep-alive\n\n"
+            finally:
+                subscription.close()
+
+        return Response(
+            generate(),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+class ChatExportResource(Resource):
+
+    yaml_path = os.path.join(os.path.dirname(__file__), 'docs', 'chat_export.yml')
+
+    @swag_from(yaml_path)
+    def get(self):
+        try:
+            args = export_schema.load(request.args)
+        except ValidationError as err:
+            return {'errors': err.messages}, 400
+
+        fmt = args['format']
+        chunks = iter_chat_chunks(
+            args['start_date'], args['end_date'], args['user_id'],
+            chunk_size=current_app.config.get('EXPORT_CHUNK_SIZE', 5000)
+        )
+        try:
+            body = export_chats(fmt, chunks)
+        except ExportError as err:
+            return {'errors': {'format': [str(err)]}}, 400
+
+        mimetype, extension = EXPORT_FORMATS[fmt]
+        return Response(
+            stream_with_context(body),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename="chat_export.{extension}"'}
+        )
+
+class ResponseCacheStatsResource(Resource):
+
+    yaml_path = os.path.join(os.path.dirname(__file__), 'docs', 'response_cache_stats.yml')
+
+    @swag_from(yaml_path)
+    def get(self):
+        cache = current_app.extensions.get('response_cache')
+        if cache is None:
+            return {'enabled': False}, 200
+        return dict(cache.stats(), enabled=True), 200
 
 class SentimentAnalyticsResource(Resource):
 
@@ -7,7 +7,14 @@ class ChatSendSchema(Schema):
 class ChatHistoryQuerySchema(Schema):
     limit = fields.Int(load_default=10, validate=validate.Range(min=1, max=100))
     user_id = fields.Str(required=True)
+    before_id = fields.Int(load_default=None, validate=validate.Range(min=1))
 
 class AnalyticsQuerySchema(Schema):
     start_date = fields.Date(format='iso', required=True)
-    end_date = fields.Date(format='iso', required=True)
\ No newline at end of file
+    end_date = fields.Date(format='iso', required=True)
+
+class ExportQuerySchema(Schema):
+    format = fields.Str(load_default='csv', validate=validate.OneOf(['csv', 'ndjson', 'parquet', 'arrow']))
+    start_date = fields.Date(format='iso', load_default=None)
+    end_date = fields.Date(format='iso', load_default=None)
+    user_id = fields.Str(load_default=None)
\ No newline at end of file
@@ -0,0 +1,181 @@
+# chat/sentiment.py
+import importlib
+import math
+import re
+from typing import Dict, Iterable, List, Optional
+
+SENTIMENTS = ("POSITIVE", "NEGATIVE", "NEUTRAL")
+
+# Word weights on a -3..3 scale; a small general-purpose chat lexicon.
+DEFAULT_LEXICON: Dict[str, float] = {
+    # positive
+    "good": 1.9, "great": 3.0, "excellent": 3.0, "amazing": 2.8, "awesome": 3.0, "fantastic": 3.0,
+    "wonderful": 2.8, "love": 3.0, "loved": 2.9, "loving": 2.7, "like": 1.3, "liked": 1.5, "enjoy": 2.2,
+    "enjoyed": 2.3, "happy": 2.7, "glad": 2.0, "pleased": 2.0, "thanks": 1.9, "thank": 1.5,
+    "grateful": 2.3, "helpful": 1.8, "nice": 1.8, "cool": 1.3, "perfect": 2.7, "best": 3.0,
+    "better": 1.9, "brilliant": 2.8, "fine": 0.8, "fun": 2.3, "excited": 2.2, "exciting": 2.2,
+    "beautiful": 2.9, "calm": 1.3, "hope": 1.9, "hopeful": 2.0, "proud": 2.1, "relieved": 1.9,
+    "success": 2.7, "successful": 2.8, "win": 2.8, "won": 2.7, "yay": 2.4, "wow": 2.3,
+    "appreciate": 1.7, "appreciated": 2.3, "recommend": 1.5, "easy": 1.9, "works": 1.0, "solved": 1.6,
+    "fixed": 1.0, "smile": 1.5, "joy": 2.8, "kind": 2.0, "sweet": 2.0, "lovely": 2.8, "okay": 0.9,
+    "ok": 0.9, "yes": 1.0, "welcome": 2.0, "safe": 1.9, "confident": 2.2, "satisfied": 1.8,
+    ":)": 2.0, ":-)": 2.0, ":d": 2.3, "<3": 1.9,
+    # negative
+    "bad": -2.5, "terrible": -3.0, "awful": -3.0, "horrible": -3.0, "hate": -2.7, "hated": -3.0,
+    "sad": -2.1, "unhappy": -1.8, "angry": -2.3, "mad": -2.2, "upset": -1.6, "annoyed": -1.6,
+    "annoying": -1.7, "frustrated": -2.2, "frustrating": -1.9, "disappointed": -1.9,
+    "disappointing": -2.2, "worst": -3.0, "worse": -2.1, "poor": -2.1, "broken": -1.9, "broke": -1.8,
+    "fail": -2.5, "failed": -2.3, "failing": -2.3, "failure": -2.4, "error": -1.7, "errors": -1.4,
+    "bug": -1.2, "crash": -1.8, "crashed": -1.8,
+    "wrong": -2.1, "useless": -1.8, "stupid": -2.4, "slow": -1.0, "confused": -1.3, "confusing": -1.4,
+    "difficult": -1.4, "hard": -0.4, "pain": -2.3, "hurt": -2.4, "sick": -1.9, "tired": -1.9,
+    "worried": -1.2, "worry": -1.9, "afraid": -2.0, "scared": -2.2, "fear": -2.2, "anxious": -1.0,
+    "stressed": -1.4, "stress": -1.8, "depressed": -2.3, "lonely": -2.0, "alone": -1.0, "cry": -2.1,
+    "crying": -2.1, "miserable": -2.2, "hopeless": -2.0, "ugly": -2.3, "boring": -1.3, "lost": -1.3,
+    "never": -0.5, "sucks": -1.5, "sorry": -0.3, "unfortunately": -1.2, "rude": -2.0,
+    "scam": -2.7, "disgusting": -2.4, "kill": -3.0, "die": -2.9, "dead": -3.0, "suicide": -3.5,
+    ":(": -1.9, ":-(": -1.9, ":'(": -2.2,
+    # Words that name a topic rather than a feeling ("I have a problem with my account"):
+    # they score nothing themselves but still take a negation, so "no problem" does not
+    # flip the word after it.
+    "problem": 0.0, "problems": 0.0, "issue": 0.0, "issues": 0.0, "worries": 0.0,
+}
+
+NEGATIONS = frozenset({
+    "not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "cannot", "without",
+    "dont", "don't", "doesnt", "doesn't", "didnt", "didn't", "isnt", "isn't", "wasnt", "wasn't",
+    "arent", "aren't", "cant", "can't", "couldnt", "couldn't", "wont", "won't", "wouldnt", "wouldn't",
+    "shouldnt", "shouldn't", "aint", "ain't", "hardly", "barely",
+})
+
+BOOSTERS: Dict[str, float] = {
+    "very": 0.3, "really": 0.3, "so": 0.3, "extremely": 0.4, "super": 0.3, "totally": 0.3,
+    "absolutely": 0.4, "incredibly": 0.4, "too": 0.2, "quite": 0.1,
+    "slightly": -0.3, "somewhat": -0.2, "kinda": -0.2,
+}
+
+# Clause punctuation is kept as tokens so a negation never reaches past it.
+TOKEN_RE = re.compile(r"[:;]'?-?[()dp]|<3|[a-z]+(?:'[a-z]+)?|[.,!?;:]")
+CLAUSE_BREAKS = frozenset(".,!?;:")
+NEGATION_SCOPE = 3
+NEGATION_FACTOR = -0.74
+
+
+class SentimentEngine:
+    """
+    In-process sentiment classifier. Subclasses implement score_batch, which maps
+    texts to compound scores in [-1, 1]; labels come from the threshold.
+    """
+    threshold = 0.05
+
+    def score_batch(self, texts: Iterable[str]) -> List[float]:
+        raise NotImplementedError
+
+    def score(self, text: str) -> float:
+        return self.score_batch([text])[0]
+
+    def label(self, score: float) -> str:
+        if score >= self.threshold:
+            return "POSITIVE"
+        if score <= -self.threshold:
+            return "NEGATIVE"
+        return "NEUTRAL"
+
+    def classify_batch(self, texts: Iterable[str]) -> List[str]:
+        return [self.label(score) for score in self.score_batch(texts)]
+
+    def classify(self, text: str) -> str:
+        return self.label(self.score(text))
+
+
+class LexiconSentimentEngine(SentimentEngine):
+    """
+    Lexicon scorer with negation and booster handling. A negation flips the first
+    lexicon word within NEGATION_SCOPE tokens of the same clause; a negator with a
+    weight of its own ("never") only counts it when it negates nothing. Each message
+    costs one regex pass and a dictionary lookup per token, so it runs in
+    microseconds and needs no network round trip.
+    """
+
+    def __init__(self, lexicon: Optional[Dict[str, float]] = None, threshold: float = 0.05):
+        self.lexicon = dict(DEFAULT_LEXICON if lexicon is None else lexicon)
+        self.threshold = threshold
+
+    @classmethod
+    def from_file(cls, path: str, threshold: float = 0.05) -> 'LexiconSentimentEngine':
+        """Loads extra `word<TAB>weight` lines on top of the default lexicon."""
+        lexicon = dict(DEFAULT_LEXICON)
+        with open(path, encoding='utf-8') as handle:
+            for line in handle:
+                word, _, weight = line.strip().partition('\t')
+                if word and weight and not word.startswith('#'):
+                    lexicon[word.lower()] = float(weight)
+        return cls(lexicon, threshold)
+
+    def _score_tokens(self, tokens: List[str]) -> float:
+        lexicon = self.lexicon
+        total = 0.0
+        negate_until = -1
+        negator_weight = 0.0  # the open negator's own weight, kept if it negates nothing
+        boost = 0.0
+        for i, token in enumerate(tokens):
+            if negate_until >= 0 and (i > negate_until or token in CLAUSE_BREAKS):
+                total += negator_weight
+                negate_until, negator_weight = -1, 0.0
+            if token in CLAUSE_BREAKS:
+                boost = 0.0
+                continue
+            if token in NEGATIONS:
+                total += negator_weight
+                negate_until, negator_weight = i + NEGATION_SCOPE, lexicon.get(token, 0.0)
+                continue
+            if token in BOOSTERS:
+                boost += BOOSTERS[token]
+                continue
+            weight = lexicon.get(token)
+            if weight is None:
+                continue
+            if boost:
+                weight += math.copysign(boost, weight) if weight else 0.0
+                boost = 0.0
+            if negate_until >= 0:
+                weight *= NEGATION_FACTOR
+                negate_until, negator_weight = -1, 0.0
+            total += weight
+        total += negator_weight
+        return total / math.sqrt(total * total + 15)
+
+    def score_batch(self, texts: Iterable[str]) -> List[float]:
+        findall = TOKEN_RE.findall
+        return [self._score_tokens(findall(text.lower())) for text in texts]
+
+
+ENGINES = {
+    'lexicon': LexiconSentimentEngine,
+}
+
+
+def engine_from_config(config) -> SentimentEngine:
+    """
+    Builds the engine named by SENTIMENT_ENGINE: a key of ENGINES, or a
+    'package.module:ClassName' path to any SentimentEngine subclass.
+    """
+    name = config.get('SENTIMENT_ENGINE', 'lexicon')
+    threshold = config.get('SENTIMENT_THRESHOLD', 0.05)
+
+    if name == 'lexicon':
+        lexicon_path = config.get('SENTIMENT_LEXICON_PATH')
+        if lexicon_path:
+            return LexiconSentimentEngine.from_file(lexicon_path, threshold)
+        return LexiconSentimentEngine(threshold=threshold)
+
+    if name in ENGINES:
+        engine_class = ENGINES[name]
+    else:
+        module_name, _, class_name = name.partition(':')
+        if not class_name:
+            raise ValueError(f"Unknown SENTIMENT_ENGINE '{name}'; use one of {sorted(ENGINES)} or 'module:Class'.")
+        engine_class = getattr(importlib.import_module(module_name), class_name)
+    engine = engine_class()
+    engine.threshold = threshold
+    return engine
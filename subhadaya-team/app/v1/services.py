@@ -1,89 +1,240 @@
 # chat/services.py
 import os
-import json
-from datetime import datetime
+import time
+from collections import Counter
+from datetime import datetime, date
+from typing import Optional
 from flask import current_app
-import google.generativeai as genai
-from sqlalchemy import func
+from sqlalchemy import func, insert, update, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
 
 from app import db
-from .models import ChatMessage
+from .models import ChatMessage, SentimentDaily
+
+FALLBACK_REPLY = "I am currently unable to process your request. Please try again later."
 
 class ChatService:
     def __init__(self):
-        api_key = current_app.config.get('GEMINI_API_KEY')
-        if not api_key:
+        self.client = current_app.extensions.get('gemini')
+        if self.client is None:
             raise ValueError("GEMINI_API_KEY is not configured.")
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        self.sentiment_engine = current_app.extensions['sentiment']
+        self.memory = current_app.extensions.get('conversation_memory')
+        self.response_cache = current_app.extensions.get('response_cache')
+        self.alerts = current_app.extensions['alerts']
 
-    def get_reply_and_sentiment(self, user_id: str, message: str) -> dict:
-        prompt = f"""
-        Analyze the following user message and provide a response in JSON format.
+    def classify(self, user_id: str, message: str) -> dict:
+        """Local sentiment; NEGATIVE messages are pushed to the moderator alert stream right away."""
+        sentiment = self.sentiment_engine.classify(message)
+        result = {"sentiment": sentiment}
+        if sentiment == "NEGATIVE":
+            result["alert"] = True
+            self.alerts.publish(user_id, message, sentiment)
+        return result
+
+    def _reply_context(self, user_id: str) -> str:
+        return self.memory.context_for(user_id) if self.memory else ""
+
+    def _reply_cache(self, context: str):
+        """
+        The response cache, or None when the prompt carries conversation context: such a
+        reply is built from one user's private history and only fits that conversation.
+        """
+        return self.response_cache if not context else None
+
+    def _reply_prompt(self, message: str, context: str) -> str:
+        if context:
+            context = f"Context from this conversation so far:\n{context}\n"
+        return f"""
+        {context}
+        Reply to the following user message.
         The user's message is: "{message}"
 
-        Your response must be a single JSON object with two keys:
-        1. "reply": A helpful, friendly, and concise response to the user's message.
-        2. "sentiment": Analyze the sentiment of the user's message. It must be one of three strings: "POSITIVE", "NEGATIVE", or "NEUTRAL".
-        
-        JSON response:
+        Write a helpful, friendly, and concise reply as plain text.
         """
-        try:
-            response = self.model.generate_content(prompt)
-            cleaned_text = response.text.strip().replace('```json', '').replace('```', '').strip()
-            result = json.loads(cleaned_text)
-            
-            if result.get("sentiment") == "NEGATIVE":
-                result["alert"] = True
-            
+
+    def get_reply_and_sentiment(self, user_id: str, message: str) -> dict:
+        # Sentiment comes from the local engine, so it is known before (and without) the LLM call.
+        result = self.classify(user_id, message)
+        context = self._reply_context(user_id)
+        cache = self._reply_cache(context)
+        cached = cache.get(message) if cache else None
+        if cached is not None:
+            result["reply"], result["cached"] = cached
             return result
+        try:
+            start = time.perf_counter()
+            result["reply"] = self.client.generate(self._reply_prompt(message, context)).strip()
+            if cache:
+                cache.put(message, result["reply"], time.perf_counter() - start)
         except Exception as e:
             current_app.logger.error(f"Gemini API call failed: {e}")
-            return {
-                "reply": "I am currently unable to process your request. Please try again later.",
-                "sentiment": "NEUTRAL",
-                "error": str(e)
-            }
+            result["reply"] = FALLBACK_REPLY
+            result["error"] = str(e)
+        return result
+
+    def stream_reply_and_sentiment(self, user_id: str, message: str):
+        """
+        Streams the reply as ('token', {...}) events while the model generates it, then
+        records the chat and finishes with a ('sentiment', {...}) event. If the model call
+        fails the chat is still recorded, without a reply, and an ('error', {...}) event
+        carrying the sentiment ends the stream.
+        """
+        result = self.classify(user_id, message)
+        context = self._reply_context(user_id)
+        cache = self._reply_cache(context)
+        cached = cache.get(message) if cache else None
+        if cached is not None:
+            reply, result["cached"] = cached
+            yield 'token', {"text": reply}
+            chat_message = self.record_chat(user_id, message, reply, result["sentiment"])
+            yield 'sentiment', dict(result, id=chat_message.id, reply=reply)
+            return
+
+        chunks = []
+        start = time.perf_counter()
+        try:
+            for chunk in self.client.stream(self._reply_prompt(message, context)):
+                chunks.append(chunk)
+                yield 'token', {"text": chunk}
+        except Exception as e:
+            current_app.logger.error(f"Gemini streaming call failed: {e}")
+            chat_message = self.record_chat(user_id, message, None, result["sentiment"])
+            yield 'error', dict(result, id=chat_message.id, reply=FALLBACK_REPLY, error=str(e))
+            return
+
+        reply = "".join(chunks).strip()
+        if cache:
+            cache.put(message, reply, time.perf_counter() - start)
+        chat_message = self.record_chat(user_id, message, reply, result["sentiment"])
+        yield 'sentiment', dict(result, id=chat_message.id, reply=reply)
 
     @staticmethod
-    def record_chat(user_id: str, user_message: str, bot_reply: str, sentiment: str):
-        chat_message = ChatMessage(
-            user_id=user_id,
-            user_message=user_message,
-            bot_reply=bot_reply,
-            sentiment=sentiment
-        )
+    def record_chat(user_id: str, user_message: str, bot_reply: Optional[str], sentiment: str):
+        """
+        Stores one chat turn. With CHAT_PERSISTENCE_MODE=write_behind the row is queued and
+        written with the next batch, and the returned (unsaved) ChatMessage has no id.
+        """
+        row = {
+            "user_id": user_id,
+            "user_message": user_message,
+            "bot_reply": bot_reply,
+            "sentiment": sentiment,
+            "timestamp": datetime.utcnow()
+        }
+        writer = current_app.extensions.get('chat_writer')
+        if writer is not None:
+            writer.add(row)
+            return ChatMessage(**row)
+
+        chat_message = ChatMessage(**row)
         db.session.add(chat_message)
+        ChatService.increment_sentiment_rollup(Counter({(chat_message.timestamp.date(), sentiment): 1}))
         db.session.commit()
+        current_app.extensions['history_cache'].invalidate([user_id])
         return chat_message
 
     @staticmethod
-    def get_chat_history(user_id: str, limit: int) -> list:
-        messages = ChatMessage.query.filter_by(user_id=user_id)\
-                                     .order_by(ChatMessage.timestamp.desc())\
-                                     .limit(limit)\
-                                     .all()
-        return [msg.to_dict() for msg in reversed(messages)]
+    def increment_sentiment_rollup(counts: Counter):
+        """
+        Adds {(day, sentiment): n} to SentimentDaily inside the caller's transaction, with a
+        single upsert statement on SQLite and PostgreSQL.
+        """
+        rows = [{"day": day, "sentiment": sentiment, "count": n} for (day, sentiment), n in counts.items()]
+        if not rows:
+            return
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+            stmt = dialect_insert(SentimentDaily)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[SentimentDaily.day, SentimentDaily.sentiment],
+                set_={"count": SentimentDaily.count + stmt.excluded['count']}
+            )
+            db.session.execute(stmt, rows)
+            return
+        for row in rows:
+            updated = db.session.execute(
+                update(SentimentDaily)
+                .where(SentimentDaily.day == row["day"], SentimentDaily.sentiment == row["sentiment"])
+                .values(count=SentimentDaily.count + row["count"])
+            )
+            if updated.rowcount == 0:
+                db.session.execute(insert(SentimentDaily), [row])
 
     @staticmethod
-    def get_sentiment_analytics(start_date: str, end_date: str) -> dict:
-        start_datetime = datetime.fromisoformat(start_date)
-        end_datetime = datetime.fromisoformat(end_date)
-
-        sentiment_counts = db.session.query(
+    def rebuild_sentiment_rollup() -> int:
+        """
+        Recomputes SentimentDaily from ChatMessage in one transaction. Returns the number
+        of rollup rows. The delete comes first so the transaction holds the write lock
+        before counting, and no increment can land between the count and the insert.
+        """
+        db.session.query(SentimentDaily).delete()
+        grouped = db.session.query(
             func.date(ChatMessage.timestamp).label('date'),
             ChatMessage.sentiment,
-            func.count(ChatMessage.id).label('count')
-        ).filter(
-            ChatMessage.timestamp >= start_datetime,
-            ChatMessage.timestamp <= end_datetime
+            func.count(ChatMessage.id)
         ).group_by('date', ChatMessage.sentiment).all()
+        rows = [
+            {"day": day if isinstance(day, date) else date.fromisoformat(day), "sentiment": sentiment, "count": count}
+            for day, sentiment, count in grouped
+        ]
+        if rows:
+            db.session.execute(insert(SentimentDaily), rows)
+        db.session.commit()
+        return len(rows)
+
+    @staticmethod
+    def get_latest_message_marker(user_id: str):
+        """(id, timestamp) of the user's newest message, or None; one probe of the composite index."""
+        return db.session.query(ChatMessage.id, ChatMessage.timestamp)\
+                         .filter(ChatMessage.user_id == user_id)\
+                         .order_by(ChatMessage.timestamp.desc(), ChatMessage.id.desc())\
+                         .first()
+
+    @staticmethod
+    def get_chat_history(user_id: str, limit: int, before_id: Optional[int] = None) -> dict:
+        """
+        One page of history, oldest first, ending just before message `before_id` (or at the
+        newest message). `next_before_id` pages further back and is None on the last page.
+        """
+        query = ChatMessage.query.filter(ChatMessage.user_id == user_id)
+        if before_id is not None:
+            cursor = db.session.query(ChatMessage.timestamp, ChatMessage.id)\
+                               .filter(ChatMessage.id == before_id, ChatMessage.user_id == user_id)\
+                               .first()
+            if cursor is None:
+                return {"history": [], "next_before_id": None}
+            query = query.filter(tuple_(ChatMessage.timestamp, ChatMessage.id) < tuple_(*cursor))
+
+        messages = query.order_by(ChatMessage.timestamp.desc(), ChatMessage.id.desc())\
+                        .limit(limit + 1)\
+                        .all()
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        return {
+            "history": [msg.to_dict() for msg in reversed(messages)],
+            "next_before_id": messages[-1].id if has_more else None
+        }
+
+    @staticmethod
+    def get_sentiment_analytics(start_date: str, end_date: str) -> dict:
+        # Reads the SentimentDaily rollup, so the cost grows with the number of days, not messages.
+        sentiment_counts = db.session.query(
+            SentimentDaily.day,
+            SentimentDaily.sentiment,
+            SentimentDaily.count
+        ).filter(
+            SentimentDaily.day >= date.fromisoformat(start_date),
+            SentimentDaily.day <= date.fromisoformat(end_date)
+        ).order_by(SentimentDaily.day).all()
 
         daily_counts = {}
-        for date, sentiment, count in sentiment_counts:
-            if date not in daily_counts:
-                daily_counts[date] = {"POSITIVE": 0, "NEGATIVE": 0, "NEUTRAL": 0}
-            daily_counts[date][sentiment] = count
+        for day, sentiment, count in sentiment_counts:
+            key = day.isoformat()
+            if key not in daily_counts:
+                daily_counts[key] = {"POSITIVE": 0, "NEGATIVE": 0, "NEUTRAL": 0}
+            daily_counts[key][sentiment] = count
 
         return {
             "query_range": {"start_date": start_date, "end_date": end_date},
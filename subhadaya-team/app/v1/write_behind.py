@@ -0,0 +1,119 @@
+# chat/write_behind.py
+import atexit
+import threading
+import time
+from collections import Counter
+from typing import List
+
+from sqlalchemy import insert
+
+from app import db
+from .models import ChatMessage
+
+
+class ChatWriteBuffer:
+    """
+    Write-behind queue for chat messages. record_chat hands rows over and returns
+    immediately; a background thread inserts them in batches (one executemany plus one
+    rollup upsert per batch) when batch_size rows are waiting or flush_interval seconds
+    have passed. Once max_pending rows are waiting, callers flush inline instead of
+    letting the queue grow; if that flush fails too, add() raises rather than accept a
+    row it may not be able to keep. Rows of a failed flush are always put back, never
+    dropped. close() flushes whatever is left and runs at interpreter exit.
+    """
+
+    def __init__(self, app, batch_size: int = 500, flush_interval: float = 0.5, max_pending: int = 10000):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: List[dict] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self.stats = {"queued": 0, "written": 0, "batches": 0, "failed_batches": 0, "rejected": 0, "lost_at_close": 0}
+        self._thread = threading.Thread(target=self._run, name='chat-write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def from_config(cls, app) -> 'ChatWriteBuffer':
+        return cls(
+            app,
+            batch_size=app.config.get('WRITE_BEHIND_BATCH_SIZE', 500),
+            flush_interval=app.config.get('WRITE_BEHIND_FLUSH_INTERVAL', 0.5),
+            max_pending=app.config.get('WRITE_BEHIND_MAX_PENDING', 10000)
+        )
+
+    def add(self, row: dict):
+        with self._lock:
+            full = len(self._pending) >= self.max_pending
+        if full:
+            # Backpressure: the caller waits for a write instead of the queue growing.
+            self.flush()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Chat write buffer is closed.")
+            if len(self._pending) >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise RuntimeError(f"Chat write buffer is full ({len(self._pending)} rows) and the database is not accepting writes.")
+            self._pending.append(row)
+            self.stats["queued"] += 1
+            pending = len(self._pending)
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Writes everything queued so far in one transaction. Returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+            from .services import ChatService
+            with self.app.app_context():
+                try:
+                    db.session.execute(insert(ChatMessage), rows)
+                    ChatService.increment_sentiment_rollup(
+                        Counter((row["timestamp"].date(), row["sentiment"]) for row in rows)
+                    )
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    self.app.logger.error(f"Write-behind flush of {len(rows)} chat messages failed: {e}")
+                    self.stats["failed_batches"] += 1
+                    with self._lock:
+                        # Callers were already answered; keep every row for the next attempt.
+                        # add() stops accepting new ones while the queue is over max_pending.
+                        self._pending[:0] = rows
+                    return 0
+            self.app.extensions['history_cache'].invalidate({row["user_id"] for row in rows})
+            self.stats["written"] += len(rows)
+            self.stats["batches"] += 1
+            return len(rows)
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self.pending() and self.flush() == 0:
+                # The batch failed and was put back; back off before retrying.
+                time.sleep(self.flush_interval)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=max(self.flush_interval * 2, 1))
+        self.flush()
+        lost = self.pending()
+        if lost:
+            self.stats["lost_at_close"] += lost
+            self.app.logger.error(f"Write-behind closed with {lost} chat messages that could not be written.")
@@ -0,0 +1,99 @@
+"""
+Alert fan-out throughput: publisher threads push negative-sentiment alerts through the
+AlertBroker while moderator subscribers drain them - some see everything, some filter
+on a few users, and one is deliberately slow. Reports publish rate, publish latency
+(what the chat request path pays) and what each kind of subscriber received or dropped.
+
+    python benchmarks/alert_fanout.py --alerts 50000 --subscribers 20
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.v1.alerts import AlertBroker
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def consume(subscription, stop, counts, delay):
+    while not stop.is_set():
+        events = subscription.get(timeout=0.05)
+        counts["received"] += len(events)
+        if delay and events:
+            time.sleep(delay)
+    counts["received"] += len(subscription.get(timeout=0))
+    counts["dropped"] = subscription.dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alerts", type=int, default=50000)
+    parser.add_argument("--publishers", type=int, default=4)
+    parser.add_argument("--subscribers", type=int, default=20, help="moderators receiving every alert")
+    parser.add_argument("--filtered", type=int, default=20, help="moderators following 3 users each")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--queue-size", type=int, default=256)
+    args = parser.parse_args()
+
+    broker = AlertBroker(queue_size=args.queue_size)
+    stop = threading.Event()
+    consumers = []
+
+    def start_consumer(kind, user_ids, delay=0.0):
+        counts = {"kind": kind, "received": 0, "dropped": 0}
+        subscription = broker.subscribe(user_ids)
+        thread = threading.Thread(target=consume, args=(subscription, stop, counts, delay), daemon=True)
+        thread.start()
+        consumers.append((thread, counts))
+
+    for _ in range(args.subscribers):
+        start_consumer("all", None)
+    for i in range(args.filtered):
+        start_consumer("filtered", [f"user-{(i * 3 + k) % args.users}" for k in range(3)])
+    start_consumer("slow (all)", None, delay=0.05)
+
+    latencies = []
+
+    def publish(offset):
+        local = []
+        for i in range(offset, args.alerts, args.publishers):
+            start = time.perf_counter()
+            broker.publish(f"user-{i % args.users}", "This is awful", "NEGATIVE")
+            local.append(time.perf_counter() - start)
+        latencies.extend(local)
+
+    start = time.perf_counter()
+    publishers = [threading.Thread(target=publish, args=(i,)) for i in range(args.publishers)]
+    for thread in publishers:
+        thread.start()
+    for thread in publishers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    time.sleep(0.3)
+    stop.set()
+    for thread, _ in consumers:
+        thread.join()
+
+    print(f"published {args.alerts:,} alerts in {elapsed:.2f}s = {args.alerts / elapsed:,.0f} alerts/s")
+    print(f"publish latency p50 {percentile(latencies, 50) * 1e6:.1f}us  p99 {percentile(latencies, 99) * 1e6:.1f}us")
+    summary = {}
+    for _, counts in consumers:
+        entry = summary.setdefault(counts["kind"], [0, 0, 0])
+        entry[0] += 1
+        entry[1] += counts["received"]
+        entry[2] += counts["dropped"]
+    print(f"{'subscriber':<12} {'count':>6} {'received/sub':>13} {'dropped/sub':>12}")
+    for kind, (count, received, dropped) in summary.items():
+        print(f"{kind:<12} {count:>6} {received / count:>13,.0f} {dropped / count:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Chat insert throughput of ChatService.record_chat with CHAT_PERSISTENCE_MODE=sync (one
+commit per message) versus write_behind (queued, inserted in batches). Several threads
+record messages into a SQLite file; the write_behind time includes the final flush.
+
+    python benchmarks/chat_insert_throughput.py --threads 8 --messages 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run(mode, threads, messages, tuned):
+    from app import create_app
+    from app.config import DevelopmentConfig
+    from app.v1.models import ChatMessage
+    from app.v1.services import ChatService
+
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchmarkConfig(DevelopmentConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'chat.db')}"
+            SQLITE_TUNING = tuned
+            CHAT_PERSISTENCE_MODE = mode
+
+        app = create_app(BenchmarkConfig)
+
+        def record(i):
+            with app.app_context():
+                start = time.perf_counter()
+                ChatService.record_chat(f"user-{i % 50}", f"Message {i}", f"Reply {i}", "NEUTRAL")
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            latencies = list(executor.map(record, range(messages)))
+        writer = app.extensions.get('chat_writer')
+        if writer is not None:
+            writer.close()
+        elapsed = time.perf_counter() - start
+
+        with app.app_context():
+            stored = ChatMessage.query.count()
+    return messages / elapsed, percentile(latencies, 50), percentile(latencies, 99), stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--tuned", action="store_true", help="also enable SQLITE_TUNING")
+    args = parser.parse_args()
+
+    print(f"{'mode':<13} {'inserts/s':>10} {'p50 call':>10} {'p99 call':>10} {'stored':>7}")
+    for mode in ('sync', 'write_behind'):
+        throughput, p50, p99, stored = run(mode, args.threads, args.messages, args.tuned)
+        print(f"{mode:<13} {throughput:>10.0f} {p50 * 1000:>8.2f}ms {p99 * 1000:>8.2f}ms {stored:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Time-to-first-byte of /v1/chat/send versus the SSE /v1/chat/stream endpoint, against
+the local fake Gemini. /send only answers once the whole completion is parsed, while
+/stream forwards the first reply tokens as soon as the model emits them.
+
+    python benchmarks/chat_ttfb.py --requests 20 --latency 0.5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_gemini import FakeGeminiServer
+from app import create_app
+from app.config import DevelopmentConfig
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def measure(client, path, requests):
+    first_byte, total = [], []
+    for i in range(requests):
+        start = time.perf_counter()
+        response = client.post(path, json={"user_id": f"user-{i}", "message": "Hello, how are you?"}, buffered=False)
+        chunks = iter(response.response)
+        next(chunks)
+        first_byte.append(time.perf_counter() - start)
+        for _ in chunks:
+            pass
+        response.close()
+        total.append(time.perf_counter() - start)
+    return first_byte, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5, help="fake model seconds per completion")
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(("127.0.0.1", 0), latency=args.latency).start()
+
+    class BenchmarkConfig(DevelopmentConfig):
+        SQLALCHEMY_DATABASE_URI = 'sqlite://'
+        GEMINI_API_KEY = 'benchmark-key'
+        GEMINI_API_ENDPOINT = server.url
+
+    app = create_app(BenchmarkConfig)
+    client = app.test_client()
+
+    print(f"{'endpoint':<16} {'ttfb p50':>9} {'ttfb p99':>9} {'total p50':>10}")
+    for path in ('/v1/chat/send', '/v1/chat/stream'):
+        first_byte, total = measure(client, path, args.requests)
+        print(f"{path:<16} {percentile(first_byte, 50) * 1000:>7.0f}ms {percentile(first_byte, 99) * 1000:>7.0f}ms "
+              f"{percentile(total, 50) * 1000:>8.0f}ms")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
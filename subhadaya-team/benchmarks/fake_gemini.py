@@ -0,0 +1,102 @@
+"""
+A local stand-in for the Gemini generateContent and streamGenerateContent REST
+endpoints, for offline benchmarks.
+
+Every request takes `--latency` seconds and answers with a canned plain-text chat
+reply. Streamed responses send it as SSE chunks and spread the latency evenly over
+them, like a model emitting tokens.
+
+    python benchmarks/fake_gemini.py --port 8089 --latency 0.5
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8089 python run.py
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_REPLY = "Thanks for reaching out! I'm happy to help with that."
+
+
+class FakeGeminiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.5):
+        super().__init__(address, FakeGeminiHandler)
+        self.latency = latency
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes; without TCP_NODELAY a kept-alive
+    # connection stalls on Nagle + delayed ACK and hides the benefit of reuse.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        with self.server.lock:
+            self.server.requests += 1
+
+        if self.path.split('?')[0].endswith(':generateContent'):
+            time.sleep(self.server.latency)
+            self._send_json(200, {
+                "candidates": [{"content": {"role": "model", "parts": [{"text": CANNED_REPLY}]}, "finishReason": "STOP"}]
+            })
+            return
+
+        if self.path.split('?')[0].endswith(':streamGenerateContent'):
+            words = CANNED_REPLY.split(' ')
+            chunks = [' '.join(words[i:i + 2]) + ' ' for i in range(0, len(words), 2)]
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for chunk in chunks:
+                time.sleep(self.server.latency / len(chunks))
+                event = {"candidates": [{"content": {"role": "model", "parts": [{"text": chunk}]}}]}
+                data = f"data: {json.dumps(event)}\r\n\r\n".encode('utf-8')
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+            return
+
+        self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per response")
+    args = parser.parse_args()
+
+    server = FakeGeminiServer((args.host, args.port), latency=args.latency)
+    print(f"Fake Gemini listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
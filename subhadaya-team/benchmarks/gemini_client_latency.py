@@ -0,0 +1,70 @@
+"""
+Latency of ChatService against the local fake Gemini, comparing a client rebuilt
+for every request (a new HTTP session each time, no connection reuse) with the
+app-scoped GeminiClient created once in create_app.
+
+    python benchmarks/gemini_client_latency.py --requests 500 --concurrency 8 --latency 0.005
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_gemini import FakeGeminiServer
+from app import create_app
+from app.config import DevelopmentConfig
+from app.v1.gemini import GeminiClient
+from app.v1.services import ChatService
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def measure(app, requests, concurrency, per_request_client):
+    def call(i):
+        with app.app_context():
+            start = time.perf_counter()
+            service = ChatService()
+            if per_request_client:
+                service.client = GeminiClient.from_config(app.config)
+            service.get_reply_and_sentiment(f"user-{i}", "Hello, how are you?")
+            return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(call, range(requests)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.005, help="fake model seconds per call")
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(("127.0.0.1", 0), latency=args.latency).start()
+
+    class BenchmarkConfig(DevelopmentConfig):
+        SQLALCHEMY_DATABASE_URI = 'sqlite://'
+        GEMINI_API_KEY = 'benchmark-key'
+        GEMINI_API_ENDPOINT = server.url
+
+    app = create_app(BenchmarkConfig)
+
+    print(f"{'client':<20} {'p50':>8} {'p99':>8} {'req/s':>8}")
+    for label, per_request in (("per-request (before)", True), ("app-scoped (after)", False)):
+        start = time.perf_counter()
+        timings = measure(app, args.requests, args.concurrency, per_request)
+        wall = time.perf_counter() - start
+        print(f"{label:<20} {percentile(timings, 50) * 1000:>6.1f}ms {percentile(timings, 99) * 1000:>6.1f}ms "
+              f"{args.requests / wall:>8.1f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
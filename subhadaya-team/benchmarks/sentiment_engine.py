@@ -0,0 +1,82 @@
+"""
+Cost of the in-process sentiment engine: per-message classify() latency and batch
+throughput of classify_batch() over synthetic chat messages. Known-tricky messages
+in REGRESSIONS are checked first; the script exits non-zero if any is mislabelled.
+
+    python benchmarks/sentiment_engine.py --messages 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config
+from app.v1.sentiment import engine_from_config
+
+TEMPLATES = [
+    "Hello, how are you today?",
+    "Thanks so much, this was really helpful!",
+    "The app keeps crashing and I am so frustrated.",
+    "I'm not happy with the answer, it was wrong again.",
+    "Can you tell me what time the library opens?",
+    "I love this, great work :)",
+    "I feel lonely and tired, nothing works out for me.",
+    "It's fine I guess, not bad at all.",
+]
+
+# (message, expected label) pairs the negation handling once got wrong.
+REGRESSIONS = [
+    ("No problem, thanks!", "POSITIVE"),
+    ("no problem thanks", "POSITIVE"),
+    ("no", "NEUTRAL"),
+    ("No.", "NEUTRAL"),
+    ("I have a problem with my account", "NEUTRAL"),
+    ("No worries, have a great day", "POSITIVE"),
+    ("I'm not happy with the answer", "NEGATIVE"),
+    ("never good", "NEGATIVE"),
+    ("not bad at all", "POSITIVE"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    messages = [rng.choice(TEMPLATES) for _ in range(args.messages)]
+    engine = engine_from_config({
+        'SENTIMENT_ENGINE': Config.SENTIMENT_ENGINE,
+        'SENTIMENT_THRESHOLD': Config.SENTIMENT_THRESHOLD,
+    })
+
+    failures = [(text, expected, engine.classify(text)) for text, expected in REGRESSIONS
+                if engine.classify(text) != expected]
+    for text, expected, got in failures:
+        print(f"REGRESSION {text!r}: expected {expected}, got {got}")
+    if failures:
+        sys.exit(1)
+    print(f"regressions: {len(REGRESSIONS)} ok")
+
+    start = time.perf_counter()
+    for message in messages[:10000]:
+        engine.classify(message)
+    single = (time.perf_counter() - start) / min(10000, len(messages))
+
+    start = time.perf_counter()
+    labels = engine.classify_batch(messages)
+    batch = time.perf_counter() - start
+
+    print(f"classify():       {single * 1e6:.1f} us/message")
+    print(f"classify_batch(): {len(messages) / batch:,.0f} messages/s")
+    for template in TEMPLATES:
+        print(f"  {engine.classify(template):<8} {template}")
+    print("labels: " + ", ".join(f"{label}={labels.count(label)}" for label in ("POSITIVE", "NEGATIVE", "NEUTRAL")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Sentiment analytics over a large synthetic chat table: the original GROUP BY
+func.date(timestamp) scan over ChatMessage versus reading the SentimentDaily rollup.
+
+    python benchmarks/sentiment_rollup.py --rows 1000000
+    python benchmarks/sentiment_rollup.py --rows 10000000 --db /tmp/chat_10m.db   # reuses the file on later runs
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+
+SENTIMENTS = ("POSITIVE", "NEGATIVE", "NEUTRAL")
+
+
+def fill(db_path, rows, days, seed, chunk=100000):
+    rng = random.Random(seed)
+    first_day = datetime(2024, 1, 1)
+    span = days * 86400
+    connection = sqlite3.connect(db_path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=OFF")
+    for offset in range(0, rows, chunk):
+        batch = [
+            (f"user-{rng.randrange(5000)}", "Hello there", "Hi!", rng.choice(SENTIMENTS),
+             (first_day + timedelta(seconds=rng.randrange(span))).isoformat(sep=' '))
+            for _ in range(min(chunk, rows - offset))
+        ]
+        connection.executemany(
+            "INSERT INTO chat_message (user_id, user_message, bot_reply, sentiment, timestamp) VALUES (?, ?, ?, ?, ?)",
+            batch
+        )
+        connection.commit()
+    connection.close()
+
+
+def legacy_analytics(start_date, end_date):
+    from app import db
+    from app.v1.models import ChatMessage
+
+    return db.session.query(
+        func.date(ChatMessage.timestamp).label('date'),
+        ChatMessage.sentiment,
+        func.count(ChatMessage.id).label('count')
+    ).filter(
+        ChatMessage.timestamp >= datetime.fromisoformat(start_date),
+        ChatMessage.timestamp <= datetime.fromisoformat(end_date)
+    ).group_by('date', ChatMessage.sentiment).all()
+
+
+def timed(fn, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--db", help="SQLite file to use (kept); defaults to a temporary file")
+    args = parser.parse_args()
+
+    from app import create_app, db
+    from app.config import DevelopmentConfig
+    from app.v1.models import ChatMessage
+    from app.v1.services import ChatService
+
+    tmp = None
+    db_path = args.db
+    if db_path is None:
+        tmp = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmp.name, 'rollup.db')
+
+    class BenchmarkConfig(DevelopmentConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        existing = ChatMessage.query.count()
+        if existing < args.rows:
+            start = time.perf_counter()
+            db.engine.dispose()
+            fill(db_path, args.rows - existing, args.days, args.seed)
+            print(f"inserted {args.rows - existing:,} rows in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        rollup_rows = ChatService.rebuild_sentiment_rollup()
+        print(f"rebuild-sentiment-rollup: {rollup_rows} rows in {time.perf_counter() - start:.2f}s")
+
+        last_day = date(2024, 1, 1) + timedelta(days=args.days - 1)
+        ranges = {
+            "last 30 days": ((last_day - timedelta(days=29)).isoformat(), last_day.isoformat()),
+            "whole table": ("2024-01-01", last_day.isoformat()),
+        }
+        print(f"{'range':<14} {'GROUP BY scan':>14} {'rollup':>10}")
+        for label, (start_date, end_date) in ranges.items():
+            scan = timed(legacy_analytics, start_date, end_date)
+            rollup = timed(ChatService.get_sentiment_analytics, start_date, end_date)
+            print(f"{label:<14} {scan * 1000:>12.1f}ms {rollup * 1000:>8.2f}ms")
+
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
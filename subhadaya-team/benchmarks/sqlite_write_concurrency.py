@@ -0,0 +1,90 @@
+"""
+Write-heavy concurrency benchmark: several worker processes (like gunicorn workers)
+each record chat messages through ChatService.record_chat, one commit per message,
+into the same SQLite file. Runs once with SQLAlchemy defaults and once with SQLITE_TUNING.
+
+    python benchmarks/sqlite_write_concurrency.py --processes 4 --inserts 500
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError
+
+
+def make_config(db_path, tuned):
+    from app.config import DevelopmentConfig
+
+    class BenchmarkConfig(DevelopmentConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+        SQLITE_TUNING = tuned
+
+    return BenchmarkConfig
+
+
+def worker(db_path, tuned, inserts, start_barrier, results):
+    from app import create_app, db
+    from app.v1.services import ChatService
+
+    app = create_app(make_config(db_path, tuned))
+    written = errors = 0
+    with app.app_context():
+        start_barrier.wait()
+        for i in range(inserts):
+            try:
+                ChatService.record_chat(f"user-{os.getpid()}", f"Message {i}", f"Reply {i}", "NEUTRAL")
+                written += 1
+            except OperationalError:
+                db.session.rollback()
+                errors += 1
+    results.put((written, errors))
+
+
+def run(processes, inserts, tuned):
+    from app import create_app, db
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        app = create_app(make_config(db_path, tuned))
+        with app.app_context():
+            db.engine.dispose()
+
+        barrier = multiprocessing.Barrier(processes + 1)
+        results = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=worker, args=(db_path, tuned, inserts, barrier, results))
+            for _ in range(processes)
+        ]
+        for process in workers:
+            process.start()
+        barrier.wait()
+        start = time.perf_counter()
+        outcomes = [results.get() for _ in workers]
+        elapsed = time.perf_counter() - start
+        for process in workers:
+            process.join()
+
+    written = sum(w for w, _ in outcomes)
+    errors = sum(e for _, e in outcomes)
+    return written / elapsed, written, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--inserts", type=int, default=500, help="chat messages recorded per process")
+    args = parser.parse_args()
+
+    print(f"{'mode':<9} {'inserts/s':>10} {'written':>8} {'locked errors':>14}")
+    for label, tuned in (("default", False), ("tuned", True)):
+        throughput, written, errors = run(args.processes, args.inserts, tuned)
+        print(f"{label:<9} {throughput:>10.1f} {written:>8} {errors:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -29,4 +29,7 @@ def create_app():
     from .v1 import bp as v1_blueprint
     app.register_blueprint(v1_blueprint, url_prefix='/api/v1')
 
+    from .commands import register_commands
+    register_commands(app)
+
     return app
\ No newline at end of file
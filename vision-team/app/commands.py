@@ -0,0 +1,26 @@
+import click
+
+from .v1.recipe_store import get_recipe_store, iter_dump
+
+
+def register_commands(app):
+    @app.cli.command('import-recipes')
+    @click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+    @click.option('--batch-size', default=1000, show_default=True, help='Recipes per transaction.')
+    def import_recipes(paths, batch_size):
+        """Bulk-load Edamam JSON/NDJSON dumps into the local recipe store."""
+        store = get_recipe_store()
+        if store is None:
+            raise click.ClickException("The recipe store is disabled (RECIPE_STORE_ENABLED=false).")
+        total = 0
+        for path in paths:
+            batch = []
+            for recipe in iter_dump(path):
+                batch.append(recipe)
+                if len(batch) >= batch_size:
+                    total += store.ingest(batch)
+                    batch = []
+            total += store.ingest(batch)
+            click.echo(f"{path}: {total} recipes imported so far")
+        stats = store.stats()
+        click.echo(f"Recipe store at {store.path}: {stats['recipes']} recipes, {stats['terms']} ingredient terms.")
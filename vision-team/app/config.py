@@ -8,6 +8,54 @@ class Config:
     
     EDAMAM_APP_ID = os.environ.get('EDAMAM_APP_ID')
     EDAMAM_APP_KEY = os.environ.get('EDAMAM_APP_KEY')
-    EDAMAM_API_ENDPOINT = "https://api.edamam.com/api/recipes/v2"
+    EDAMAM_API_ENDPOINT = os.environ.get('EDAMAM_API_ENDPOINT', "https://api.edamam.com/api/recipes/v2")
+    EDAMAM_CONNECT_TIMEOUT = float(os.environ.get('EDAMAM_CONNECT_TIMEOUT', 3.05))
+    EDAMAM_READ_TIMEOUT = float(os.environ.get('EDAMAM_READ_TIMEOUT', 10))
+    EDAMAM_RETRIES = int(os.environ.get('EDAMAM_RETRIES', 3))
+    EDAMAM_BACKOFF = float(os.environ.get('EDAMAM_BACKOFF', 0.5))
+    EDAMAM_POOL_SIZE = int(os.environ.get('EDAMAM_POOL_SIZE', 10))
+    # A Retry-After longer than EDAMAM_MAX_RETRY_AFTER seconds fails the call instead of
+    # sleeping; every call, retries included, finishes within EDAMAM_RETRY_BUDGET seconds.
+    EDAMAM_MAX_RETRY_AFTER = float(os.environ.get('EDAMAM_MAX_RETRY_AFTER', 5))
+    EDAMAM_RETRY_BUDGET = float(os.environ.get('EDAMAM_RETRY_BUDGET', 15))
+
+    # Edamam response cache keyed on the normalized ingredient set (0 disables it).
+    # EDAMAM_CACHE_PATH additionally persists it to a SQLite file shared by all workers.
+    EDAMAM_CACHE_SIZE = int(os.environ.get('EDAMAM_CACHE_SIZE', 512))
+    EDAMAM_CACHE_TTL = float(os.environ.get('EDAMAM_CACHE_TTL', 6 * 3600))
+    EDAMAM_CACHE_PATH = os.environ.get('EDAMAM_CACHE_PATH')
+
+    # Each Edamam search runs the full ingredient list plus ingredient pairs as up to
+    # EDAMAM_FANOUT_MAX_QUERIES concurrent queries (1 = the full list only), merged by
+    # recipe and ranked by ingredient coverage; whatever answered within
+    # EDAMAM_FANOUT_DEADLINE seconds is used. Each search runs its queries on at most
+    # EDAMAM_FANOUT_WORKERS threads of its own.
+    EDAMAM_FANOUT_MAX_QUERIES = int(os.environ.get('EDAMAM_FANOUT_MAX_QUERIES', 6))
+    EDAMAM_FANOUT_WORKERS = int(os.environ.get('EDAMAM_FANOUT_WORKERS', 6))
+    EDAMAM_FANOUT_DEADLINE = float(os.environ.get('EDAMAM_FANOUT_DEADLINE', 8))
+
+    # Local recipe store: every Edamam hit is kept in SQLite with an ingredient index and
+    # searches are answered locally, going upstream only when fewer than RECIPE_STORE_MIN_HITS
+    # stored recipes use all the requested ingredients and the set was not fetched within
+    # RECIPE_STORE_REFRESH seconds. The path defaults to instance/recipes.db.
+    RECIPE_STORE_ENABLED = os.environ.get('RECIPE_STORE_ENABLED', 'true').lower() == 'true'
+    RECIPE_STORE_PATH = os.environ.get('RECIPE_STORE_PATH')
+    RECIPE_STORE_MIN_HITS = int(os.environ.get('RECIPE_STORE_MIN_HITS', 5))
+    RECIPE_STORE_REFRESH = float(os.environ.get('RECIPE_STORE_REFRESH', 7 * 24 * 3600))
+
+    # Rule-based nutrition screening before the LLM. A serving may use at most
+    # NUTRITION_MEAL_SHARE of the user's daily calorie target (Mifflin-St Jeor BMR times
+    # NUTRITION_ACTIVITY_FACTOR); NUTRITION_RULES_PATH adds or replaces condition rules
+    # from a JSON file. When the rules cover every stated condition the LLM is skipped
+    # unless NUTRITION_RULES_SKIP_LLM is false.
+    NUTRITION_RULES_PATH = os.environ.get('NUTRITION_RULES_PATH')
+    NUTRITION_MEAL_SHARE = float(os.environ.get('NUTRITION_MEAL_SHARE', 0.4))
+    NUTRITION_ACTIVITY_FACTOR = float(os.environ.get('NUTRITION_ACTIVITY_FACTOR', 1.375))
+    NUTRITION_RULES_SKIP_LLM = os.environ.get('NUTRITION_RULES_SKIP_LLM', 'true').lower() == 'true'
+
+    # LLM suitability verdicts cached per (recipe URI, profile bucket); the bucket is the
+    # age band, BMI band, gender and normalized conditions. 0 entries disables it.
+    VERDICT_CACHE_SIZE = int(os.environ.get('VERDICT_CACHE_SIZE', 50000))
+    VERDICT_CACHE_TTL = float(os.environ.get('VERDICT_CACHE_TTL', 7 * 24 * 3600))
 
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
\ No newline at end of file
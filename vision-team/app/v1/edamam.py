@@ -0,0 +1,276 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+from urllib3.util.timeout import Timeout
+
+CREDENTIALS_RE = re.compile(r'(app_id|app_key)=[^&\s\'")]+')
+
+
+class EdamamError(Exception):
+    pass
+
+
+def normalize_ingredients(ingredients):
+    """
+    Canonical form of an ingredient list: lowercased, whitespace collapsed, duplicates
+    removed and sorted, so ["Garlic", "chicken "] and ["chicken", "garlic"] are the same query.
+    """
+    return tuple(sorted({" ".join(str(item).lower().split()) for item in ingredients} - {""}))
+
+
+class RecipeCache:
+    """
+    LRU cache of Edamam hits keyed on the normalized ingredient set, with a TTL.
+    If a path is given, entries are also written to a small SQLite file so they
+    survive restarts and are shared by every worker on the host.
+    """
+
+    def __init__(self, max_entries=512, ttl=6 * 3600, path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS recipe_cache "
+                    "(query TEXT PRIMARY KEY, hits TEXT NOT NULL, stored_at REAL NOT NULL)"
+                )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _fresh(self, stored_at):
+        return not self.ttl or time.time() - stored_at <= self.ttl
+
+    def _remember(self, key, hits, stored_at):
+        self.entries[key] = (hits, stored_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self._fresh(entry[1]):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.entries.pop(key, None)
+
+        if self.path:
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute(
+                    "SELECT hits, stored_at FROM recipe_cache WHERE query = ?", ("|".join(key),)
+                ).fetchone()
+            if row is not None and self._fresh(row[1]):
+                hits = json.loads(row[0])
+                with self.lock:
+                    self._remember(key, hits, row[1])
+                    self.hits += 1
+                return hits
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, hits):
+        stored_at = time.time()
+        with self.lock:
+            self._remember(key, hits, stored_at)
+        if self.path:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO recipe_cache (query, hits, stored_at) VALUES (?, ?, ?)",
+                    ("|".join(key), json.dumps(hits), stored_at)
+                )
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class DeadlineTimeout(Timeout):
+    """
+    urllib3 Timeout whose total is recomputed for every attempt (urllib3 clones the
+    timeout per attempt) as the time left until `deadline`, so the connect and read
+    timeouts of a retry never reach past it.
+    """
+
+    def __init__(self, connect=None, read=None, deadline=None):
+        total = None if deadline is None else max(deadline - time.monotonic(), 0.001)
+        super().__init__(connect=connect, read=read, total=total)
+        self.deadline = deadline
+
+    def clone(self):
+        return DeadlineTimeout(self._connect, self._read, self.deadline)
+
+
+class BoundedRetry(Retry):
+    """
+    Retry that gives up instead of sleeping on a Retry-After longer than max_retry_after
+    (the 429/503 is then returned and reported as an error), and that only retries while
+    the wait plus a connect timeout still fits the calling thread's deadline, set by
+    EdamamClient.fetch in `BoundedRetry.budget` (urllib3 retries run on that thread).
+    The attempt's read is then cut to whatever is left by DeadlineTimeout.
+    """
+    budget = threading.local()
+
+    def __init__(self, *args, max_retry_after=5.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_retry_after = max_retry_after
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.max_retry_after = self.max_retry_after
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        retry_after = retry.get_retry_after(response) if response is not None and self.respect_retry_after_header else None
+        if retry_after is not None and retry_after > self.max_retry_after:
+            raise MaxRetryError(_pool, url, ResponseError(
+                f"Retry-After of {retry_after:g}s exceeds the {self.max_retry_after:g}s limit"
+            ))
+        deadline = getattr(self.budget, "deadline", None)
+        if deadline is not None:
+            wait = retry_after if retry_after is not None else retry.get_backoff_time()
+            if time.monotonic() + wait + self.budget.connect > deadline:
+                raise MaxRetryError(_pool, url, error or ResponseError("retry budget exhausted"))
+        return retry
+
+
+class EdamamClient:
+    """
+    Edamam recipe search over a pooled keep-alive session, with connect/read timeouts,
+    retries with exponential backoff on connection errors, 429 and 5xx (honouring
+    Retry-After up to max_retry_after seconds), all within a per-call time budget, and
+    an optional RecipeCache in front.
+    """
+
+    def __init__(self, app_id, app_key, endpoint, timeout=(3.05, 10), retries=3, backoff=0.5,
+                 pool_size=10, cache=None, max_retry_after=5.0, budget=15.0):
+        self.app_id = app_id
+        self.app_key = app_key
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.budget = budget
+        self.cache = cache
+        self.session = requests.Session()
+        retry = BoundedRetry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+            max_retry_after=max_retry_after
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @classmethod
+    def from_config(cls, config):
+        cache = None
+        if config.get('EDAMAM_CACHE_SIZE', 512) > 0:
+            cache = RecipeCache(
+                max_entries=config.get('EDAMAM_CACHE_SIZE', 512),
+                ttl=config.get('EDAMAM_CACHE_TTL', 6 * 3600),
+                path=config.get('EDAMAM_CACHE_PATH')
+            )
+        return cls(
+            app_id=config.get('EDAMAM_APP_ID'),
+            app_key=config.get('EDAMAM_APP_KEY'),
+            endpoint=config.get('EDAMAM_API_ENDPOINT'),
+            timeout=(config.get('EDAMAM_CONNECT_TIMEOUT', 3.05), config.get('EDAMAM_READ_TIMEOUT', 10)),
+            retries=config.get('EDAMAM_RETRIES', 3),
+            backoff=config.get('EDAMAM_BACKOFF', 0.5),
+            pool_size=config.get('EDAMAM_POOL_SIZE', 10),
+            cache=cache,
+            max_retry_after=config.get('EDAMAM_MAX_RETRY_AFTER', 5.0),
+            budget=config.get('EDAMAM_RETRY_BUDGET', 15.0)
+        )
+
+    def fetch(self, query, budget=None):
+        """
+        One upstream search for the query string, returning the raw hits. All attempts
+        together take at most `budget` seconds (the client's default when None; 0 for no
+        limit): each attempt's timeouts are capped to the time left, and a retry is only
+        made while its wait plus a connect timeout still fits.
+        """
+        params = {
+            "q": query,
+            "type": "public",
+            "app_id": self.app_id,
+            "app_key": self.app_key
+        }
+        budget = self.budget if budget is None else budget
+        timeout = self.timeout
+        if budget:
+            if budget <= 0:
+                raise EdamamError("No time left for an Edamam request.")
+            deadline = time.monotonic() + budget
+            timeout = DeadlineTimeout(*self.timeout, deadline=deadline)
+            BoundedRetry.budget.deadline = deadline
+            BoundedRetry.budget.connect = self.timeout[0]
+        try:
+            response = self.session.get(self.endpoint, params=params, timeout=timeout)
+            response.raise_for_status()
+            return response.json().get("hits", [])
+        except (requests.exceptions.RequestException, ValueError) as e:
+            # Errors quote the request URL; keep the credentials out of logs and responses.
+            raise EdamamError(CREDENTIALS_RE.sub(r'\1=***', str(e)))
+        finally:
+            BoundedRetry.budget.deadline = None
+
+    def search(self, ingredients, budget=None):
+        """
+        Hits for an ingredient list, served from the cache when the same set was seen
+        recently. `budget` bounds the upstream call as in fetch().
+        """
+        key = normalize_ingredients(ingredients)
+        if self.cache is not None:
+            hits = self.cache.get(key)
+            if hits is not None:
+                return hits
+        hits = self.fetch(" ".join(key), budget)
+        if self.cache is not None and hits:
+            self.cache.put(key, hits)
+        return hits
+
+
+edamam_client = None
+edamam_client_lock = threading.Lock()
+
+
+def get_edamam_client():
+    global edamam_client
+    if edamam_client is None:
+        with edamam_client_lock:
+            if edamam_client is None:
+                edamam_client = EdamamClient.from_config(current_app.config)
+    return edamam_client
@@ -0,0 +1,99 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from .edamam import EdamamError, normalize_ingredients
+from .recipe_store import ingredient_term, recipe_terms
+
+logger = logging.getLogger(__name__)
+
+
+class FanOutHits(list):
+    """Ranked hits of a fan-out search; `complete` is False if any sub-query failed or missed the deadline."""
+    complete = True
+
+
+def subqueries(ingredients, max_queries=6):
+    """
+    Ingredient subsets to search for: the whole list first, then neighbouring pairs, taking
+    every other pair first so the first ceil(n/2) pairs already cover every ingredient
+    (single ingredients when there are only two). Requested order is kept, so earlier
+    ingredients get the first queries.
+    """
+    names = list(dict.fromkeys(" ".join(str(name).lower().split()) for name in ingredients if str(name).strip()))
+    queries = [tuple(names)] if names else []
+    if len(names) == 2:
+        queries.extend((name,) for name in names)
+    elif len(names) > 2:
+        pairs = [(names[i], names[(i + 1) % len(names)]) for i in range(len(names))]
+        queries.extend(pairs[0::2] + pairs[1::2])
+    return queries[:max_queries]
+
+
+def rank_by_coverage(ingredients, hit_lists):
+    """
+    Merges hit lists, dropping repeated recipe URIs, and orders the recipes by how many of
+    the requested ingredients they use, then by fewest other ingredients, then by first
+    appearance. Each hit gets a "matched" count, as RecipeStore.search returns.
+    """
+    wanted = {ingredient_term(name) for name in normalize_ingredients(ingredients)}
+    merged = {}
+    for hits in hit_lists:
+        for hit in hits:
+            recipe = hit.get("recipe") or {}
+            key = recipe.get("uri") or id(recipe)
+            if key not in merged:
+                merged[key] = {"recipe": recipe, "matched": len(wanted & recipe_terms(recipe))}
+    ranked = sorted(
+        enumerate(merged.values()),
+        key=lambda item: (-item[1]["matched"], len(item[1]["recipe"].get("ingredients") or []), item[0])
+    )
+    return [hit for _, hit in ranked]
+
+
+def fan_out_search(client, ingredients, max_queries=6, deadline=8.0, workers=None):
+    """
+    Runs the subqueries through client.search and merges whatever finished within
+    `deadline` seconds. Each search gets its own threads (at most `workers`, default one
+    per query), so concurrent searches never queue behind each other's sub-queries, and
+    each query gets the time left before the deadline as its retry budget. Queries still
+    running at the deadline are abandoned (their results still land in the client's
+    cache). Raises EdamamError only if no query succeeded; otherwise the hits'
+    `complete` flag tells whether every query answered.
+    """
+    queries = subqueries(ingredients, max_queries)
+    expires = time.monotonic() + deadline
+
+    def search(query):
+        remaining = expires - time.monotonic()
+        if remaining <= 0:
+            raise EdamamError(f"No time left of the {deadline}s deadline.")
+        return client.search(list(query), budget=remaining)
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(min(workers or len(queries), len(queries)), 1),
+        thread_name_prefix='edamam-fanout'
+    )
+    try:
+        futures = [executor.submit(search, query) for query in queries]
+        done, not_done = wait(futures, timeout=deadline)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    results, errors = [], []
+    for future in futures:
+        if future not in done:
+            continue
+        try:
+            results.append(future.result())
+        except EdamamError as e:
+            errors.append(e)
+    if not results:
+        if errors:
+            raise errors[0]
+        raise EdamamError(f"No Edamam response within {deadline}s.")
+    if not_done:
+        logger.warning(f"{len(not_done)} of {len(queries)} Edamam sub-queries missed the {deadline}s deadline.")
+    hits = FanOutHits(rank_by_coverage(ingredients, results))
+    hits.complete = not not_done and not errors
+    return hits
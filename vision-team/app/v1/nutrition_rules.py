@@ -0,0 +1,196 @@
+import json
+import math
+import re
+import threading
+
+import numpy as np
+from flask import current_app
+
+from .recipe_store import NUTRIENT_TAGS, nutrient_vector
+
+# Per-serving limits by condition. "max"/"min" map NUTRIENT_TAGS entries to amounts in
+# Edamam's units (g, or mg for CHOLE, NA, CA, MG, K, FE); "calorie_deficit" lowers the
+# daily calorie target. NUTRITION_RULES_PATH can point at a JSON file of the same shape
+# whose entries replace or extend these. Aliases name the condition itself: bare organ or
+# measurement words ("kidney", "cholesterol") would also match "kidney stones" or
+# "low cholesterol".
+DEFAULT_RULES = {
+    "hypertension": {
+        "aliases": ["hypertension", "high blood pressure", "hbp"],
+        "max": {"NA": 600, "FASAT": 7}
+    },
+    "diabetes": {
+        "aliases": ["diabetes", "diabetic", "prediabetes", "pre-diabetes", "high blood sugar", "insulin resistance"],
+        "max": {"SUGAR": 12, "CHOCDF": 60}
+    },
+    "high cholesterol": {
+        "aliases": ["high cholesterol", "hyperlipidemia", "hypercholesterolemia", "dyslipidemia"],
+        "max": {"CHOLE": 100, "FASAT": 6}
+    },
+    "heart disease": {
+        "aliases": ["heart disease", "heart failure", "cardiovascular", "coronary"],
+        "max": {"NA": 600, "FASAT": 6, "CHOLE": 100}
+    },
+    "kidney disease": {
+        "aliases": ["kidney disease", "chronic kidney disease", "kidney failure", "renal", "ckd"],
+        "max": {"NA": 600, "K": 700, "PROCNT": 25}
+    },
+    "obesity": {
+        "aliases": ["obesity", "obese", "overweight", "weight loss"],
+        "max": {"FAT": 25, "SUGAR": 15},
+        "calorie_deficit": 500
+    },
+    "anemia": {
+        "aliases": ["anemia", "anaemia", "iron deficiency"],
+        "min": {"FE": 2.5}
+    }
+}
+
+NO_CONDITION = {"", "none", "no", "nil", "n/a", "na", "nothing", "healthy", "no disease", "none known"}
+CONDITION_SPLIT_RE = re.compile(r"[,;/&+]|\band\b|\bwith\b")
+# Words that negate or invert a condition ("no diabetes", "low blood pressure",
+# "hypotension"). A part containing one is never matched to a rule and goes to the LLM.
+QUALIFIER_RE = re.compile(
+    r"\b(?:no|not|non|never|without|low|history of|free of|ruled out|negative for|hypo\w*)\b"
+)
+
+
+def to_number(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) and number > 0 else None
+
+
+def calorie_target(user_profile, activity_factor=1.375, obesity_bmi=30, deficit=0):
+    """
+    Daily calorie target: Mifflin-St Jeor BMR times the activity factor, less `deficit`
+    (at least 500 kcal when BMI is at or above `obesity_bmi`), never below 1200.
+    None if age, weight or height are missing or not positive numbers.
+    """
+    age = to_number(user_profile.get("age"))
+    weight = to_number(user_profile.get("weight"))
+    height = to_number(user_profile.get("height"))
+    if age is None or weight is None or height is None:
+        return None
+    gender = str(user_profile.get("gender") or "").strip().lower()
+    if gender in ("male", "m", "man"):
+        offset = 5
+    elif gender in ("female", "f", "woman"):
+        offset = -161
+    else:
+        offset = -78
+    bmr = 10 * weight + 6.25 * height - 5 * age + offset
+    if weight / (height / 100) ** 2 >= obesity_bmi:
+        deficit = max(deficit, 500)
+    return max(bmr * activity_factor - deficit, 1200.0)
+
+
+class NutritionRules:
+    """
+    Condition -> nutrient threshold rules evaluated over a recipes x NUTRIENT_TAGS matrix.
+    Every recipe either fails (breaks a limit), passes (meets every applicable limit) or
+    is uncertain (no violation, but a limited nutrient is not reported). The outcome is
+    decisive when every condition in the user's `disease` text has a rule and no recipe
+    is uncertain, in which case the LLM has nothing left to judge.
+    """
+
+    def __init__(self, rules=None, meal_share=0.4, activity_factor=1.375):
+        self.rules = dict(DEFAULT_RULES if rules is None else rules)
+        self.meal_share = meal_share
+        self.activity_factor = activity_factor
+        self.column = {tag: i for i, tag in enumerate(NUTRIENT_TAGS)}
+        self.aliases = []
+        for name, rule in self.rules.items():
+            for tag in list(rule.get("max", {})) + list(rule.get("min", {})):
+                if tag not in self.column:
+                    raise ValueError(f"Nutrition rule '{name}' uses unknown nutrient tag '{tag}'.")
+            for alias in [name] + rule.get("aliases", []):
+                self.aliases.append((re.compile(rf"\b{re.escape(alias.lower())}\b"), name))
+        # Longest aliases first so "heart disease" wins over "heart".
+        self.aliases.sort(key=lambda item: len(item[0].pattern), reverse=True)
+
+    @classmethod
+    def from_config(cls, config):
+        rules = dict(DEFAULT_RULES)
+        if config.get('NUTRITION_RULES_PATH'):
+            with open(config['NUTRITION_RULES_PATH'], encoding='utf-8') as f:
+                rules.update(json.load(f))
+        return cls(
+            rules,
+            meal_share=config.get('NUTRITION_MEAL_SHARE', 0.4),
+            activity_factor=config.get('NUTRITION_ACTIVITY_FACTOR', 1.375)
+        )
+
+    def conditions(self, disease):
+        """(rule names matched in the disease text, sorted; the parts no rule covers, sorted)."""
+        matched, unmatched = set(), set()
+        for part in CONDITION_SPLIT_RE.split(str(disease or "").lower()):
+            part = " ".join(part.split())
+            if part in NO_CONDITION:
+                continue
+            if QUALIFIER_RE.search(part):
+                unmatched.add(part)
+                continue
+            for pattern, name in self.aliases:
+                if pattern.search(part):
+                    matched.add(name)
+                    break
+            else:
+                unmatched.add(part)
+        return sorted(matched), sorted(unmatched)
+
+    def bounds(self, conditions, meal_calories=None):
+        """Lower/upper limit vectors over NUTRIENT_TAGS; the strictest limit wins when conditions overlap."""
+        lower = np.full(len(NUTRIENT_TAGS), -np.inf)
+        upper = np.full(len(NUTRIENT_TAGS), np.inf)
+        for name in conditions:
+            for tag, value in self.rules[name].get("max", {}).items():
+                upper[self.column[tag]] = min(upper[self.column[tag]], value)
+            for tag, value in self.rules[name].get("min", {}).items():
+                lower[self.column[tag]] = max(lower[self.column[tag]], value)
+        if meal_calories is not None:
+            column = self.column["ENERC_KCAL"]
+            upper[column] = min(upper[column], meal_calories)
+        return lower, upper
+
+    def evaluate(self, recipes, user_profile):
+        conditions, unmatched = self.conditions(user_profile.get("disease"))
+        deficit = max([self.rules[name].get("calorie_deficit", 0) for name in conditions] or [0])
+        daily = calorie_target(user_profile, self.activity_factor, deficit=deficit)
+        meal_calories = daily * self.meal_share if daily is not None and self.meal_share > 0 else None
+        lower, upper = self.bounds(conditions, meal_calories)
+
+        matrix = np.array([nutrient_vector(recipe) for recipe in recipes], dtype=float)
+        matrix = matrix.reshape(len(recipes), len(NUTRIENT_TAGS))
+        limited = np.isfinite(lower) | np.isfinite(upper)
+        # NaN compares False, so an unreported nutrient never counts as a violation...
+        failed = ((matrix > upper) | (matrix < lower)).any(axis=1)
+        # ...but it leaves the recipe undecided.
+        uncertain = ~failed & np.isnan(matrix[:, limited]).any(axis=1)
+        passed = ~failed & ~uncertain
+
+        return {
+            "conditions": conditions,
+            "unmatched": unmatched,
+            "calorie_target": round(daily) if daily is not None else None,
+            "meal_calories": round(meal_calories) if meal_calories is not None else None,
+            "passed": np.flatnonzero(passed).tolist(),
+            "uncertain": np.flatnonzero(uncertain).tolist(),
+            "failed": np.flatnonzero(failed).tolist(),
+            "decisive": not unmatched and not uncertain.any()
+        }
+
+
+nutrition_rules = None
+nutrition_rules_lock = threading.Lock()
+
+
+def get_nutrition_rules():
+    global nutrition_rules
+    if nutrition_rules is None:
+        with nutrition_rules_lock:
+            if nutrition_rules is None:
+                nutrition_rules = NutritionRules.from_config(current_app.config)
+    return nutrition_rules
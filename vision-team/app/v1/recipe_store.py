@@ -0,0 +1,302 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from contextlib import closing
+
+from flask import current_app
+
+from .edamam import EdamamError, normalize_ingredients
+
+# Per-serving nutrient vector kept for every stored recipe, in this column order.
+# ENERC_KCAL comes from the recipe's `calories`, the rest from its `digest` (including `sub` entries).
+NUTRIENT_TAGS = (
+    "ENERC_KCAL", "FAT", "FASAT", "CHOCDF", "SUGAR", "FIBTG", "PROCNT",
+    "CHOLE", "NA", "CA", "MG", "K", "FE"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    id INTEGER PRIMARY KEY,
+    uri TEXT NOT NULL UNIQUE,
+    label TEXT NOT NULL,
+    ingredient_count INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    nutrients BLOB NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS recipe_terms (
+    term TEXT NOT NULL,
+    recipe_id INTEGER NOT NULL,
+    ingredient_count INTEGER NOT NULL,
+    PRIMARY KEY (term, recipe_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_recipe_terms_recipe_id ON recipe_terms (recipe_id);
+CREATE TABLE IF NOT EXISTS fetched_queries (
+    query TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+def stem(word):
+    """Crude plural folding, applied to both stored and queried terms: tomatoes -> tomato, berries -> berry."""
+    if len(word) <= 3 or word.endswith("ss"):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith("oes"):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def ingredient_term(name):
+    return " ".join(stem(word) for word in name.split())
+
+
+def recipe_terms(recipe):
+    """
+    Index terms for a recipe: every ingredient's full (normalized) food name plus its single
+    words, so "chicken" finds recipes made with "chicken breast".
+    """
+    foods = [item.get("food") or "" for item in recipe.get("ingredients") or []]
+    terms = set()
+    for food in normalize_ingredients(foods):
+        term = ingredient_term(food)
+        terms.add(term)
+        terms.update(term.split())
+    return terms
+
+
+def _digest_totals(digest, totals):
+    for nutrient in digest or []:
+        if nutrient.get("tag") and nutrient.get("total") is not None:
+            totals.setdefault(nutrient["tag"], nutrient["total"])
+        _digest_totals(nutrient.get("sub"), totals)
+    return totals
+
+
+def nutrient_vector(recipe):
+    """Per-serving values for NUTRIENT_TAGS; nutrients the recipe does not report are NaN."""
+    totals = _digest_totals(recipe.get("digest"), {})
+    if recipe.get("calories") is not None:
+        totals["ENERC_KCAL"] = recipe["calories"]
+    servings = recipe.get("yield") or 1
+    return [totals[tag] / servings if tag in totals else math.nan for tag in NUTRIENT_TAGS]
+
+
+class RecipeStore:
+    """
+    Local SQLite copy of every recipe seen from Edamam. recipe_terms is an inverted index
+    from ingredient term to recipe id (carrying the recipe's ingredient count), so a search
+    ranks recipes by how many of the requested ingredients they use (ties go to recipes
+    needing fewer other ingredients) from the index alone, then reads only the winners.
+    Each recipe also keeps its per-serving nutrient vector.
+    fetched_queries remembers which ingredient sets were already asked upstream.
+    """
+
+    def __init__(self, path, min_hits=5, refresh=7 * 24 * 3600):
+        self.path = path
+        self.min_hits = min_hits
+        self.refresh = refresh
+        self.lock = threading.Lock()
+        self.local_hits = 0
+        self.cold_misses = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def ingest(self, recipes):
+        """Inserts or refreshes recipes (Edamam `recipe` objects). Returns how many were stored."""
+        now = time.time()
+        rows, terms = {}, {}
+        for recipe in recipes:
+            uri = recipe.get("uri")
+            if not uri:
+                continue
+            ingredient_count = len(recipe.get("ingredients") or [])
+            rows[uri] = (
+                uri,
+                recipe.get("label") or "",
+                ingredient_count,
+                now,
+                array("d", nutrient_vector(recipe)).tobytes(),
+                json.dumps(recipe)
+            )
+            terms[uri] = (recipe_terms(recipe), ingredient_count)
+        if not rows:
+            return 0
+        with closing(self._connect()) as conn, conn:
+            # Upsert rather than REPLACE so a refreshed recipe keeps its id.
+            conn.executemany(
+                "INSERT INTO recipes (uri, label, ingredient_count, stored_at, nutrients, data) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (uri) DO UPDATE SET label = excluded.label, "
+                "ingredient_count = excluded.ingredient_count, stored_at = excluded.stored_at, "
+                "nutrients = excluded.nutrients, data = excluded.data",
+                rows.values()
+            )
+            ids = {}
+            uris = list(rows)
+            for start in range(0, len(uris), 500):
+                chunk = uris[start:start + 500]
+                ids.update(conn.execute(
+                    f"SELECT uri, id FROM recipes WHERE uri IN ({', '.join('?' * len(chunk))})", chunk
+                ).fetchall())
+            conn.executemany("DELETE FROM recipe_terms WHERE recipe_id = ?", ((ids[uri],) for uri in uris))
+            conn.executemany(
+                "INSERT INTO recipe_terms VALUES (?, ?, ?)",
+                ((term, ids[uri], count) for uri, (term_set, count) in terms.items() for term in term_set)
+            )
+        return len(rows)
+
+    def ingest_hits(self, hits):
+        return self.ingest(hit["recipe"] for hit in hits if hit.get("recipe"))
+
+    def mark_fetched(self, ingredients, hits):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO fetched_queries VALUES (?, ?, ?)",
+                ("|".join(normalize_ingredients(ingredients)), hits, time.time())
+            )
+
+    def recently_fetched(self, ingredients):
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT fetched_at FROM fetched_queries WHERE query = ?",
+                ("|".join(normalize_ingredients(ingredients)),)
+            ).fetchone()
+        return row is not None and time.time() - row[0] <= self.refresh
+
+    def search(self, ingredients, limit=20):
+        """
+        Recipes using any of the ingredients, best overlap first, as Edamam-style hits
+        ({"recipe": ..., "matched": n}).
+        """
+        terms = sorted({ingredient_term(name) for name in normalize_ingredients(ingredients)})
+        if not terms:
+            return []
+        placeholders = ", ".join("?" * len(terms))
+        with closing(self._connect()) as conn, conn:
+            rows = conn.execute(
+                f"WITH ranked AS ("
+                f"  SELECT recipe_id, COUNT(*) AS matched, MAX(ingredient_count) AS ingredient_count"
+                f"  FROM recipe_terms WHERE term IN ({placeholders}) GROUP BY recipe_id"
+                f"  ORDER BY matched DESC, ingredient_count, recipe_id LIMIT ?"
+                f") SELECT r.data, ranked.matched FROM ranked JOIN recipes AS r ON r.id = ranked.recipe_id "
+                f"ORDER BY ranked.matched DESC, ranked.ingredient_count, ranked.recipe_id",
+                (*terms, limit)
+            ).fetchall()
+        return [{"recipe": json.loads(data), "matched": matched} for data, matched in rows]
+
+    def nutrients(self, uris):
+        """Per-serving nutrient vectors (lists in NUTRIENT_TAGS order) keyed by recipe URI."""
+        uris = list(uris)
+        if not uris:
+            return {}
+        with closing(self._connect()) as conn, conn:
+            rows = conn.execute(
+                f"SELECT uri, nutrients FROM recipes WHERE uri IN ({', '.join('?' * len(uris))})", uris
+            ).fetchall()
+        return {uri: array("d", blob).tolist() for uri, blob in rows}
+
+    def lookup(self, ingredients, fetch, limit=20):
+        """
+        Answers from the store when at least min_hits recipes use every requested ingredient,
+        or when this ingredient set was already fetched within `refresh` seconds. Otherwise
+        (a cold miss) calls fetch(ingredients) for upstream hits, stores them and answers again.
+        The set only counts as fetched when upstream returned hits and, for a fan-out, every
+        sub-query answered (`complete`), so an outage or a missed deadline is retried on
+        the next lookup instead of being served for `refresh` seconds. If the upstream call
+        fails, whatever the store already has is served instead.
+        """
+        wanted = len({ingredient_term(name) for name in normalize_ingredients(ingredients)})
+        hits = self.search(ingredients, limit)
+        complete = sum(1 for hit in hits if hit["matched"] == wanted)
+        if complete >= min(self.min_hits, limit) or self.recently_fetched(ingredients):
+            with self.lock:
+                self.local_hits += 1
+            return hits
+
+        with self.lock:
+            self.cold_misses += 1
+        try:
+            upstream = fetch(ingredients)
+        except EdamamError as e:
+            if not hits:
+                raise
+            current_app.logger.warning(f"Edamam unavailable, serving {len(hits)} stored recipes: {e}")
+            return hits
+        self.ingest_hits(upstream)
+        if upstream and getattr(upstream, "complete", True):
+            self.mark_fetched(ingredients, len(upstream))
+        return self.search(ingredients, limit)
+
+    def stats(self):
+        with closing(self._connect()) as conn, conn:
+            recipes = conn.execute("SELECT COUNT(*) FROM recipes").fetchone()[0]
+            terms = conn.execute("SELECT COUNT(DISTINCT term) FROM recipe_terms").fetchone()[0]
+        with self.lock:
+            lookups = self.local_hits + self.cold_misses
+            return {
+                "recipes": recipes,
+                "terms": terms,
+                "local_hits": self.local_hits,
+                "cold_misses": self.cold_misses,
+                "local_hit_rate": round(self.local_hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def iter_dump(path):
+    """
+    Recipes from a bulk dump: an Edamam response ({"hits": [...]}), a JSON list of hits or
+    recipes, or NDJSON with one hit or recipe per line.
+    """
+    def recipes_of(item):
+        if isinstance(item, dict) and "hits" in item:
+            for hit in item["hits"]:
+                yield hit.get("recipe", hit)
+        elif isinstance(item, list):
+            for entry in item:
+                yield from recipes_of(entry)
+        elif isinstance(item, dict):
+            yield item.get("recipe", item)
+
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".ndjson", ".jsonl")):
+            for line in f:
+                if line.strip():
+                    yield from recipes_of(json.loads(line))
+        else:
+            yield from recipes_of(json.load(f))
+
+
+recipe_store = None
+recipe_store_lock = threading.Lock()
+
+
+def get_recipe_store():
+    """The process-wide RecipeStore, or None when RECIPE_STORE_ENABLED is off."""
+    global recipe_store
+    if not current_app.config.get('RECIPE_STORE_ENABLED', True):
+        return None
+    if recipe_store is None:
+        with recipe_store_lock:
+            if recipe_store is None:
+                recipe_store = RecipeStore(
+                    current_app.config.get('RECIPE_STORE_PATH') or os.path.join(current_app.instance_path, 'recipes.db'),
+                    min_hits=current_app.config.get('RECIPE_STORE_MIN_HITS', 5),
+                    refresh=current_app.config.get('RECIPE_STORE_REFRESH', 7 * 24 * 3600)
+                )
+    return recipe_store
@@ -1,6 +1,9 @@
 from flask import request, jsonify
 from . import bp
+from .edamam import get_edamam_client
+from .recipe_store import get_recipe_store
 from .services import get_ai_filtered_recipes
+from .verdict_cache import get_verdict_cache
 from .schemas import validate_recipe_request
 
 @bp.route('/generate-recipes', methods=['POST'])
@@ -119,4 +122,39 @@ def generate_recipes_route():
     ingredients = data.get("ingredients")
 
     result, status_code = get_ai_filtered_recipes(user_profile, ingredients)
-    return jsonify(result), status_code
\ No newline at end of file
+    return jsonify(result), status_code
+
+
+@bp.route('/cache/stats', methods=['GET'])
+def cache_stats_route():
+    """
+    Cache and Recipe Store Statistics
+    Hit rates and sizes of the Edamam response cache, the local recipe store and the LLM verdict cache.
+    ---
+    tags:
+      - Monitoring
+    responses:
+      200:
+        description: Current statistics. A section is null when that component is disabled.
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                edamam_cache:
+                  type: object
+                  example: {"entries": 120, "hits": 900, "misses": 130, "hit_rate": 0.8738}
+                recipe_store:
+                  type: object
+                  example: {"recipes": 5400, "terms": 820, "local_hits": 1800, "cold_misses": 140, "local_hit_rate": 0.9278}
+                verdicts:
+                  type: object
+                  example: {"lookups": 4000, "hits": 3100, "misses": 900, "stores": 900, "evictions": 0, "entries": 900, "max_entries": 50000, "hit_rate": 0.775}
+    """
+    edamam_cache = get_edamam_client().cache
+    recipe_store = get_recipe_store()
+    return jsonify({
+        "edamam_cache": edamam_cache.stats() if edamam_cache is not None else None,
+        "recipe_store": recipe_store.stats() if recipe_store is not None else None,
+        "verdicts": get_verdict_cache().stats()
+    }), 200
\ No newline at end of file
@@ -1,4 +1,3 @@
-import requests
 import google.generativeai as genai
 from flask import current_app
 import time
@@ -6,44 +5,43 @@ import os
 import uuid
 import re
 
-def get_ai_filtered_recipes(user_profile, ingredients):
+from .edamam import EdamamError, get_edamam_client
+from .fanout import fan_out_search
+from .nutrition_rules import get_nutrition_rules
+from .recipe_store import get_recipe_store
+from .verdict_cache import get_verdict_cache, profile_bucket
+
+MAX_PROMPT_RECIPES = 15
+
+def find_recipes(ingredients):
     """
-    Fetches recipes from Edamam and uses a single AI call to filter them
-    based on a user's health profile, reducing API usage.
+    Recipe hits for the ingredients: from the local recipe store when it can answer,
+    otherwise from concurrent Edamam sub-queries (whose hits are then added to the store).
     """
-    genai.configure(api_key=current_app.config['GEMINI_API_KEY'])
-    edamam_params = {
-        "q": " ".join(ingredients),
-        "type": "public",
-        "app_id": current_app.config['EDAMAM_APP_ID'],
-        "app_key": current_app.config['EDAMAM_APP_KEY'],
-        "random": "true"
-    }
-
-    try:
-        response = requests.get(current_app.config['EDAMAM_API_ENDPOINT'], params=edamam_params)
-        response.raise_for_status()
-        recipes_hits = response.json().get("hits", [])
-    except requests.exceptions.RequestException as e:
-        return {"error": f"Could not fetch recipes from Edamam: {e}"}, 500
+    client = get_edamam_client()
 
-    if not recipes_hits:
-        return {"message": "No recipes found for the given ingredients."}, 404
+    def fetch(ingredients):
+        return fan_out_search(
+            client, ingredients,
+            max_queries=current_app.config.get('EDAMAM_FANOUT_MAX_QUERIES', 6),
+            deadline=current_app.config.get('EDAMAM_FANOUT_DEADLINE', 8.0),
+            workers=current_app.config.get('EDAMAM_FANOUT_WORKERS', 6)
+        )
 
-    model = genai.GenerativeModel('gemini-1.5-flash')
+    store = get_recipe_store()
+    if store is None:
+        return fetch(ingredients)
+    return store.lookup(ingredients, fetch)
 
+def build_suitability_prompt(user_profile, recipes, calorie_target=None):
     # Prepare all recipe details for a single prompt
-    recipes_to_evaluate = []
     recipe_details_for_prompt = ""
-    for i, hit in enumerate(recipes_hits[:15]):  # Limit to the top 10 recipes to manage prompt size
-        recipe_data = hit['recipe']
-        recipes_to_evaluate.append(recipe_data) # Store the full recipe data
-        
+    for i, recipe_data in enumerate(recipes):
         nutrient_summary = ", ".join([
             f"{int(n['total'])} {n['unit']} {n['label']}"
             for n in recipe_data.get('digest', [])[:10] # First 10 major nutrients
         ])
-        
+
         recipe_details_for_prompt += (
             f"Recipe Index: {i}\n"
             f"Recipe Name: {recipe_data['label']}\n"
@@ -57,9 +55,11 @@ def get_ai_filtered_recipes(user_profile, ingredients):
         f"Height: {user_profile['height']}cm, "
         f"Health Concerns: {user_profile['disease']}"
     )
+    if calorie_target is not None:
+        user_details += f", Daily Calorie Target: {calorie_target} kcal"
 
     # Create a single, comprehensive prompt
-    prompt = (
+    return (
         "You are an expert nutritionist. Based on the user's health profile, "
         "review the following list of recipes.\n"
         "Identify which recipes are a healthy and suitable choice.\n\n"
@@ -71,22 +71,72 @@ def get_ai_filtered_recipes(user_profile, ingredients):
         "Please respond ONLY with a comma-separated list of the "
         "suitable 'Recipe Index' numbers (e.g., '0, 2, 5')."
     )
-    
-    print(prompt)
+
+def get_ai_filtered_recipes(user_profile, ingredients):
+    """
+    Fetches recipes from Edamam and uses a single AI call to filter them
+    based on a user's health profile, reducing API usage.
+    """
+    genai.configure(api_key=current_app.config['GEMINI_API_KEY'])
 
     try:
-        ai_response = model.generate_content(prompt)
-        # Use regex to safely find all numbers in the response string
-        suitable_indices = re.findall(r'\d+', ai_response.text)
-        suitable_indices = [int(i) for i in suitable_indices]
-
-        suitable_recipes = [
-            recipes_to_evaluate[i] for i in suitable_indices if i < len(recipes_to_evaluate)
-        ]
-
-    except Exception as e:
-        print(f"Error processing recipes with AI: {e}")
-        return {"error": f"Failed to get AI-based recipe recommendations: {e}"}, 500
+        recipes_hits = find_recipes(ingredients)
+    except EdamamError as e:
+        return {"error": f"Could not fetch recipes from Edamam: {e}"}, 500
+
+    if not recipes_hits:
+        return {"message": "No recipes found for the given ingredients."}, 404
+
+    recipes = [hit['recipe'] for hit in recipes_hits]
+
+    # Deterministic nutrient limits first: recipes that break one never reach the LLM,
+    # and when the rules cover every condition the LLM is skipped altogether.
+    screening = get_nutrition_rules().evaluate(recipes, user_profile)
+    if screening["decisive"] and current_app.config.get('NUTRITION_RULES_SKIP_LLM', True):
+        suitable_recipes = [recipes[i] for i in screening["passed"]][:MAX_PROMPT_RECIPES]
+        if not suitable_recipes:
+            return {"message": "Found recipes, but none were deemed suitable for the user's profile."}, 404
+        return {"recipes": suitable_recipes}, 200
+
+    candidates = [recipes[i] for i in sorted(screening["passed"] + screening["uncertain"])[:MAX_PROMPT_RECIPES]]
+    if not candidates:
+        return {"message": "Found recipes, but none were deemed suitable for the user's profile."}, 404
+
+    # Verdicts already given for these recipes to a similar profile are reused;
+    # only the rest go to the LLM.
+    verdict_cache = get_verdict_cache()
+    bucket = profile_bucket(user_profile, get_nutrition_rules())
+    verdicts = verdict_cache.get_many([recipe['uri'] for recipe in candidates if recipe.get('uri')], bucket)
+    pending = [pos for pos, recipe in enumerate(candidates) if recipe.get('uri') not in verdicts]
+    suitable_positions = set()
+
+    if pending:
+        recipes_to_evaluate = [candidates[pos] for pos in pending]
+        model = genai.GenerativeModel('gemini-1.5-flash')
+        prompt = build_suitability_prompt(user_profile, recipes_to_evaluate, screening["calorie_target"])
+
+        print(prompt)
+
+        try:
+            ai_response = model.generate_content(prompt)
+            # Use regex to safely find all numbers in the response string
+            suitable_indices = re.findall(r'\d+', ai_response.text)
+            suitable_indices = {int(i) for i in suitable_indices if int(i) < len(recipes_to_evaluate)}
+
+        except Exception as e:
+            print(f"Error processing recipes with AI: {e}")
+            return {"error": f"Failed to get AI-based recipe recommendations: {e}"}, 500
+
+        suitable_positions = {pending[i] for i in suitable_indices}
+        verdict_cache.put_many({
+            recipe['uri']: i in suitable_indices
+            for i, recipe in enumerate(recipes_to_evaluate) if recipe.get('uri')
+        }, bucket)
+
+    suitable_recipes = [
+        recipe for pos, recipe in enumerate(candidates)
+        if pos in suitable_positions or verdicts.get(recipe.get('uri'))
+    ]
 
     if not suitable_recipes:
         return {"message": "Found recipes, but none were deemed suitable for the user's profile."}, 404
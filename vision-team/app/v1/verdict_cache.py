@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+from .nutrition_rules import to_number
+
+BMI_BANDS = ((18.5, "underweight"), (25, "normal"), (30, "overweight"), (35, "obese-1"))
+
+
+def age_band(age):
+    age = to_number(age)
+    if age is None:
+        return "age-unknown"
+    if age < 18:
+        return "under-18"
+    if age >= 70:
+        return "70+"
+    low = int(age // 10 * 10)
+    return f"{low}-{low + 9}"
+
+
+def bmi_band(weight, height):
+    weight, height = to_number(weight), to_number(height)
+    if weight is None or height is None:
+        return "bmi-unknown"
+    bmi = weight / (height / 100) ** 2
+    for limit, label in BMI_BANDS:
+        if bmi < limit:
+            return label
+    return "obese-2"
+
+
+def gender_key(gender):
+    gender = str(gender or "").strip().lower()
+    if gender in ("male", "m", "man"):
+        return "male"
+    if gender in ("female", "f", "woman"):
+        return "female"
+    return "other"
+
+
+def profile_bucket(user_profile, rules):
+    """
+    The part of a profile a suitability verdict depends on: age band, BMI band, gender and
+    the disease text reduced to its sorted rule names plus any uncovered parts, so
+    "Diabetes and high blood pressure" and "hypertension, diabetic" share a bucket.
+    """
+    matched, unmatched = rules.conditions(user_profile.get("disease"))
+    return "|".join((
+        age_band(user_profile.get("age")),
+        bmi_band(user_profile.get("weight"), user_profile.get("height")),
+        gender_key(user_profile.get("gender")),
+        ",".join(matched + unmatched) or "none"
+    ))
+
+
+class VerdictCache:
+    """
+    LRU + TTL map of (recipe URI, profile bucket) -> the LLM's suitable/unsuitable verdict,
+    bounded to max_entries.
+    """
+
+    def __init__(self, max_entries=50000, ttl=7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = {"lookups": 0, "hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            max_entries=config.get('VERDICT_CACHE_SIZE', 50000),
+            ttl=config.get('VERDICT_CACHE_TTL', 7 * 24 * 3600)
+        )
+
+    def get_many(self, uris, bucket):
+        """Cached verdicts ({uri: bool}) for whichever of the URIs have one."""
+        now = time.time()
+        verdicts = {}
+        with self.lock:
+            for uri in uris:
+                self.counters["lookups"] += 1
+                key = (uri, bucket)
+                entry = self.entries.get(key)
+                if entry is not None and self.ttl and now - entry[1] > self.ttl:
+                    del self.entries[key]
+                    entry = None
+                if entry is None:
+                    self.counters["misses"] += 1
+                    continue
+                self.entries.move_to_end(key)
+                self.counters["hits"] += 1
+                verdicts[uri] = entry[0]
+        return verdicts
+
+    def put_many(self, verdicts, bucket):
+        if self.max_entries <= 0:
+            return
+        now = time.time()
+        with self.lock:
+            for uri, suitable in verdicts.items():
+                key = (uri, bucket)
+                self.entries[key] = (suitable, now)
+                self.entries.move_to_end(key)
+                self.counters["stores"] += 1
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def stats(self):
+        with self.lock:
+            lookups = self.counters["lookups"]
+            return dict(
+                self.counters,
+                entries=len(self.entries),
+                max_entries=self.max_entries,
+                hit_rate=round(self.counters["hits"] / lookups, 4) if lookups else 0.0
+            )
+
+
+verdict_cache = None
+verdict_cache_lock = threading.Lock()
+
+
+def get_verdict_cache():
+    global verdict_cache
+    if verdict_cache is None:
+        with verdict_cache_lock:
+            if verdict_cache is None:
+                verdict_cache = VerdictCache.from_config(current_app.config)
+    return verdict_cache
@@ -0,0 +1,88 @@
+"""
+Edamam lookups against the local stub: the original per-call requests.get (no
+keep-alive, random=true) versus the pooled EdamamClient without and with the
+ingredient-set cache. The workload repeats a set of popular ingredient combos in
+shuffled order and mixed case, as real clients send them.
+
+    python benchmarks/edamam_client.py --requests 400 --combos 40 --latency 0.05
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.edamam_stub import EdamamStubServer, INGREDIENTS
+from app.v1.edamam import EdamamClient, RecipeCache
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def make_workload(requests_count, combos, seed):
+    rng = random.Random(seed)
+    popular = [rng.sample(INGREDIENTS[:30], 2) for _ in range(combos)]
+    weights = [1 / (rank + 1) for rank in range(combos)]
+    workload = []
+    for _ in range(requests_count):
+        combo = list(rng.choices(popular, weights)[0])
+        rng.shuffle(combo)
+        workload.append([name.title() if rng.random() < 0.5 else name for name in combo])
+    return workload
+
+
+def legacy_search(endpoint, ingredients):
+    params = {"q": " ".join(ingredients), "type": "public", "app_id": "x", "app_key": "y", "random": "true"}
+    response = requests.get(endpoint, params=params)
+    response.raise_for_status()
+    return response.json().get("hits", [])
+
+
+def run(search, workload, concurrency):
+    def timed(ingredients):
+        start = time.perf_counter()
+        search(ingredients)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(timed, workload))
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--combos", type=int, default=40, help="distinct popular ingredient sets")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub seconds per response")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    server = EdamamStubServer(("127.0.0.1", 0), latency=args.latency).start()
+    workload = make_workload(args.requests, args.combos, args.seed)
+
+    modes = [
+        ("requests.get (before)", lambda ingredients: legacy_search(server.url, ingredients)),
+        ("pooled client", EdamamClient("x", "y", server.url).search),
+        ("pooled + cache", EdamamClient("x", "y", server.url, cache=RecipeCache(max_entries=512)).search),
+    ]
+    print(f"{'mode':<22} {'p50':>8} {'p99':>8} {'req/s':>8} {'upstream':>9}")
+    for label, search in modes:
+        before = server.requests
+        latencies, wall = run(search, workload, args.concurrency)
+        print(f"{label:<22} {percentile(latencies, 50) * 1000:>6.1f}ms {percentile(latencies, 99) * 1000:>6.1f}ms "
+              f"{len(workload) / wall:>8.1f} {server.requests - before:>9}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
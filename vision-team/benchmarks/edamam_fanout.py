@@ -0,0 +1,83 @@
+"""
+One Edamam query for the whole ingredient list versus the concurrent sub-query fan-out,
+against the local stub, for ingredient lists of growing length. Reports wall time per
+search, how many searches failed or found anything, distinct recipes found and how many
+of the requested ingredients the top recipes use. --concurrency runs that many searches
+at once, as concurrent cold misses from several requests would; --fail-first N makes the
+stub answer the first N requests of every query with 503, so each sub-query has to retry.
+
+    python benchmarks/edamam_fanout.py --searches 40 --latency 0.2
+    python benchmarks/edamam_fanout.py --concurrency 16 --deadline 1
+    python benchmarks/edamam_fanout.py --concurrency 16 --fail-first 1
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.edamam_client import percentile
+from benchmarks.edamam_stub import EdamamStubServer, INGREDIENTS
+from app.v1.edamam import EdamamClient, EdamamError
+from app.v1.fanout import fan_out_search, rank_by_coverage
+
+TOP = 15
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=40, help="searches per list length")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub seconds per response")
+    parser.add_argument("--max-queries", type=int, default=6)
+    parser.add_argument("--deadline", type=float, default=8.0)
+    parser.add_argument("--workers", type=int, default=6, help="threads per fan-out search")
+    parser.add_argument("--concurrency", type=int, default=1, help="searches running at once")
+    parser.add_argument("--fail-first", type=int, default=0, help="stub 503s before each query succeeds")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    server = EdamamStubServer(("127.0.0.1", 0), latency=args.latency, fail_first=args.fail_first).start()
+    client = EdamamClient("x", "y", server.url, pool_size=args.concurrency * args.workers, budget=args.deadline)
+    callers = ThreadPoolExecutor(max_workers=args.concurrency)
+    rng = random.Random(args.seed)
+
+    modes = [
+        ("single query", lambda ingredients: rank_by_coverage(ingredients, [client.search(ingredients)])),
+        ("fan-out", lambda ingredients: fan_out_search(client, ingredients, args.max_queries, args.deadline, args.workers)),
+    ]
+
+    def timed(search, ingredients):
+        start = time.perf_counter()
+        try:
+            hits = search(ingredients)
+        except EdamamError:
+            hits = None
+        return time.perf_counter() - start, hits
+
+    print(f"concurrency {args.concurrency}, deadline {args.deadline}s, stub latency {args.latency}s, "
+          f"{args.fail_first} 503s per query")
+    print(f"{'n':>2} {'mode':<13} {'p50':>8} {'p99':>8} {'failed':>6} {'found':>6} {'recipes':>8} {'top coverage':>13} {'upstream':>9}")
+    for length in (2, 3, 4, 6, 8):
+        workload = [rng.sample(INGREDIENTS[:30], length) for _ in range(args.searches)]
+        for label, search in modes:
+            before = server.requests
+            results = list(callers.map(lambda ingredients: timed(search, ingredients), workload))
+            latencies = [latency for latency, _ in results]
+            answered = [hits for _, hits in results if hits is not None]
+            found = sum(1 for hits in answered if hits)
+            recipes = sum(len(hits) for hits in answered)
+            coverage = [hit["matched"] / length for hits in answered for hit in hits[:TOP]]
+            mean_coverage = sum(coverage) / len(coverage) if coverage else 0.0
+            print(f"{length:>2} {label:<13} {percentile(latencies, 50) * 1000:>6.0f}ms {percentile(latencies, 99) * 1000:>6.0f}ms "
+                  f"{len(workload) - len(answered):>6} {found:>3}/{len(workload):<2} {recipes / len(workload):>8.1f} "
+                  f"{mean_coverage:>12.0%} {server.requests - before:>9}")
+
+    callers.shutdown()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
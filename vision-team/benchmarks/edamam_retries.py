@@ -0,0 +1,64 @@
+"""
+EdamamClient retries under a time budget, against the local stub answering the first
+`fail` requests of each query with 503. For each scenario it reports the upstream calls,
+the outcome and the elapsed time, and checks that a transient 503 is retried whenever a
+connect timeout still fits the budget and that no call runs past its budget. Exits
+non-zero if a check fails.
+
+    python benchmarks/edamam_retries.py
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.edamam_stub import EdamamStubServer
+from app.v1.edamam import EdamamClient, EdamamError
+
+# (stub latency, 503s before success, budget, expected to succeed)
+SCENARIOS = [
+    (0.05, 1, 15.0, True),
+    (0.05, 1, 8.0, True),
+    (0.05, 1, 4.0, True),
+    (0.05, 2, 8.0, True),
+    (0.05, 1, 2.0, False),   # a retry would not leave room for a connect timeout
+    (1.0, 1, 6.0, True),
+    (2.0, 0, 1.0, False),    # the read is cut at the budget
+    (1.0, 3, 4.5, False),    # retries stop once the next one no longer fits
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slack", type=float, default=0.1, help="seconds a call may overrun its budget")
+    args = parser.parse_args()
+
+    server = EdamamStubServer(("127.0.0.1", 0), corpus_size=500).start()
+    client = EdamamClient("x", "y", server.url, retries=3, backoff=0.5)
+    print(f"connect/read timeout {client.timeout}, {client.session.get_adapter(server.url).max_retries.total} retries")
+    print(f"{'latency':>7} {'fail':>4} {'budget':>6} {'calls':>5} {'result':<8} {'elapsed':>8}  check")
+    failures = 0
+    for latency, fail, budget, expect_ok in SCENARIOS:
+        server.latency, server.fail_first = latency, fail
+        server.seen.clear()
+        before = server.requests
+        start = time.monotonic()
+        try:
+            client.fetch("chicken garlic", budget=budget)
+            ok = True
+        except EdamamError:
+            ok = False
+        elapsed = time.monotonic() - start
+        passed = ok == expect_ok and elapsed <= budget + args.slack
+        failures += not passed
+        print(f"{latency:>6}s {fail:>4} {budget:>5}s {server.requests - before:>5} {'ok' if ok else 'error':<8} "
+              f"{elapsed:>7.2f}s  {'ok' if passed else 'FAILED'}")
+    server.shutdown()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+A local stand-in for the Edamam recipe search API (GET /api/recipes/v2), for offline
+benchmarks. It serves a deterministic synthetic corpus: a query matches the recipes
+that contain every ingredient named in `q`, returned 20 at a time with a `digest`
+shaped like Edamam's. Every response waits `--latency` seconds. With `--fail-first N`
+the first N requests for each distinct query are answered 503, to exercise retries.
+
+    python benchmarks/edamam_stub.py --port 8091 --latency 0.3
+    EDAMAM_API_ENDPOINT=http://127.0.0.1:8091/api/recipes/v2 python run.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+INGREDIENTS = [
+    "chicken", "beef", "pork", "salmon", "tuna", "shrimp", "tofu", "egg", "lentils", "chickpeas",
+    "rice", "quinoa", "pasta", "bread", "oats", "potato", "sweet potato", "broccoli", "spinach", "kale",
+    "carrot", "onion", "garlic", "tomato", "pepper", "mushroom", "zucchini", "cauliflower", "peas", "corn",
+    "avocado", "lemon", "lime", "ginger", "basil", "cilantro", "parsley", "yogurt", "cheese", "butter",
+    "olive oil", "coconut milk", "soy sauce", "honey", "sugar", "flour", "milk", "cream", "bacon", "sausage",
+    "apple", "banana", "berries", "almonds", "walnuts", "peanut butter", "cabbage", "cucumber", "beans", "feta",
+]
+
+NUTRIENTS = [
+    ("Fat", "FAT", "g"), ("Carbs", "CHOCDF", "g"), ("Protein", "PROCNT", "g"), ("Cholesterol", "CHOLE", "mg"),
+    ("Sodium", "NA", "mg"), ("Calcium", "CA", "mg"), ("Magnesium", "MG", "mg"), ("Potassium", "K", "mg"),
+    ("Iron", "FE", "mg"), ("Sugars", "SUGAR", "g"), ("Fiber", "FIBTG", "g"), ("Saturated", "FASAT", "g"),
+]
+
+
+def build_corpus(size=5000, seed=42):
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(size):
+        ingredients = rng.sample(INGREDIENTS, rng.randint(3, 8))
+        servings = rng.randint(1, 6)
+        digest = [
+            {"label": label, "tag": tag, "schemaOrgTag": None, "total": round(rng.uniform(0, 2500 if unit == "mg" else 120), 1),
+             "hasRDI": True, "daily": round(rng.uniform(0, 150), 1), "unit": unit}
+            for label, tag, unit in NUTRIENTS
+        ]
+        corpus.append({
+            "uri": f"http://www.edamam.com/ontologies/edamam.owl#recipe_stub{i:05d}",
+            "label": f"{ingredients[0].title()} with {ingredients[1]} #{i}",
+            "url": f"http://example.com/recipes/{i}",
+            "image": f"http://example.com/images/{i}.jpg",
+            "yield": servings,
+            "calories": round(rng.uniform(200, 4000), 1),
+            "totalWeight": round(rng.uniform(200, 2000), 1),
+            "ingredientLines": [f"1 cup {name}" for name in ingredients],
+            "ingredients": [{"food": name, "text": f"1 cup {name}", "weight": 100.0} for name in ingredients],
+            "dietLabels": [], "healthLabels": [], "cautions": [],
+            "digest": digest,
+        })
+    return corpus
+
+
+class EdamamStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.3, corpus_size=5000, fail_first=0):
+        super().__init__(address, EdamamStubHandler)
+        self.latency = latency
+        self.fail_first = fail_first
+        self.seen = {}
+        self.corpus = build_corpus(corpus_size)
+        self.by_ingredient = {}
+        for position, recipe in enumerate(self.corpus):
+            for item in recipe["ingredients"]:
+                self.by_ingredient.setdefault(item["food"], set()).add(position)
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/recipes/v2"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def search(self, query, shuffle=False):
+        # Match longest names first so "sweet potato" is not read as "potato".
+        remaining = f" {' '.join(query.lower().split())} "
+        matched = []
+        for name in sorted(self.by_ingredient, key=len, reverse=True):
+            if f" {name} " in remaining:
+                matched.append(name)
+                remaining = remaining.replace(f" {name} ", " ")
+        if not matched or remaining.strip():
+            return []
+        positions = set.intersection(*(self.by_ingredient[name] for name in matched))
+        recipes = [self.corpus[position] for position in sorted(positions)]
+        if shuffle:
+            random.shuffle(recipes)
+        return recipes
+
+
+class EdamamStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        query = params.get("q", [""])[0]
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.seen[query] = attempt = self.server.seen.get(query, 0) + 1
+        time.sleep(self.server.latency)
+        if attempt <= self.server.fail_first:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        recipes = self.server.search(query, shuffle=params.get("random", ["false"])[0] == "true")
+        body = json.dumps({
+            "from": 1, "to": min(20, len(recipes)), "count": len(recipes),
+            "hits": [{"recipe": recipe, "_links": {}} for recipe in recipes[:20]],
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per response")
+    parser.add_argument("--corpus", type=int, default=5000, help="number of synthetic recipes")
+    parser.add_argument("--fail-first", type=int, default=0, help="503 responses before each query succeeds")
+    args = parser.parse_args()
+
+    server = EdamamStubServer((args.host, args.port), latency=args.latency, corpus_size=args.corpus,
+                              fail_first=args.fail_first)
+    print(f"Edamam stub listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+The rule-based pre-filter on a synthetic request mix: 20 candidate recipes per request
+(from a RecipeStore preloaded with the stub corpus) and profiles whose `disease` is
+drawn from common conditions, combinations, "none" and conditions no rule covers.
+Reports the screening cost per request, how often the LLM is skipped, and how many
+recipes / prompt characters the LLM sees compared with the previous top-15 prompt.
+Disease texts in CONDITION_CASES are checked against NutritionRules.conditions() first;
+the script exits non-zero if any is matched differently.
+
+    python benchmarks/nutrition_rules.py --requests 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.edamam_stub import INGREDIENTS, build_corpus
+from app.v1.nutrition_rules import NutritionRules
+from app.v1.recipe_store import RecipeStore
+from app.v1.services import MAX_PROMPT_RECIPES, build_suitability_prompt
+
+DISEASES = [
+    "none", "hypertension", "diabetes", "Type 2 diabetes", "high cholesterol", "high blood pressure and diabetes",
+    "obesity", "kidney disease", "heart disease, high cholesterol", "anemia", "gout", "celiac disease",
+    "lactose intolerance", "diabetes, gout",
+]
+
+# disease text -> expected (matched rules, unmatched parts). Qualified or negated
+# conditions must stay unmatched so the LLM, not a rule, judges them.
+CONDITION_CASES = {
+    "low blood pressure": ([], ["low blood pressure"]),
+    "hypotension (low blood pressure)": ([], ["hypotension (low blood pressure)"]),
+    "no diabetes": ([], ["no diabetes"]),
+    "low cholesterol": ([], ["low cholesterol"]),
+    "kidney stones": ([], ["kidney stones"]),
+    "family history of heart disease": ([], ["family history of heart disease"]),
+    "non-diabetic, hypertension": (["hypertension"], ["non-diabetic"]),
+    "High blood pressure and diabetes": (["diabetes", "hypertension"], []),
+    "chronic kidney disease; high cholesterol": (["high cholesterol", "kidney disease"], []),
+    "none": ([], []),
+}
+
+
+def make_profile(rng):
+    return {
+        "age": rng.randint(18, 80),
+        "gender": rng.choice(["male", "female"]),
+        "weight": rng.randint(50, 120),
+        "height": rng.randint(150, 195),
+        "disease": rng.choice(DISEASES),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rules = NutritionRules()
+    failures = {text: rules.conditions(text) for text, expected in CONDITION_CASES.items()
+                if rules.conditions(text) != expected}
+    for text, got in failures.items():
+        print(f"CONDITION CASE {text!r}: expected {CONDITION_CASES[text]}, got {got}")
+    if failures:
+        sys.exit(1)
+    print(f"condition cases: {len(CONDITION_CASES)} ok")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RecipeStore(os.path.join(tmp, "recipes.db"))
+        store.ingest(build_corpus())
+        requests = []
+        for _ in range(args.requests):
+            hits = store.search(rng.sample(INGREDIENTS[:30], 2))
+            requests.append((make_profile(rng), [hit["recipe"] for hit in hits]))
+
+    screen_time = 0.0
+    skipped = 0
+    before_recipes = after_recipes = before_chars = after_chars = 0
+    for profile, recipes in requests:
+        start = time.perf_counter()
+        screening = rules.evaluate(recipes, profile)
+        screen_time += time.perf_counter() - start
+
+        before = recipes[:MAX_PROMPT_RECIPES]
+        before_recipes += len(before)
+        before_chars += len(build_suitability_prompt(profile, before))
+        if screening["decisive"]:
+            skipped += 1
+            continue
+        candidates = [recipes[i] for i in sorted(screening["passed"] + screening["uncertain"])[:MAX_PROMPT_RECIPES]]
+        if candidates:
+            after_recipes += len(candidates)
+            after_chars += len(build_suitability_prompt(profile, candidates, screening["calorie_target"]))
+
+    count = len(requests)
+    print(f"screening: {screen_time / count * 1e6:.0f} us per request ({len(requests[0][1])} recipes)")
+    print(f"LLM calls: {count} -> {count - skipped} ({skipped / count:.0%} skipped as decisive)")
+    print(f"recipes sent to the LLM: {before_recipes} -> {after_recipes}")
+    print(f"prompt characters: {before_chars} -> {after_chars} ({1 - after_chars / before_chars:.0%} fewer)")
+
+
+if __name__ == "__main__":
+    main()
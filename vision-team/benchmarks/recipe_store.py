@@ -0,0 +1,60 @@
+"""
+Ingredient searches served by Edamam (pooled client, no cache) versus the local
+RecipeStore, which starts empty and fills itself from cold misses. The workload is the
+one from edamam_client.py. A second pass over a fresh store preloaded with the stub's
+whole corpus (as `flask import-recipes` would) shows the fully warm case.
+
+    python benchmarks/recipe_store.py --requests 400 --latency 0.2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.edamam_client import make_workload, percentile, run
+from benchmarks.edamam_stub import EdamamStubServer
+from app.v1.edamam import EdamamClient
+from app.v1.recipe_store import RecipeStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--combos", type=int, default=40, help="distinct popular ingredient sets")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub seconds per response")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    server = EdamamStubServer(("127.0.0.1", 0), latency=args.latency).start()
+    client = EdamamClient("x", "y", server.url)
+    workload = make_workload(args.requests, args.combos, args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        learning = RecipeStore(os.path.join(tmp, "learning.db"))
+        preloaded = RecipeStore(os.path.join(tmp, "preloaded.db"))
+        start = time.perf_counter()
+        preloaded.ingest(server.corpus)
+        print(f"preloaded {len(server.corpus)} recipes in {time.perf_counter() - start:.2f}s")
+
+        modes = [
+            ("edamam (before)", client.search),
+            ("store, cold start", lambda ingredients: learning.lookup(ingredients, client.search)),
+            ("store, preloaded", lambda ingredients: preloaded.lookup(ingredients, client.search)),
+        ]
+        print(f"{'mode':<20} {'p50':>8} {'p99':>8} {'req/s':>8} {'upstream':>9}")
+        for label, search in modes:
+            before = server.requests
+            latencies, wall = run(search, workload, args.concurrency)
+            print(f"{label:<20} {percentile(latencies, 50) * 1000:>6.1f}ms {percentile(latencies, 99) * 1000:>6.1f}ms "
+                  f"{len(workload) / wall:>8.1f} {server.requests - before:>9}")
+        print("cold start store:", learning.stats())
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+How much LLM work the verdict cache saves. Replays a synthetic request stream through
+the same steps as get_ai_filtered_recipes (recipe store search, rule screening, verdict
+cache) with a users x ingredient-combos x conditions mix, and counts Gemini calls and
+recipes put into prompts with and without the cache. No model is called; every pending
+recipe is simply given a verdict.
+
+    python benchmarks/verdict_cache.py --requests 5000 --cache-size 50000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.edamam_stub import INGREDIENTS, build_corpus
+from app.v1.nutrition_rules import NutritionRules
+from app.v1.recipe_store import RecipeStore
+from app.v1.services import MAX_PROMPT_RECIPES
+from app.v1.verdict_cache import VerdictCache, profile_bucket
+
+# Conditions only the LLM can judge, alone or next to ones the rules cover.
+DISEASES = ["gout", "celiac disease", "lactose intolerance", "ibs", "diabetes, gout",
+            "hypertension and celiac disease", "GOUT", "Celiac", "gout and high cholesterol"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--combos", type=int, default=60, help="distinct ingredient pairs")
+    parser.add_argument("--cache-size", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=9)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    users = [{
+        "age": rng.randint(18, 80),
+        "gender": rng.choice(["male", "female", "Female", "M"]),
+        "weight": rng.randint(50, 120),
+        "height": rng.randint(150, 195),
+        "disease": rng.choice(DISEASES),
+    } for _ in range(args.users)]
+    combos = [rng.sample(INGREDIENTS[:30], 2) for _ in range(args.combos)]
+    rules = NutritionRules()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RecipeStore(os.path.join(tmp, "recipes.db"))
+        store.ingest(build_corpus())
+        searches = {tuple(combo): [hit["recipe"] for hit in store.search(combo)] for combo in combos}
+
+    cache = VerdictCache(max_entries=args.cache_size)
+    calls = {"without": 0, "with": 0}
+    prompted = {"without": 0, "with": 0}
+    overhead = 0.0
+    for _ in range(args.requests):
+        profile = rng.choice(users)
+        recipes = searches[tuple(rng.choice(combos))]
+        screening = rules.evaluate(recipes, profile)
+        candidates = [recipes[i] for i in sorted(screening["passed"] + screening["uncertain"])[:MAX_PROMPT_RECIPES]]
+        if not candidates:
+            continue
+        calls["without"] += 1
+        prompted["without"] += len(candidates)
+
+        start = time.perf_counter()
+        bucket = profile_bucket(profile, rules)
+        verdicts = cache.get_many([recipe["uri"] for recipe in candidates], bucket)
+        pending = [recipe for recipe in candidates if recipe["uri"] not in verdicts]
+        cache.put_many({recipe["uri"]: rng.random() < 0.5 for recipe in pending}, bucket)
+        overhead += time.perf_counter() - start
+        if pending:
+            calls["with"] += 1
+            prompted["with"] += len(pending)
+
+    stats = cache.stats()
+    print(f"Gemini calls:       {calls['without']} -> {calls['with']}")
+    print(f"recipes in prompts: {prompted['without']} -> {prompted['with']}")
+    print(f"cache: hit rate {stats['hit_rate']:.1%}, {stats['entries']} entries, {stats['evictions']} evictions, "
+          f"{overhead / max(calls['without'], 1) * 1e6:.0f} us per request")
+
+
+if __name__ == "__main__":
+    main()